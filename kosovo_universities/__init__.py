@@ -0,0 +1,77 @@
+"""
+Kosovo Universities Information System - data layer.
+
+Everything needed to load, search, summarize and export the catalogue of
+universities, faculties and departments in Kosovo, without any GUI toolkit.
+The Tk application lives in kosovo_universities_gui.py and the command line
+interface in kosovo_universities.cli (run it with python -m kosovo_universities);
+`python -m kosovo_universities serve` exposes the catalogue as local HTTP/JSON.
+"""
+
+from .analytics import CatalogueAnalytics
+from .backends import DATA_BACKENDS, DATA_SOURCE_ENV, default_data_source, open_catalogue
+from .columnar import ColumnarCatalogue, MappedDataManager, write_columnar
+from .compare import Comparison, ComparisonIndex
+from .data import UniversityDataManager
+from .export import CatalogueExporter, ExportCancelled
+from .facets import FacetIndex
+from .importer import CatalogueImporter, ImportIssue, ImportReport
+from .instrumentation import Instrumentation, instrumentation, profile_session
+from .loader import COMPRESSION_OPENERS, COMPRESSION_SUFFIXES, CatalogueLoader
+from .models import QYTETET, CatalogueInterner, Department, Faculty, University
+from .offerings import Offering, OfferingIndex, OfferingPage
+from .search import SearchCancelled, SearchIndex, SearchMatch
+from .service import CatalogueService, ServiceError, run_service
+from .stats import CatalogueStatistics, StatisticsAggregate
+from .storage import LazyList, SQLiteDataManager
+from .suggest import Suggestion, SuggestionIndex
+from .watch import SourceWatcher
+
+__version__ = "2.0"
+
+__all__ = [
+    'COMPRESSION_OPENERS',
+    'COMPRESSION_SUFFIXES',
+    'CatalogueAnalytics',
+    'CatalogueExporter',
+    'CatalogueImporter',
+    'CatalogueInterner',
+    'CatalogueLoader',
+    'CatalogueService',
+    'CatalogueStatistics',
+    'ColumnarCatalogue',
+    'Comparison',
+    'ComparisonIndex',
+    'DATA_BACKENDS',
+    'DATA_SOURCE_ENV',
+    'Department',
+    'ExportCancelled',
+    'FacetIndex',
+    'Faculty',
+    'ImportIssue',
+    'ImportReport',
+    'Instrumentation',
+    'LazyList',
+    'MappedDataManager',
+    'Offering',
+    'OfferingIndex',
+    'OfferingPage',
+    'QYTETET',
+    'SQLiteDataManager',
+    'SearchCancelled',
+    'SearchIndex',
+    'SearchMatch',
+    'ServiceError',
+    'SourceWatcher',
+    'StatisticsAggregate',
+    'Suggestion',
+    'SuggestionIndex',
+    'University',
+    'UniversityDataManager',
+    'default_data_source',
+    'instrumentation',
+    'open_catalogue',
+    'profile_session',
+    'run_service',
+    'write_columnar',
+]
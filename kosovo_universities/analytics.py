@@ -0,0 +1,253 @@
+"""
+Vectorized analytics over the catalogue, built on NumPy.
+
+The object graph is flattened once into integer-coded arrays: every distinct
+faculty, department, subject, field of study and city gets an id, and the
+university -> faculty -> department -> subject links become CSR-style
+offset/target arrays. Every figure in the report is then a handful of array
+operations (bincount, repeat, unique, matrix products) instead of Python loops
+over the catalogue.
+
+NumPy is optional: without it NUMPY_AVAILABLE is False and CatalogueAnalytics
+raises RuntimeError; the rest of the package does not need it.
+"""
+
+from .models import QYTETET
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+NUMPY_AVAILABLE = np is not None
+
+class CatalogueAnalytics:
+    """Integer-coded arrays of one catalogue and the analytics computed from them.
+
+    Faculties and departments are coded by identity, so one shared by several
+    universities is stored once; its offerings are counted through the link
+    arrays. Subjects are coded by name and fields of study by faculty name.
+    Distributions count offerings, like the totals of the statistics report.
+    """
+
+    # Above this many university x shared-subject cells the pairwise overlap
+    # is skipped (overlap() for a single university still works)
+    PAIRWISE_CELLS = 16 * 1024 * 1024
+    PAIRWISE_BLOCK = 512
+
+    def __init__(self, universities):
+        if np is None:
+            raise RuntimeError("catalogue analytics need NumPy (pip install numpy)")
+        self.universities = list(universities)
+        self.cities = []
+        self.fields = []
+        self.subjects = []
+        city_ids, field_ids, subject_ids = {}, {}, {}
+        for city in QYTETET.values():
+            city_ids[city] = len(city_ids)
+            self.cities.append(city)
+        faculty_ids, department_ids = {}, {}
+        faculties, departments = [], []
+
+        uni_city, uni_offsets, uni_faculties = [], [0], []
+        for uni in self.universities:
+            city = city_ids.get(uni.city)
+            if city is None:
+                city = city_ids[uni.city] = len(city_ids)
+                self.cities.append(uni.city)
+            uni_city.append(city)
+            for faculty in uni.faculties:
+                faculty_id = faculty_ids.get(id(faculty))
+                if faculty_id is None:
+                    faculty_id = faculty_ids[id(faculty)] = len(faculties)
+                    faculties.append(faculty)
+                uni_faculties.append(faculty_id)
+            uni_offsets.append(len(uni_faculties))
+
+        faculty_field, faculty_offsets, faculty_departments = [], [0], []
+        for faculty in faculties:
+            field = field_ids.get(faculty.name)
+            if field is None:
+                field = field_ids[faculty.name] = len(self.fields)
+                self.fields.append(faculty.name)
+            faculty_field.append(field)
+            for dept in faculty.departments:
+                department_id = department_ids.get(id(dept))
+                if department_id is None:
+                    department_id = department_ids[id(dept)] = len(departments)
+                    departments.append(dept)
+                faculty_departments.append(department_id)
+            faculty_offsets.append(len(faculty_departments))
+
+        department_offsets, department_subjects = [0], []
+        for dept in departments:
+            for subject in dept.subjects:
+                subject_id = subject_ids.get(subject)
+                if subject_id is None:
+                    subject_id = subject_ids[subject] = len(self.subjects)
+                    self.subjects.append(subject)
+                department_subjects.append(subject_id)
+            department_offsets.append(len(department_subjects))
+
+        index = np.intp
+        self.uni_city = np.array(uni_city, dtype=index)
+        self.uni_offsets = np.array(uni_offsets, dtype=index)
+        self.uni_faculties = np.array(uni_faculties, dtype=index)
+        self.faculty_field = np.array(faculty_field, dtype=index)
+        self.faculty_offsets = np.array(faculty_offsets, dtype=index)
+        self.faculty_departments = np.array(faculty_departments, dtype=index)
+        self.department_offsets = np.array(department_offsets, dtype=index)
+        self.department_subjects = np.array(department_subjects, dtype=index)
+
+        # How many times each faculty and department is offered across the catalogue
+        self.faculty_offerings = np.bincount(self.uni_faculties, minlength=len(faculties))
+        self.department_offerings = np.bincount(
+            self.faculty_departments, minlength=len(departments),
+            weights=np.repeat(self.faculty_offerings, np.diff(self.faculty_offsets))
+        ).astype(np.int64)
+
+        # University x subject incidence as sorted, de-duplicated (university, subject) pairs
+        offer_uni = np.repeat(np.arange(len(self.universities)), np.diff(self.uni_offsets))
+        dept_uni, dept_ids = self._expand(offer_uni, self.uni_faculties,
+                                          self.faculty_offsets, self.faculty_departments)
+        pair_uni, pair_subject = self._expand(dept_uni, dept_ids,
+                                              self.department_offsets, self.department_subjects)
+        keys = np.unique(pair_uni.astype(np.int64) * max(1, len(self.subjects)) + pair_subject)
+        self.pair_uni = (keys // max(1, len(self.subjects))).astype(index)
+        self.pair_subject = (keys % max(1, len(self.subjects))).astype(index)
+        self.uni_subject_counts = np.bincount(self.pair_uni, minlength=len(self.universities))
+
+    @staticmethod
+    def _expand(sources, rows, offsets, targets):
+        """Follow CSR links: (source, row) edges -> (source, target) for every target of row."""
+        counts = offsets[rows + 1] - offsets[rows]
+        total = int(counts.sum())
+        starts = np.repeat(offsets[rows] - (np.cumsum(counts) - counts), counts)
+        return np.repeat(sources, counts), targets[starts + np.arange(total)]
+
+    @staticmethod
+    def distribution(values, weights=None):
+        """Summary and histogram of non-negative integer values, each counted weight times."""
+        values = np.asarray(values)
+        histogram = np.bincount(values, weights=weights).astype(np.int64)
+        count = int(histogram.sum())
+        if not count:
+            return {'count': 0, 'mean': 0.0, 'median': 0, 'min': 0, 'max': 0, 'histogram': {}}
+        sizes = np.nonzero(histogram)[0]
+        cumulative = np.cumsum(histogram)
+        return {
+            'count': count,
+            'mean': float(np.dot(np.arange(len(histogram)), histogram) / count),
+            'median': int(np.searchsorted(cumulative, (count + 1) // 2)),
+            'min': int(sizes[0]),
+            'max': int(sizes[-1]),
+            'histogram': {str(size): int(histogram[size]) for size in sizes},
+        }
+
+    def departments_per_faculty(self):
+        """Distribution of department counts over faculty offerings."""
+        return self.distribution(np.diff(self.faculty_offsets), self.faculty_offerings)
+
+    def subjects_per_department(self):
+        """Distribution of subject counts over department offerings."""
+        return self.distribution(np.diff(self.department_offsets), self.department_offerings)
+
+    def city_field_matrix(self):
+        """Faculty offerings per city and field of study, as a (cities, fields) array."""
+        offer_city = np.repeat(self.uni_city, np.diff(self.uni_offsets))
+        cells = offer_city * len(self.fields) + self.faculty_field[self.uni_faculties]
+        return np.bincount(cells, minlength=len(self.cities) * len(self.fields)).reshape(
+            len(self.cities), len(self.fields))
+
+    def most_common_subjects(self, n=10):
+        """The n subjects offered by the most universities (then departments).
+
+        Returns (subject, universities, departments) tuples.
+        """
+        universities = np.bincount(self.pair_subject, minlength=len(self.subjects))
+        departments = np.bincount(self.department_subjects, minlength=len(self.subjects),
+                                  weights=np.repeat(self.department_offerings,
+                                                    np.diff(self.department_offsets)))
+        # lexsort is stable, so ties keep catalogue order
+        order = np.lexsort((-departments, -universities))[:n]
+        return [(self.subjects[i], int(universities[i]), int(departments[i])) for i in order]
+
+    def overlap(self, index):
+        """Jaccard similarity of university `index`'s subjects with every university's."""
+        offered = np.zeros(len(self.subjects), dtype=bool)
+        offered[self.pair_subject[self.pair_uni == index]] = True
+        shared = np.bincount(self.pair_uni[offered[self.pair_subject]],
+                             minlength=len(self.universities))
+        union = self.uni_subject_counts + self.uni_subject_counts[index] - shared
+        return np.divide(shared, union, out=np.zeros(len(shared)), where=union > 0)
+
+    def similar_pairs(self, n=10):
+        """The n most similar pairs of universities by Jaccard overlap of their subjects.
+
+        Returns (index, other index, jaccard, shared subjects) tuples, or None if
+        the catalogue is too large to compare every pair. Only subjects offered
+        by two or more universities can be shared, so the dense incidence matrix
+        multiplied here has one column per such subject; rows are multiplied in
+        blocks to bound memory.
+        """
+        count = len(self.universities)
+        offered_by = np.bincount(self.pair_subject, minlength=len(self.subjects))
+        columns = np.cumsum(offered_by > 1) - 1
+        keep = offered_by[self.pair_subject] > 1
+        width = int((offered_by > 1).sum())
+        if count < 2 or not width:
+            return []
+        if count * width > self.PAIRWISE_CELLS:
+            return None
+        incidence = np.zeros((count, width), dtype=np.float32)
+        incidence[self.pair_uni[keep], columns[self.pair_subject[keep]]] = 1
+
+        best = np.empty((0, 4))  # rows of (jaccard, index, other index, shared subjects)
+        sizes = self.uni_subject_counts
+        for start in range(0, count, self.PAIRWISE_BLOCK):
+            block = incidence[start:start + self.PAIRWISE_BLOCK]
+            shared = block @ incidence.T
+            rows = np.arange(start, start + len(block))[:, None]
+            union = sizes[rows] + sizes[None, :] - shared
+            scores = np.divide(shared, union, out=np.zeros(shared.shape), where=union > 0)
+            # Each pair once, and only pairs that share something
+            scores[(np.arange(count)[None, :] <= rows) | (shared == 0)] = 0
+            # Everything tied with the n-th best too, so ties resolve the same way always
+            top = min(n, scores.size)
+            threshold = max(np.partition(scores, -top, axis=None)[-top], np.finfo(float).tiny)
+            flat = np.flatnonzero(scores >= threshold)
+            found = np.column_stack((scores.flat[flat], flat // count + start, flat % count,
+                                     shared.flat[flat]))
+            best = np.concatenate((best, found))
+            # Highest score first, ties in catalogue order
+            best = best[np.lexsort((best[:, 2], best[:, 1], -best[:, 0]))][:n]
+        return [(int(a), int(b), float(score), int(common)) for score, a, b, common in best]
+
+    def university_ref(self, index):
+        uni = self.universities[index]
+        return {'university': uni.name, 'city': uni.city}
+
+    def report(self, top=10):
+        """All analytics as a JSON-serializable dictionary."""
+        matrix = self.city_field_matrix()
+        cities = np.nonzero(matrix.sum(axis=1))[0]
+        fields = np.argsort(-matrix.sum(axis=0), kind='stable')
+        pairs = self.similar_pairs(top)
+        return {
+            'departments_per_faculty': self.departments_per_faculty(),
+            'subjects_per_department': self.subjects_per_department(),
+            'city_field_matrix': {
+                'cities': [self.cities[i] for i in cities],
+                'fields': [self.fields[i] for i in fields],
+                'counts': matrix[np.ix_(cities, fields)].tolist(),
+            },
+            'most_common_subjects': [
+                {'subject': subject, 'universities': universities, 'departments': departments}
+                for subject, universities, departments in self.most_common_subjects(top)
+            ],
+            'similar_universities': None if pairs is None else [
+                {'a': self.university_ref(a), 'b': self.university_ref(b),
+                 'jaccard': round(score, 4), 'shared_subjects': shared}
+                for a, b, score, shared in pairs
+            ],
+        }
@@ -0,0 +1,30 @@
+"""
+Registry of catalogue backends.
+"""
+
+import os
+
+from .columnar import MappedDataManager
+from .data import UniversityDataManager
+from .storage import SQLiteDataManager
+
+# Environment variable naming the default catalogue file
+DATA_SOURCE_ENV = 'KOSOVO_UNIVERSITIES_DATA'
+
+DATA_BACKENDS = {
+    'memory': UniversityDataManager,
+    'sqlite': SQLiteDataManager,
+    'mapped': MappedDataManager,
+}
+
+def default_data_source():
+    """Return the catalogue file named by $KOSOVO_UNIVERSITIES_DATA, or None."""
+    return os.environ.get(DATA_SOURCE_ENV) or None
+
+def open_catalogue(data_source=None, backend='memory'):
+    """Open a catalogue from data_source (or the built-in data) with the named backend."""
+    try:
+        backend_class = DATA_BACKENDS[backend]
+    except KeyError:
+        raise ValueError(f"Unknown backend: {backend}") from None
+    return backend_class.from_source(data_source)
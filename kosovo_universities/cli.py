@@ -0,0 +1,375 @@
+"""
+Command line interface for the catalogue.
+
+Usage:
+    python -m kosovo_universities [--data FILE] [--backend memory|sqlite|mapped] COMMAND ...
+
+Backends:
+    memory          parse the data file and keep the whole catalogue in memory
+    sqlite          query an on-disk SQLite store, built once from other formats
+    mapped          memory-map a compiled .kuc file, compiled once from other formats
+
+Commands:
+    search TERM     list the universities whose names, faculties, departments
+                    or subjects contain TERM (--fuzzy ranks near matches too)
+    suggest PREFIX  complete a name prefix to university, faculty, department and
+                    subject names, most widely offered first
+    stats           print catalogue statistics
+    analytics       print distributions, the field x city matrix, the most common
+                    subjects and the most similar universities (needs NumPy)
+    export          stream the catalogue to a JSON/JSONL file
+    show NAME       show a university (or one of its faculties)
+    where NAME      list where a subject (or, with --department, a department) is
+                    taught, grouped by city and paged
+    compare NAME... compare universities side by side: shared and unique
+                    faculties, departments and subjects and their similarity
+    serve           serve the catalogue as JSON over HTTP on localhost
+    import PATH...  validate and merge many JSON/CSV files into one catalogue file
+    compile         write the catalogue as a memory-mappable .kuc file
+
+None of this imports tkinter, so it runs on headless machines.
+"""
+
+import argparse
+import json
+import os
+import sqlite3
+import sys
+
+from . import views
+from .analytics import NUMPY_AVAILABLE, CatalogueAnalytics
+from .backends import DATA_BACKENDS, default_data_source, open_catalogue
+from .columnar import write_columnar
+from .export import CatalogueExporter
+from .importer import CatalogueImporter
+from .loader import COMPRESSION_OPENERS
+from .offerings import OfferingIndex
+from .service import DEFAULT_HOST, DEFAULT_PORT, run_service
+from .suggest import SuggestionIndex
+
+def positive_int(text):
+    """argparse type for counts and page numbers."""
+    try:
+        value = int(text)
+    except ValueError:
+        value = 0
+    if value < 1:
+        raise argparse.ArgumentTypeError(f"must be a positive integer, not {text!r}")
+    return value
+
+def cmd_search(manager, args):
+    if args.fuzzy:
+        matches = manager.ranked_search(args.term, args.matches)
+    else:
+        matches = manager.search(args.term)
+    matches_by_uni = {}
+    for match in matches:
+        matches_by_uni.setdefault(match.university, []).append(match)
+    universities = list(matches_by_uni)[:args.limit]
+
+    if args.json:
+        print(json.dumps([
+            {
+                'university': uni.name,
+                'city': uni.city,
+                'matches': [{'level': m.level, 'name': m.name, 'context': m.context,
+                             'score': m.score}
+                            for m in matches_by_uni[uni]],
+            }
+            for uni in universities
+        ], indent=2, ensure_ascii=False))
+    else:
+        print('\n'.join(views.search_result_lines(args.term, universities, matches_by_uni)))
+    return 0 if universities else 1
+
+def cmd_suggest(manager, args):
+    suggestions = manager.suggestion_index().complete(args.prefix, args.limit)
+    if args.json:
+        print(json.dumps([suggestion.to_dict() for suggestion in suggestions],
+                         indent=2, ensure_ascii=False))
+    else:
+        for suggestion in suggestions:
+            print(views.suggestion_label(suggestion))
+    return 0 if suggestions else 1
+
+def cmd_stats(manager, args):
+    stats = manager.statistics()
+    if args.json:
+        print(json.dumps(stats, indent=2, ensure_ascii=False))
+    else:
+        print('\n'.join(views.statistics_lines(stats)))
+    return 0
+
+def cmd_analytics(manager, args):
+    if not NUMPY_AVAILABLE:
+        print("Analytics need NumPy: pip install numpy", file=sys.stderr)
+        return 2
+    report = CatalogueAnalytics(manager.universities).report(args.top)
+    if args.json:
+        print(json.dumps(report, indent=2, ensure_ascii=False))
+    else:
+        print('\n'.join(views.analytics_lines(report)))
+    return 0
+
+def cmd_export(manager, args):
+    analytics = None
+    if args.analytics:
+        if not NUMPY_AVAILABLE:
+            print("--analytics needs NumPy: pip install numpy", file=sys.stderr)
+            return 2
+        analytics = CatalogueAnalytics(manager.universities).report()
+    exporter = CatalogueExporter(manager.universities, manager.statistics(),
+                                 fmt=args.format, compression=args.compression,
+                                 analytics=analytics)
+    filename = args.output or exporter.default_filename()
+
+    def progress(done, total):
+        if args.progress:
+            print(f"\rExported {done} of {total} universities", end='', file=sys.stderr)
+
+    exporter.export(filename, progress)
+    if args.progress:
+        print(file=sys.stderr)
+    print(f"Data exported successfully to {filename}")
+    return 0
+
+def cmd_show(manager, args):
+    universities = manager.find_universities(args.name)
+    if args.city:
+        universities = [uni for uni in universities if uni.city == args.city]
+    if not universities:
+        print(f"No university named '{args.name}'", file=sys.stderr)
+        return 2
+
+    for uni in universities:
+        if args.faculty:
+            faculties = [faculty for faculty in uni.faculties if faculty.name == args.faculty]
+            if not faculties:
+                print(f"{uni.name} has no faculty named '{args.faculty}'", file=sys.stderr)
+                return 2
+            if args.json:
+                print(json.dumps([faculty.to_dict() for faculty in faculties],
+                                 indent=2, ensure_ascii=False))
+            else:
+                for faculty in faculties:
+                    print('\n'.join(views.faculty_details_lines(uni, faculty)))
+        elif args.json:
+            print(json.dumps(uni.to_dict(), indent=2, ensure_ascii=False))
+        else:
+            print('\n'.join(views.university_info_lines(uni)))
+            if args.details:
+                print('\n'.join(views.university_details_lines(uni)))
+    return 0
+
+def cmd_where(manager, args):
+    level = 'department' if args.department else 'subject'
+    page = manager.offering_index().page(args.name, level, args.page, args.per_page)
+    if page is None:
+        print(f"No {level} named '{args.name}'", file=sys.stderr)
+        return 2
+    if args.json:
+        print(json.dumps(page.to_dict(), indent=2, ensure_ascii=False))
+    else:
+        print('\n'.join(views.offering_lines(page)))
+    return 0
+
+def cmd_compare(manager, args):
+    universities = []
+    for name in args.names:
+        found = manager.find_universities(name)
+        if args.city:
+            found = [uni for uni in found if uni.city == args.city] or found
+        if not found:
+            print(f"No university named '{name}'", file=sys.stderr)
+            return 2
+        universities.append(found[0])
+    if len(set(universities)) < 2:
+        print("Name at least two different universities to compare", file=sys.stderr)
+        return 2
+
+    index = manager.comparison_index()
+    comparison = index.compare(universities)
+    similar = index.most_similar(universities[0], args.similar) if args.similar else None
+    if args.json:
+        result = comparison.to_dict()
+        if similar is not None:
+            result['most_similar'] = [
+                {'name': uni.name, 'city': uni.city, 'similarity': round(score, 4),
+                 'shared_subjects': shared} for uni, score, shared in similar]
+        print(json.dumps(result, indent=2, ensure_ascii=False))
+    else:
+        print('\n'.join(views.comparison_lines(comparison, similar)))
+    return 0
+
+def cmd_serve(manager, args):
+    def ready(service):
+        print(f"Serving the catalogue on http://{service.host}:{service.port}/ "
+              "(Ctrl+C to stop)", file=sys.stderr)
+
+    try:
+        run_service(manager, args.host, args.port, ready)
+    except KeyboardInterrupt:
+        pass
+    except (OSError, ValueError) as e:
+        print(f"Could not serve on {args.host}:{args.port}: {e}", file=sys.stderr)
+        return 2
+    return 0
+
+def cmd_compile(manager, args):
+    write_columnar(manager.universities, args.output)
+    print(f"Catalogue compiled to {args.output} (open it with --backend mapped)")
+    return 0
+
+def cmd_import(args):
+    def progress(done, total):
+        if args.progress:
+            print(f"\rParsed {done} of {total} files", end='', file=sys.stderr)
+
+    report = CatalogueImporter(args.workers).run(args.inputs, progress)
+    if args.progress:
+        print(file=sys.stderr)
+    for issue in report.issues:
+        if issue.level == 'error' or not args.quiet:
+            print(issue, file=sys.stderr)
+    print('\n'.join(report.summary_lines()))
+    if not report.universities:
+        print("Nothing to write: no universities were imported", file=sys.stderr)
+        return 2
+    try:
+        report.write(args.output)
+    except (OSError, ValueError, sqlite3.Error) as e:
+        print(f"Could not write {args.output}: {e}", file=sys.stderr)
+        return 2
+    print(f"Catalogue written to {args.output}")
+    return 1 if report.errors else 0
+
+def build_parser():
+    parser = argparse.ArgumentParser(
+        prog="python -m kosovo_universities",
+        description="Query the Kosovo universities catalogue from the command line.")
+    parser.add_argument('--data', default=default_data_source(),
+                        help="catalogue file (.json, .jsonl, .sqlite or .kuc, optionally "
+                             "compressed); defaults to $KOSOVO_UNIVERSITIES_DATA or the "
+                             "built-in data")
+    parser.add_argument('--backend', choices=sorted(DATA_BACKENDS), default='memory',
+                        help="keep the catalogue in memory, in an on-disk SQLite store "
+                             "or in a memory-mapped compiled .kuc file")
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    search = commands.add_parser('search', help="search university, faculty, department "
+                                                "and subject names")
+    search.add_argument('term')
+    search.add_argument('--limit', type=positive_int, default=None,
+                        help="show at most this many universities")
+    search.add_argument('--fuzzy', action='store_true',
+                        help="rank the best matches, tolerating typos and missing diacritics")
+    search.add_argument('--matches', type=positive_int, default=50,
+                        help="with --fuzzy, rank at most this many matches (default: %(default)s)")
+    search.add_argument('--json', action='store_true', help="print JSON")
+    search.set_defaults(handler=cmd_search)
+
+    suggest = commands.add_parser('suggest', help="complete a name prefix, most widely "
+                                                  "offered names first")
+    suggest.add_argument('prefix', help="start of a name (case and diacritics are ignored)")
+    suggest.add_argument('--limit', type=positive_int, default=SuggestionIndex.TOP_K,
+                         help="show at most this many names (default: %(default)s)")
+    suggest.add_argument('--json', action='store_true', help="print JSON")
+    suggest.set_defaults(handler=cmd_suggest)
+
+    stats = commands.add_parser('stats', help="print catalogue statistics")
+    stats.add_argument('--json', action='store_true', help="print JSON")
+    stats.set_defaults(handler=cmd_stats)
+
+    analytics = commands.add_parser('analytics', help="print catalogue analytics (needs NumPy)")
+    analytics.add_argument('--top', type=int, default=10,
+                           help="subjects and university pairs to list (default: %(default)s)")
+    analytics.add_argument('--json', action='store_true', help="print JSON")
+    analytics.set_defaults(handler=cmd_analytics)
+
+    export = commands.add_parser('export', help="export the catalogue to a file")
+    export.add_argument('-o', '--output', help="output file (default: a timestamped name)")
+    export.add_argument('--format', choices=CatalogueExporter.FORMATS, default='json')
+    export.add_argument('--compression', choices=sorted(COMPRESSION_OPENERS), default=None)
+    export.add_argument('--analytics', action='store_true',
+                        help="include the analytics report (needs NumPy)")
+    export.add_argument('--progress', action='store_true', help="report progress on stderr")
+    export.set_defaults(handler=cmd_export)
+
+    show = commands.add_parser('show', help="show a university or one of its faculties")
+    show.add_argument('name', help="exact university name")
+    show.add_argument('--city', help="only universities in this city")
+    show.add_argument('--faculty', help="show this faculty with all departments and subjects")
+    show.add_argument('--details', action='store_true',
+                      help="also print the detailed department view")
+    show.add_argument('--json', action='store_true', help="print JSON")
+    show.set_defaults(handler=cmd_show)
+
+    where = commands.add_parser('where', help="list where a subject or department is taught")
+    where.add_argument('name', help="subject name (case and diacritics are ignored)")
+    where.add_argument('--department', action='store_true',
+                       help="look up a department name instead of a subject")
+    where.add_argument('--page', type=positive_int, default=1,
+                       help="page to show (default: %(default)s)")
+    where.add_argument('--per-page', type=positive_int, default=OfferingIndex.PAGE_SIZE,
+                       help="places per page (default: %(default)s)")
+    where.add_argument('--json', action='store_true', help="print JSON")
+    where.set_defaults(handler=cmd_where)
+
+    compare = commands.add_parser('compare', help="compare universities side by side")
+    compare.add_argument('names', nargs='+', metavar='NAME', help="exact university names")
+    compare.add_argument('--city', help="prefer universities in this city for names "
+                                        "several universities share")
+    compare.add_argument('--similar', type=int, default=0, metavar='N',
+                         help="also rank the N universities most similar to the first one")
+    compare.add_argument('--json', action='store_true', help="print JSON")
+    compare.set_defaults(handler=cmd_compare)
+
+    serve = commands.add_parser('serve', help="serve the catalogue as JSON over HTTP on localhost")
+    serve.add_argument('--host', default=DEFAULT_HOST,
+                       help="loopback address to listen on (default: %(default)s)")
+    serve.add_argument('--port', type=int, default=DEFAULT_PORT,
+                       help="port to listen on, 0 for any free port (default: %(default)s)")
+    serve.set_defaults(handler=cmd_serve)
+
+    compile_ = commands.add_parser('compile', help="write the catalogue as a compiled, "
+                                                   "memory-mappable .kuc file")
+    compile_.add_argument('-o', '--output', default="catalogue.kuc",
+                          help="output file (default: %(default)s)")
+    compile_.set_defaults(handler=cmd_compile)
+
+    bulk_import = commands.add_parser(
+        'import', help="validate and merge many per-university JSON/CSV files "
+                       "into one catalogue file")
+    bulk_import.add_argument('inputs', nargs='+', metavar='PATH',
+                             help="input files, or directories to search for .json, "
+                                  ".jsonl and .csv files (optionally compressed)")
+    bulk_import.add_argument('-o', '--output', required=True,
+                             help="catalogue to write: .sqlite, .json or .jsonl "
+                                  "(optionally compressed)")
+    bulk_import.add_argument('--workers', type=int, default=None,
+                             help="worker processes (default: one per CPU)")
+    bulk_import.add_argument('--quiet', action='store_true',
+                             help="only report errors, not warnings")
+    bulk_import.add_argument('--progress', action='store_true',
+                             help="report progress on stderr")
+    # Builds a catalogue rather than reading one, so --data/--backend do not apply
+    bulk_import.set_defaults(handler=cmd_import, opens_catalogue=False)
+    return parser
+
+def main(argv=None):
+    """Run the command line interface; returns the process exit code."""
+    args = build_parser().parse_args(argv)
+    if not getattr(args, 'opens_catalogue', True):
+        return args.handler(args)
+    try:
+        manager = open_catalogue(args.data, args.backend)
+    except (OSError, ValueError) as e:
+        print(f"Could not load {args.data}: {e}", file=sys.stderr)
+        return 2
+    try:
+        return args.handler(manager, args)
+    except BrokenPipeError:
+        # Output piped into e.g. head: stop quietly, as other command line tools do
+        devnull = os.open(os.devnull, os.O_WRONLY)
+        os.dup2(devnull, sys.stdout.fileno())
+        return 1
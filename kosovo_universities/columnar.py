@@ -0,0 +1,798 @@
+"""
+Compiled columnar catalogue files (.kuc), opened with mmap.
+
+A .kuc file holds the catalogue as a sorted string table plus flat uint32
+columns: universities point at ranges of faculty ids, faculties at ranges of
+department ids and departments at ranges of subject string ids, each range
+given by an offsets column with one entry more than there are rows. Shared
+faculties and departments are stored once. The file also carries what searching
+needs (padded folded names, the entities using each name and a trigram index)
+and the precomputed statistics, so opening one only maps it and reads the
+section directory; every process that opens the same file shares its pages.
+"""
+
+import array
+import bisect
+import functools
+import heapq
+import json
+import math
+import mmap
+import os
+import struct
+import sys
+from collections import Counter
+from datetime import datetime
+
+from .compare import ComparisonIndex
+from .data import UniversityDataManager
+from .facets import FacetIndex
+from .loader import CatalogueLoader
+from .models import Department, Faculty, University
+from .offerings import Offering, OfferingIndex
+from .search import (SearchCancelled, SearchIndex, SearchMatch, exact_score, fold,
+                     fuzzy_score, rank_key, trigrams)
+from .stats import CatalogueStatistics
+from .storage import LazyList
+from .suggest import SuggestionIndex
+
+MAGIC = b'KUCAT\x00\x00\x01'
+FORMAT_VERSION = 1
+_HEADER = struct.Struct('<8sI')     # magic, number of sections
+_SECTION = struct.Struct('<32sQQ')  # name, offset and length in bytes
+_ALIGNMENT = 8
+_UINT32 = 'I' if array.array('I').itemsize == 4 else 'L'
+
+# Name uses pack (level code, entity id) into one uint32
+_LEVEL_SHIFT = 30
+_ENTITY_MASK = (1 << _LEVEL_SHIFT) - 1
+
+# Sections holding bytes; all others are uint32 columns
+_BLOB_SECTIONS = ('strings', 'folded', 'grams', 'statistics_json', 'meta_json')
+SECTIONS = (
+    'strings', 'string_offsets',                        # sorted UTF-8 string table
+    'folded', 'folded_offsets',                         # " fold(string) " + "\n", per string
+    'name_use_offsets', 'name_uses',                    # string -> (level, entity) codes
+    'university_names', 'university_cities',
+    'university_faculty_offsets', 'university_faculties',
+    'faculty_names', 'faculty_department_offsets', 'faculty_departments',
+    'department_names', 'department_subject_offsets', 'department_subjects',
+    'faculty_university_offsets', 'faculty_universities',        # reverse links, with
+    'faculty_university_positions',                              # the child's index
+    'department_faculty_offsets', 'department_faculties',        # in each parent
+    'department_faculty_positions',
+    'grams', 'gram_offsets', 'gram_posting_offsets', 'gram_postings',  # trigram -> strings
+    'name_gram_counts',                                 # trigrams per searchable string
+    'statistics_json', 'meta_json',
+)
+
+def _uint32(values):
+    column = array.array(_UINT32, values)
+    if sys.byteorder != 'little':
+        column.byteswap()
+    return column.tobytes()
+
+def _csr(rows):
+    """(offsets, values) columns of a list of lists."""
+    offsets = [0]
+    values = []
+    for row in rows:
+        values.extend(row)
+        offsets.append(len(values))
+    return _uint32(offsets), _uint32(values)
+
+def _string_table(strings):
+    """(offsets, UTF-8 bytes) columns of a list of strings."""
+    encoded = [string.encode('utf-8') for string in strings]
+    offsets = [0]
+    for data in encoded:
+        offsets.append(offsets[-1] + len(data))
+    return _uint32(offsets), b''.join(encoded)
+
+def _compile_sections(universities, meta):
+    """Encode a catalogue as {section name: bytes}."""
+    universities = list(universities)
+    faculty_ids, faculties = {}, []
+    department_ids, departments = {}, []
+    for uni in universities:
+        for faculty in uni.faculties:
+            if id(faculty) in faculty_ids:
+                continue
+            faculty_ids[id(faculty)] = len(faculties)
+            faculties.append(faculty)
+            for dept in faculty.departments:
+                if id(dept) not in department_ids:
+                    department_ids[id(dept)] = len(departments)
+                    departments.append(dept)
+    if max(len(universities), len(faculties), len(departments)) > _ENTITY_MASK:
+        raise ValueError("catalogue too large for the columnar format")
+
+    strings = sorted({uni.name for uni in universities} | {uni.city for uni in universities}
+                     | {faculty.name for faculty in faculties}
+                     | {dept.name for dept in departments}
+                     | {subject for dept in departments for subject in dept.subjects})
+    string_ids = {string: number for number, string in enumerate(strings)}
+
+    uses = [[] for _ in strings]
+    for number, uni in enumerate(universities):
+        uses[string_ids[uni.name]].append(number)
+    for number, faculty in enumerate(faculties):
+        uses[string_ids[faculty.name]].append(1 << _LEVEL_SHIFT | number)
+    for number, dept in enumerate(departments):
+        uses[string_ids[dept.name]].append(2 << _LEVEL_SHIFT | number)
+        for subject in dict.fromkeys(dept.subjects):
+            # A subject is found through the departments teaching it
+            uses[string_ids[subject]].append(3 << _LEVEL_SHIFT | number)
+
+    faculty_universities = [[] for _ in faculties]
+    faculty_positions = [[] for _ in faculties]
+    for number, uni in enumerate(universities):
+        for position, faculty in enumerate(uni.faculties):
+            faculty_universities[faculty_ids[id(faculty)]].append(number)
+            faculty_positions[faculty_ids[id(faculty)]].append(position)
+    department_faculties = [[] for _ in departments]
+    department_positions = [[] for _ in departments]
+    for number, faculty in enumerate(faculties):
+        for position, dept in enumerate(faculty.departments):
+            department_faculties[department_ids[id(dept)]].append(number)
+            department_positions[department_ids[id(dept)]].append(position)
+
+    folded = [fold(string) for string in strings]
+    postings = {}
+    gram_counts = []
+    for number, name in enumerate(folded):
+        name_grams = trigrams(name) if uses[number] else ()
+        gram_counts.append(len(name_grams))
+        for gram in name_grams:
+            postings.setdefault(gram, []).append(number)
+    grams = sorted(postings)
+
+    stats = CatalogueStatistics()
+    for uni in universities:
+        stats.add_university(uni)
+
+    sections = {}
+    sections['string_offsets'], sections['strings'] = _string_table(strings)
+    sections['folded_offsets'], sections['folded'] = _string_table(
+        f" {name} \n" for name in folded)
+    sections['name_use_offsets'], sections['name_uses'] = _csr(uses)
+    sections['university_names'] = _uint32(string_ids[uni.name] for uni in universities)
+    sections['university_cities'] = _uint32(string_ids[uni.city] for uni in universities)
+    sections['university_faculty_offsets'], sections['university_faculties'] = _csr(
+        [faculty_ids[id(faculty)] for faculty in uni.faculties] for uni in universities)
+    sections['faculty_names'] = _uint32(string_ids[faculty.name] for faculty in faculties)
+    sections['faculty_department_offsets'], sections['faculty_departments'] = _csr(
+        [department_ids[id(dept)] for dept in faculty.departments] for faculty in faculties)
+    sections['department_names'] = _uint32(string_ids[dept.name] for dept in departments)
+    sections['department_subject_offsets'], sections['department_subjects'] = _csr(
+        [string_ids[subject] for subject in dept.subjects] for dept in departments)
+    sections['faculty_university_offsets'], sections['faculty_universities'] = _csr(
+        faculty_universities)
+    sections['faculty_university_positions'] = _csr(faculty_positions)[1]
+    sections['department_faculty_offsets'], sections['department_faculties'] = _csr(
+        department_faculties)
+    sections['department_faculty_positions'] = _csr(department_positions)[1]
+    sections['gram_offsets'], sections['grams'] = _string_table(grams)
+    sections['gram_posting_offsets'], sections['gram_postings'] = _csr(
+        postings[gram] for gram in grams)
+    sections['name_gram_counts'] = _uint32(gram_counts)
+    sections['statistics_json'] = json.dumps(stats.statistics(),
+                                             ensure_ascii=False).encode('utf-8')
+    sections['meta_json'] = json.dumps(dict(meta, format=FORMAT_VERSION,
+                                       created=datetime.now().isoformat())).encode('utf-8')
+    return {name: sections[name] for name in SECTIONS}
+
+def _aligned(offset):
+    return -(-offset // _ALIGNMENT) * _ALIGNMENT
+
+def write_columnar(universities, path, meta=None):
+    """Compile universities into a .kuc file at path.
+
+    The file is written beside path and moved over it when complete, so
+    processes that still have the old file mapped keep reading the old data.
+    """
+    sections = _compile_sections(universities, meta or {})
+    offset = _aligned(_HEADER.size + len(sections) * _SECTION.size)
+    directory = []
+    for name, data in sections.items():
+        directory.append((name, offset, len(data)))
+        offset = _aligned(offset + len(data))
+
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    try:
+        with open(tmp_path, 'wb') as f:
+            f.write(_HEADER.pack(MAGIC, len(sections)))
+            for name, offset, length in directory:
+                f.write(_SECTION.pack(name.encode('ascii'), offset, length))
+            for (name, offset, length), data in zip(directory, sections.values()):
+                f.write(b'\0' * (offset - f.tell()))
+                f.write(data)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    return path
+
+class MappedUniversity(University):
+    """A university whose name, city and faculties are read from a mapped .kuc file."""
+
+    __slots__ = ('_catalogue', '_id', '_faculties')
+
+    def __init__(self, catalogue, university_id):
+        self._catalogue = catalogue
+        self._id = university_id
+        self._faculties = None
+
+    @property
+    def name(self):
+        return self._catalogue.string(self._catalogue.university_names[self._id])
+
+    @property
+    def city(self):
+        return self._catalogue.string(self._catalogue.university_cities[self._id])
+
+    @property
+    def faculties(self):
+        if self._faculties is None:
+            catalogue, offsets = self._catalogue, self._catalogue.university_faculty_offsets
+            start, end = offsets[self._id], offsets[self._id + 1]
+            self._faculties = LazyList(end - start, lambda: [
+                catalogue.faculty(faculty_id)
+                for faculty_id in catalogue.university_faculties[start:end]])
+        return self._faculties
+
+class MappedFaculty(Faculty):
+    """A faculty whose name and departments are read from a mapped .kuc file."""
+
+    __slots__ = ('_catalogue', '_id', '_departments')
+
+    def __init__(self, catalogue, faculty_id):
+        self._catalogue = catalogue
+        self._id = faculty_id
+        self._departments = None
+
+    @property
+    def name(self):
+        return self._catalogue.string(self._catalogue.faculty_names[self._id])
+
+    @property
+    def departments(self):
+        if self._departments is None:
+            catalogue, offsets = self._catalogue, self._catalogue.faculty_department_offsets
+            start, end = offsets[self._id], offsets[self._id + 1]
+            self._departments = LazyList(end - start, lambda: [
+                catalogue.department(department_id)
+                for department_id in catalogue.faculty_departments[start:end]])
+        return self._departments
+
+class MappedDepartment(Department):
+    """A department whose name and subjects are read from a mapped .kuc file."""
+
+    __slots__ = ('_catalogue', '_id')
+
+    def __init__(self, catalogue, department_id):
+        self._catalogue = catalogue
+        self._id = department_id
+
+    @property
+    def name(self):
+        return self._catalogue.string(self._catalogue.department_names[self._id])
+
+    @property
+    def subjects(self):
+        """The subject names, decoded into a new list on every access."""
+        catalogue, offsets = self._catalogue, self._catalogue.department_subject_offsets
+        return [catalogue.string(subject_id) for subject_id in
+                catalogue.department_subjects[offsets[self._id]:offsets[self._id + 1]]]
+
+class ColumnarCatalogue:
+    """Read access to a memory-mapped .kuc file.
+
+    Each section is exposed as an attribute: a memoryview of bytes for blobs
+    and of uint32 for columns, both straight over the mapping. Entities are
+    created on first use and kept, so the same faculty is always the same
+    object.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, 'rb') as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        self._views = []
+        try:
+            self._map_sections()
+        except (ValueError, TypeError, struct.error):
+            self.close()
+            raise
+        self._faculties = {}
+        self._departments = {}
+        self.universities = [MappedUniversity(self, number)
+                             for number in range(len(self.university_names))]
+        self._statistics = None
+
+    def _map_sections(self):
+        magic, count = _HEADER.unpack_from(self._mmap, 0)
+        if magic != MAGIC:
+            raise ValueError(f"{self.path} is not a compiled catalogue")
+        buffer = memoryview(self._mmap)
+        self._views.append(buffer)
+        sections = {}
+        for number in range(count):
+            name, offset, length = _SECTION.unpack_from(self._mmap,
+                                                        _HEADER.size + number * _SECTION.size)
+            if offset + length > len(self._mmap):
+                raise ValueError(f"{self.path} is truncated")
+            sections[name.rstrip(b'\0').decode('ascii')] = (offset, length)
+        missing = [name for name in SECTIONS if name not in sections]
+        if missing:
+            raise ValueError(f"{self.path} lacks section(s) {', '.join(missing)}")
+
+        for name in SECTIONS:
+            offset, length = sections[name]
+            view = buffer[offset:offset + length]
+            self._views.append(view)
+            if name not in _BLOB_SECTIONS:
+                if sys.byteorder == 'little':
+                    view = view.cast(_UINT32)
+                    self._views.append(view)
+                else:
+                    # Big-endian hosts get a private, byte-swapped copy
+                    column = array.array(_UINT32, view)
+                    column.byteswap()
+                    view = memoryview(column)
+            setattr(self, name, view)
+        self._folded_start = sections['folded'][0]
+        self._folded_end = self._folded_start + sections['folded'][1]
+
+    def close(self):
+        """Unmap the file; the catalogue and its entities are unusable afterwards."""
+        for view in reversed(self._views):
+            try:
+                view.release()
+            except BufferError:
+                pass
+        self._views = []
+        try:
+            self._mmap.close()
+        except BufferError:
+            # A slice of a section is still referenced somewhere; the mapping
+            # goes away once that is garbage collected
+            pass
+
+    @property
+    def meta(self):
+        """What the file was compiled from, and when."""
+        return json.loads(str(self.meta_json, 'utf-8'))
+
+    def statistics(self):
+        if self._statistics is None:
+            statistics = json.loads(str(self.statistics_json, 'utf-8'))
+            # JSON has no tuples; give back (name, count) pairs like the other backends
+            statistics['largest'] = [tuple(pair) for pair in statistics['largest']]
+            self._statistics = statistics
+        return self._statistics
+
+    def string(self, string_id):
+        offsets = self.string_offsets
+        return str(self.strings[offsets[string_id]:offsets[string_id + 1]], 'utf-8')
+
+    def folded_name(self, string_id):
+        offsets = self.folded_offsets
+        return str(self.folded[offsets[string_id]:offsets[string_id + 1]], 'utf-8').strip()
+
+    @staticmethod
+    def _lookup(blob, offsets, text):
+        """Index of text in a sorted string table, or None."""
+        low, high = 0, len(offsets) - 1
+        while low < high:
+            middle = (low + high) // 2
+            if str(blob[offsets[middle]:offsets[middle + 1]], 'utf-8') < text:
+                low = middle + 1
+            else:
+                high = middle
+        if low < len(offsets) - 1 and str(blob[offsets[low]:offsets[low + 1]], 'utf-8') == text:
+            return low
+        return None
+
+    def string_id(self, text):
+        return self._lookup(self.strings, self.string_offsets, text)
+
+    def postings(self, gram):
+        """Ids of the searchable strings containing a trigram."""
+        number = self._lookup(self.grams, self.gram_offsets, gram)
+        if number is None:
+            return ()
+        offsets = self.gram_posting_offsets
+        return self.gram_postings[offsets[number]:offsets[number + 1]]
+
+    def uses(self, string_id):
+        """(level code << 30 | entity id) of every entity carrying a name."""
+        offsets = self.name_use_offsets
+        return self.name_uses[offsets[string_id]:offsets[string_id + 1]]
+
+    def faculty(self, faculty_id):
+        faculty = self._faculties.get(faculty_id)
+        if faculty is None:
+            faculty = self._faculties.setdefault(faculty_id, MappedFaculty(self, faculty_id))
+        return faculty
+
+    def department(self, department_id):
+        department = self._departments.get(department_id)
+        if department is None:
+            department = self._departments.setdefault(department_id,
+                                                      MappedDepartment(self, department_id))
+        return department
+
+    def find(self, needle, start=0):
+        """Offset of needle (bytes) in the folded names section, or -1."""
+        position = self._mmap.find(needle, self._folded_start + start, self._folded_end)
+        return position - self._folded_start if position >= 0 else -1
+
+def read_columnar(path):
+    """Reader for .kuc files: decode the whole catalogue into plain model objects."""
+    catalogue = ColumnarCatalogue(path)
+    try:
+        faculties = {}
+        departments = {}
+
+        def copy_faculty(faculty):
+            copy = faculties.get(faculty._id)
+            if copy is None:
+                copy = faculties[faculty._id] = Faculty(faculty.name, [
+                    copy_department(dept) for dept in faculty.departments])
+            return copy
+
+        def copy_department(dept):
+            copy = departments.get(dept._id)
+            if copy is None:
+                copy = departments[dept._id] = Department(dept.name, dept.subjects)
+            return copy
+
+        return [University(uni.name, uni.city, [copy_faculty(faculty) for faculty in uni.faculties])
+                for uni in catalogue.universities]
+    finally:
+        # Drop the entities so no slice of the mapping outlives it
+        catalogue._faculties.clear()
+        catalogue._departments.clear()
+        catalogue.universities = []
+        catalogue.close()
+
+CatalogueLoader.register_reader(('.kuc',), read_columnar)
+
+class MappedDataManager:
+    """Read-only catalogue backend over a memory-mapped .kuc file.
+
+    Opening maps the file and creates one small object per university; names
+    are decoded on access and faculties and departments are created the first
+    time they are reached. Search scans the folded names section (mmap.find
+    runs in C) and scores typos with the stored trigram index, statistics come
+    precomputed. The interface mirrors UniversityDataManager apart from
+    editing.
+    """
+
+    LEVELS = SearchIndex.LEVELS
+
+    def __init__(self, path, data_source=None):
+        self.path = path
+        self.data_source = data_source
+        self.catalogue = ColumnarCatalogue(path)
+        self.universities = self.catalogue.universities
+        self.version = 0
+        self._by_city = None
+        self._facets = None
+        self._offerings = None
+        self._comparisons = None
+        self._suggestions = None
+
+    @classmethod
+    def from_source(cls, data_source=None, store_path=None, loader=None):
+        """Open a .kuc data source in place, or compile any other source into store_path.
+
+        store_path defaults to a cache file of the source's own, so compiling one
+        source never replaces the file another process has mapped for another.
+        The compiled file is reused until the source's content changes; like the
+        loader snapshots, the source is only hashed when its mtime or size differ
+        from the ones recorded in the file.
+        """
+        loader = loader or CatalogueLoader()
+        if data_source and CatalogueLoader.reader_for(data_source) == read_columnar:
+            return cls(data_source, data_source=data_source)
+
+        if store_path is None:
+            store_path = loader.store_path(data_source, ".kuc")
+        os.makedirs(os.path.dirname(os.path.abspath(store_path)), exist_ok=True)
+        try:
+            manager = cls(store_path, data_source=data_source)
+        except (OSError, ValueError):
+            manager = None
+        if manager is None:
+            stamp, _ = loader.source_stamp(data_source)
+        else:
+            recorded = manager.catalogue.meta
+            stamp, current = loader.source_stamp(data_source, recorded)
+            if current and all(recorded.get(key) == value for key, value in stamp.items()):
+                return manager
+            # Changed, or the same content with a new mtime: recompile to record the stamp
+            manager.close()
+
+        if data_source:
+            universities = loader.load(data_source)
+        else:
+            universities = UniversityDataManager.initialize_data()
+        write_columnar(universities, store_path, meta=stamp)
+        return cls(store_path, data_source=data_source)
+
+    def reopen(self, loader=None):
+        """Return a new manager over the current content of data_source.
+
+        A recompiled file replaces the old one atomically, so this manager keeps
+        its mapping of the old data until it is closed.
+        """
+        if self.path == self.data_source:
+            return type(self)(self.path, data_source=self.data_source)
+        return type(self).from_source(self.data_source, store_path=self.path, loader=loader)
+
+    def close(self):
+        self.catalogue.close()
+
+    def universities_in_city(self, city):
+        """Return the universities located in a city, in catalogue order."""
+        if self._by_city is None:
+            by_city = {}
+            for uni, city_id in zip(self.universities, self.catalogue.university_cities):
+                by_city.setdefault(city_id, []).append(uni)
+            self._by_city = by_city
+        return list(self._by_city.get(self.catalogue.string_id(city), ()))
+
+    def find_universities(self, name):
+        """Return every university with the given name."""
+        string_id = self.catalogue.string_id(name)
+        if string_id is None:
+            return []
+        return [self.universities[code] for code in self.catalogue.uses(string_id)
+                if code >> _LEVEL_SHIFT == 0]
+
+    def find_university(self, name):
+        """Return the first university with the given name, or None."""
+        universities = self.find_universities(name)
+        return universities[0] if universities else None
+
+    def statistics(self):
+        """Return catalogue-wide totals, per-city counts and the five largest universities."""
+        return self.catalogue.statistics()
+
+    def _names_by_university(self):
+        """(university, faculty names, department names, subject names) of every university.
+
+        Read from the id columns; each distinct string is decoded once.
+        """
+        catalogue = self.catalogue
+        string = functools.lru_cache(maxsize=None)(catalogue.string)
+        faculty_offsets, faculty_ids = (catalogue.university_faculty_offsets,
+                                        catalogue.university_faculties)
+        department_offsets, department_ids = (catalogue.faculty_department_offsets,
+                                              catalogue.faculty_departments)
+        subject_offsets, subject_ids = (catalogue.department_subject_offsets,
+                                        catalogue.department_subjects)
+        for uni_id, university in enumerate(self.universities):
+            faculties = faculty_ids[faculty_offsets[uni_id]:faculty_offsets[uni_id + 1]]
+            departments = {dept for faculty in faculties for dept in
+                           department_ids[department_offsets[faculty]:
+                                          department_offsets[faculty + 1]]}
+            subjects = {subject for dept in departments for subject in
+                        subject_ids[subject_offsets[dept]:subject_offsets[dept + 1]]}
+            yield (university,
+                   {string(catalogue.faculty_names[faculty]) for faculty in faculties},
+                   {string(catalogue.department_names[dept]) for dept in departments},
+                   [string(subject) for subject in subjects])
+
+    def facet_index(self):
+        """Return the FacetIndex of the catalogue, built from the id columns on first use."""
+        if self._facets is not None:
+            return self._facets
+        facets = FacetIndex()
+        for university, fields, departments, subjects in self._names_by_university():
+            facets.add(university, university.city, fields, departments, subjects)
+        self._facets = facets
+        return facets
+
+    def comparison_index(self):
+        """Return the ComparisonIndex of the catalogue, built from the id columns on first use."""
+        if self._comparisons is not None:
+            return self._comparisons
+        comparisons = ComparisonIndex()
+        for university, fields, departments, subjects in self._names_by_university():
+            comparisons.add(university, fields, departments, subjects)
+        self._comparisons = comparisons
+        return comparisons
+
+    def suggestion_index(self):
+        """Return the SuggestionIndex of the catalogue, built from the id columns on first use."""
+        if self._suggestions is not None:
+            return self._suggestions
+        suggestions = SuggestionIndex()
+        for university, fields, departments, subjects in self._names_by_university():
+            suggestions.add(university, fields, departments, subjects)
+        self._suggestions = suggestions
+        return suggestions
+
+    def offering_index(self):
+        """Return the OfferingIndex of the catalogue, built from the id columns on first use."""
+        if self._offerings is not None:
+            return self._offerings
+        catalogue = self.catalogue
+        string = functools.lru_cache(maxsize=None)(catalogue.string)
+        faculty_offsets, faculty_ids = (catalogue.university_faculty_offsets,
+                                        catalogue.university_faculties)
+        department_offsets, department_ids = (catalogue.faculty_department_offsets,
+                                              catalogue.faculty_departments)
+        subject_offsets, subject_ids = (catalogue.department_subject_offsets,
+                                        catalogue.department_subjects)
+        subjects_of = {}
+        offerings = OfferingIndex()
+        for uni_id, university in enumerate(self.universities):
+            pairs = []
+            faculties = faculty_ids[faculty_offsets[uni_id]:faculty_offsets[uni_id + 1]]
+            for fi, faculty in enumerate(faculties):
+                faculty_name = string(catalogue.faculty_names[faculty])
+                departments = department_ids[department_offsets[faculty]:
+                                             department_offsets[faculty + 1]]
+                for di, dept in enumerate(departments):
+                    subjects = subjects_of.get(dept)
+                    if subjects is None:
+                        subjects = subjects_of[dept] = [
+                            string(subject) for subject in
+                            subject_ids[subject_offsets[dept]:subject_offsets[dept + 1]]]
+                    pairs.append((Offering(university, faculty_name,
+                                           string(catalogue.department_names[dept]), fi, di),
+                                  subjects))
+            offerings.add(university, pairs)
+        self._offerings = offerings
+        return offerings
+
+    # Search
+
+    def _name_hits(self, needle, cancel_event=None):
+        """Ids of the searchable names whose padded folded form contains needle."""
+        catalogue = self.catalogue
+        offsets, use_offsets = catalogue.folded_offsets, catalogue.name_use_offsets
+        hits = []
+        position = catalogue.find(needle)
+        while position >= 0:
+            if cancel_event is not None and len(hits) % 256 == 0 and cancel_event.is_set():
+                raise SearchCancelled(needle)
+            string_id = bisect.bisect_right(offsets, position) - 1
+            if use_offsets[string_id + 1] > use_offsets[string_id]:
+                hits.append(string_id)
+            position = catalogue.find(needle, offsets[string_id + 1])
+        return hits
+
+    def _matches(self, string_id, memo):
+        """(university id, level code, position, SearchMatch) for every use of a name.
+        
+        memo caches decoded context names across the calls of one search.
+        """
+        catalogue = self.catalogue
+        universities = self.universities
+        offsets = catalogue.faculty_university_offsets
+        department_offsets = catalogue.department_faculty_offsets
+        name = catalogue.string(string_id)
+
+        def in_universities(faculty_id):
+            # (university id, index among its faculties) of every place a faculty is listed
+            start, end = offsets[faculty_id], offsets[faculty_id + 1]
+            return zip(catalogue.faculty_universities[start:end],
+                       catalogue.faculty_university_positions[start:end])
+
+        def in_faculties(department_id):
+            start, end = department_offsets[department_id], department_offsets[department_id + 1]
+            return zip(catalogue.department_faculties[start:end],
+                       catalogue.department_faculty_positions[start:end])
+
+        def name_of(names, entity):
+            key = (names, entity)
+            if key not in memo:
+                memo[key] = catalogue.string(getattr(catalogue, names)[entity])
+            return memo[key]
+
+        matches = []
+        for code in catalogue.uses(string_id):
+            level, entity = code >> _LEVEL_SHIFT, code & _ENTITY_MASK
+            if level == 0:
+                uni = universities[entity]
+                matches.append((entity, 0, (), SearchMatch(uni, 'university', name)))
+            elif level == 1:
+                for uni_id, fi in in_universities(entity):
+                    context = name_of('university_names', uni_id)
+                    matches.append((uni_id, 1, (fi,), SearchMatch(
+                        universities[uni_id], 'faculty', name, context)))
+            else:
+                if level == 2:
+                    positions = [()]
+                else:
+                    subject_offsets = catalogue.department_subject_offsets
+                    subjects = catalogue.department_subjects[
+                        subject_offsets[entity]:subject_offsets[entity + 1]]
+                    positions = [(si,) for si, subject_id in enumerate(subjects)
+                                 if subject_id == string_id]
+                    context = name_of('department_names', entity)
+                for faculty_id, di in in_faculties(entity):
+                    if level == 2:
+                        context = name_of('faculty_names', faculty_id)
+                    for uni_id, fi in in_universities(faculty_id):
+                        for position in positions:
+                            matches.append((uni_id, level, (fi, di) + position, SearchMatch(
+                                universities[uni_id], self.LEVELS[level], name, context)))
+        return matches
+
+    def search(self, search_term, cancel_event=None):
+        """Return SearchMatch objects for every name containing the term; see SearchIndex.search."""
+        term = fold(search_term)
+        if not term:
+            return []
+        matches = []
+        memo = {}
+        for string_id in self._name_hits(term.encode('utf-8'), cancel_event):
+            matches.extend(self._matches(string_id, memo))
+        matches.sort(key=lambda entry: entry[:3])
+        return [entry[3] for entry in matches]
+
+    def _fuzzy_scores(self, term, cancel_event):
+        """Scores of the names sharing enough trigrams with term; see SearchIndex._fuzzy_scores."""
+        catalogue = self.catalogue
+        postings = {gram: catalogue.postings(gram) for gram in trigrams(term)}
+        grams = sorted(postings, key=lambda gram: len(postings[gram]))
+        needed = max(2, math.ceil(SearchIndex.FUZZY_THRESHOLD * len(grams)))
+        if needed > len(grams):
+            return {}
+        probe = len(grams) - needed + 1
+        shared = Counter()
+        for gram in grams[:probe]:
+            shared.update(postings[gram])
+        for gram in grams[probe:]:
+            if cancel_event is not None and cancel_event.is_set():
+                raise SearchCancelled(term)
+            posting = postings[gram]
+            if len(posting) < 16 * len(shared):
+                shared.update(shared.keys() & set(posting))
+                continue
+            # Postings are sorted: probe the few candidates by binary search instead
+            for string_id in list(shared):
+                index = bisect.bisect_left(posting, string_id)
+                if index < len(posting) and posting[index] == string_id:
+                    shared[string_id] += 1
+        gram_counts = catalogue.name_gram_counts
+        return {
+            string_id: fuzzy_score(count, len(grams), gram_counts[string_id])
+            for string_id, count in shared.items() if count >= needed
+        }
+
+    def ranked_search(self, search_term, limit=50, cancel_event=None):
+        """Best matches, tolerating typos and missing diacritics; see SearchIndex.ranked_search."""
+        term = fold(search_term)
+        if not term or limit <= 0:
+            return []
+
+        # Padded names let short terms match at word starts only
+        needle = (term if len(term) >= 3 else ' ' + term).encode('utf-8')
+        scores = {string_id: (True, exact_score(term, self.catalogue.folded_name(string_id)))
+                  for string_id in self._name_hits(needle, cancel_event)}
+        if len(term) >= 3 and len(scores) < limit:
+            for string_id, score in self._fuzzy_scores(term, cancel_event).items():
+                scores.setdefault(string_id, (False, score))
+
+        results = []
+        memo = {}
+        folded_name = self.catalogue.folded_name
+        best = heapq.nsmallest(limit, scores,
+                               key=lambda s: (rank_key(*scores[s], folded_name(s)), s))
+        for string_id in best:
+            matches = sorted(self._matches(string_id, memo),
+                             key=lambda entry: (entry[1], entry[0], entry[2]))
+            for *_, match in matches[:limit - len(results)]:
+                match.score = round(scores[string_id][1], 3)
+                results.append(match)
+            if len(results) >= limit:
+                break
+        return results
@@ -0,0 +1,158 @@
+"""
+Side-by-side comparison of universities by what they offer.
+
+Every faculty, department and subject name gets an integer id once, and each
+university keeps a frozenset of ids per level. Shared and unique offerings and
+Jaccard similarities are then set operations on small ints instead of walks
+over faculty and department objects, and subject postings (id -> the
+universities offering it) let most_similar() score only the universities that
+share something with the one asked about.
+"""
+
+import heapq
+from collections import Counter
+
+class Comparison:
+    """What a group of universities share and what only one of them offers.
+
+    counts maps each level to how many distinct names each university offers,
+    shared to the names every university offers and unique to one list of names
+    per university that none of the others offer; similarity is the Jaccard
+    overlap of the whole group. pairs lists (i, j, {level: jaccard}) for every
+    pair of universities by position.
+    """
+
+    def __init__(self, universities, counts, shared, unique, similarity, pairs):
+        self.universities = universities
+        self.counts = counts
+        self.shared = shared
+        self.unique = unique
+        self.similarity = similarity
+        self.pairs = pairs
+
+    def to_dict(self):
+        return {
+            'universities': [
+                dict({'name': uni.name, 'city': uni.city},
+                     **{level: self.counts[level][i] for level in self.counts})
+                for i, uni in enumerate(self.universities)
+            ],
+            'similarity': {level: round(score, 4) for level, score in self.similarity.items()},
+            'shared': self.shared,
+            'unique': [{level: self.unique[level][i] for level in self.unique}
+                       for i in range(len(self.universities))],
+            'pairs': [{'a': i, 'b': j,
+                       'similarity': {level: round(score, 4) for level, score in scores.items()}}
+                      for i, j, scores in self.pairs],
+        }
+
+def jaccard(a, b):
+    union = len(a | b)
+    return len(a & b) / union if union else 0.0
+
+class ComparisonIndex:
+    """Per-university id sets of faculty, department and subject names.
+
+    Faculties and departments are compared by name, like the facet filters,
+    so the same faculty offered by two universities counts as shared. Ids are
+    never reused, so sets stay comparable as universities come and go.
+    """
+
+    LEVELS = ('faculty', 'department', 'subject')
+
+    def __init__(self):
+        self._ids = {level: {} for level in self.LEVELS}    # level -> name -> id
+        self._names = {level: [] for level in self.LEVELS}  # level -> id -> name
+        self.profiles = {}  # university -> (faculty ids, department ids, subject ids)
+        self._holders = {}  # subject id -> set of universities offering it
+        self._order = {}    # university -> insertion sequence, for stable tie-breaks
+        self._sequence = 0
+
+    def __len__(self):
+        return len(self.profiles)
+
+    def _intern(self, level, names):
+        ids, known = self._ids[level], self._names[level]
+        found = set()
+        for name in names:
+            number = ids.get(name)
+            if number is None:
+                number = ids[name] = len(known)
+                known.append(name)
+            found.add(number)
+        return frozenset(found)
+
+    def add(self, university, faculties, departments, subjects):
+        """Index a university's offerings by name; re-adding one re-indexes it."""
+        if university in self._order:
+            self._unindex(university)
+        else:
+            self._order[university] = self._sequence
+            self._sequence += 1
+        profile = (self._intern('faculty', faculties), self._intern('department', departments),
+                   self._intern('subject', subjects))
+        self.profiles[university] = profile
+        for subject in profile[2]:
+            holders = self._holders.get(subject)
+            if holders is None:
+                holders = self._holders[subject] = set()
+            holders.add(university)
+
+    def add_university(self, university):
+        faculties = list(university.faculties)
+        departments = [dept for faculty in faculties for dept in faculty.departments]
+        self.add(university, [faculty.name for faculty in faculties],
+                 [dept.name for dept in departments],
+                 [subject for dept in departments for subject in dept.subjects])
+
+    def remove_university(self, university):
+        if self._order.pop(university, None) is not None:
+            self._unindex(university)
+
+    def _unindex(self, university):
+        for subject in self.profiles.pop(university)[2]:
+            holders = self._holders[subject]
+            holders.discard(university)
+            if not holders:
+                del self._holders[subject]
+
+    def _sorted_names(self, level, ids):
+        names = self._names[level]
+        return sorted((names[number] for number in ids), key=str.casefold)
+
+    def compare(self, universities):
+        """Compare two or more indexed universities; returns a Comparison."""
+        universities = list(universities)
+        profiles = [self.profiles[uni] for uni in universities]
+        counts, shared, unique, similarity = {}, {}, {}, {}
+        for position, level in enumerate(self.LEVELS):
+            sets = [profile[position] for profile in profiles]
+            counts[level] = [len(ids) for ids in sets]
+            common = frozenset.intersection(*sets)
+            everything = frozenset.union(*sets)
+            shared[level] = self._sorted_names(level, common)
+            similarity[level] = len(common) / len(everything) if everything else 0.0
+            # Offered by exactly one university of the group
+            offered = Counter(number for ids in sets for number in ids)
+            unique[level] = [self._sorted_names(level, [n for n in ids if offered[n] == 1])
+                             for ids in sets]
+        pairs = [(i, j, {level: jaccard(profiles[i][position], profiles[j][position])
+                         for position, level in enumerate(self.LEVELS)})
+                 for i in range(len(profiles)) for j in range(i + 1, len(profiles))]
+        return Comparison(universities, counts, shared, unique, similarity, pairs)
+
+    def most_similar(self, university, n=10):
+        """The n universities whose subjects overlap most with university's.
+
+        Returns (university, jaccard, shared subjects) tuples, best first, ties
+        in catalogue order. Only universities sharing a subject are scored.
+        """
+        subjects = self.profiles[university][2]
+        shared = Counter()
+        for subject in subjects:
+            shared.update(self._holders[subject])
+        del shared[university]
+        order = self._order
+        scores = ((uni, count / (len(subjects) + len(self.profiles[uni][2]) - count), count)
+                  for uni, count in shared.items())
+        return heapq.nsmallest(n, scores, key=lambda entry: (-entry[1], order[entry[0]]))
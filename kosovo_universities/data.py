@@ -0,0 +1,333 @@
+"""
+In-memory catalogue backend and the built-in university data.
+"""
+
+from .compare import ComparisonIndex
+from .facets import FacetIndex
+from .loader import CatalogueLoader
+from .models import QYTETET, CatalogueInterner, Department, Faculty, University
+from .offerings import OfferingIndex
+from .search import SearchIndex
+from .stats import CatalogueStatistics
+from .suggest import SuggestionIndex
+
+class UniversityDataManager:
+    """Manages university data initialization and operations."""
+    
+    def __init__(self, universities=None, data_source=None):
+        if universities is None:
+            universities = self.initialize_data()
+        self.interner = CatalogueInterner()
+        self.universities = self.interner.normalize(universities)
+        self.data_source = data_source
+        # Bumped on every change so caches of derived data know when they are stale
+        self.version = 0
+        
+        # Build the lookup maps and the search index once, then keep them in
+        # step with every change
+        self._by_name = {}
+        self._by_city = {}
+        self._keys = {}
+        self.search_index = SearchIndex()
+        self.stats = CatalogueStatistics()
+        self.facets = FacetIndex()
+        self.offerings = OfferingIndex()
+        self.comparisons = ComparisonIndex()
+        self.suggestions = SuggestionIndex()
+        self.indexes = [self.search_index, self.stats, self.facets, self.offerings,
+                        self.comparisons, self.suggestions]
+        for uni in self.universities:
+            self._index_university(uni)
+            for index in self.indexes:
+                index.add_university(uni)
+
+    @classmethod
+    def from_source(cls, data_source=None, loader=None):
+        """Create a manager from a data file, or from the built-in data if none is given."""
+        if not data_source:
+            return cls()
+        loader = loader or CatalogueLoader()
+        return cls(loader.load(data_source), data_source=data_source)
+
+    def reopen(self, loader=None):
+        """Return a new manager over the current content of data_source.
+        
+        This manager is left untouched, so it can keep serving while the new
+        one is parsed and indexed on another thread.
+        """
+        return type(self).from_source(self.data_source, loader=loader)
+
+    def _index_university(self, university):
+        self._keys[university] = (university.name, university.city)
+        self._by_name.setdefault(university.name, []).append(university)
+        self._by_city.setdefault(university.city, []).append(university)
+
+    def _unindex_university(self, university):
+        name, city = self._keys.pop(university)
+        for index, key in ((self._by_name, name), (self._by_city, city)):
+            bucket = index[key]
+            bucket.remove(university)
+            if not bucket:
+                del index[key]
+
+    def add_university(self, university):
+        """Add a university to the catalogue and index it."""
+        self.interner.university(university)
+        self.universities.append(university)
+        self._index_university(university)
+        for index in self.indexes:
+            index.add_university(university)
+        self.version += 1
+
+    def remove_university(self, university):
+        """Remove a university from the catalogue and the index."""
+        self.universities.remove(university)
+        self._unindex_university(university)
+        for index in self.indexes:
+            index.remove_university(university)
+        self.version += 1
+
+    def refresh_university(self, university):
+        """Re-index a university after its name, city, faculties or departments were edited."""
+        self.interner.university(university)
+        if self._keys.get(university) != (university.name, university.city):
+            self._unindex_university(university)
+            self._index_university(university)
+        for index in self.indexes:
+            # Indexes treat adding a known university as re-indexing it in place
+            index.add_university(university)
+        self.version += 1
+
+    def search(self, search_term, cancel_event=None):
+        """Search all names in the catalogue; see SearchIndex.search."""
+        return self.search_index.search(search_term, cancel_event)
+
+    def ranked_search(self, search_term, limit=50, cancel_event=None):
+        """Fuzzy, accent-insensitive search for the best matches; see SearchIndex.ranked_search."""
+        return self.search_index.ranked_search(search_term, limit, cancel_event)
+    
+    def universities_in_city(self, city):
+        """Return the universities located in a city, in catalogue order."""
+        return list(self._by_city.get(city, ()))
+
+    def find_universities(self, name):
+        """Return every university with the given name."""
+        return list(self._by_name.get(name, ()))
+
+    def find_university(self, name):
+        """Return the first university with the given name, or None."""
+        matches = self._by_name.get(name)
+        return matches[0] if matches else None
+
+    def statistics(self):
+        """Return catalogue-wide totals, per-city counts and the five largest universities."""
+        return self.stats.statistics()
+
+    def facet_index(self):
+        """Return the FacetIndex of the catalogue, kept up to date with every change."""
+        return self.facets
+
+    def offering_index(self):
+        """Return the OfferingIndex of the catalogue, kept up to date with every change."""
+        return self.offerings
+
+    def comparison_index(self):
+        """Return the ComparisonIndex of the catalogue, kept up to date with every change."""
+        return self.comparisons
+
+    def suggestion_index(self):
+        """Return the SuggestionIndex of the catalogue, kept up to date with every change."""
+        return self.suggestions
+    
+    @staticmethod
+    def initialize_data():
+        """Initialize all university data."""
+        
+        # Computer Science and Engineering Departments
+        dept_se = Department("Software Engineering", [
+            "Advanced Programming", "Data Structures", "Algorithms", 
+            "Web Development", "Software Engineering", "Database Systems"
+        ])
+        dept_cs = Department("Cybersecurity", [
+            "Network Security", "Cryptography", "Ethical Hacking", 
+            "Data Protection", "Digital Forensics"
+        ])
+        dept_it = Department("Information Technology", [
+            "Operating Systems", "Computer Networks", "Database Management",
+            "System Administration"
+        ])
+        dept_ai = Department("Artificial Intelligence", [
+            "Machine Learning", "Computer Vision", "Natural Language Processing",
+            "Neural Networks", "Deep Learning"
+        ])
+        dept_ce = Department("Computer Engineering", [
+            "Computer Architecture", "Embedded Systems", "System Programming",
+            "Hardware Design"
+        ])
+        
+        # Engineering Departments
+        dept_ee = Department("Electrical Engineering", [
+            "Electronics", "Control Systems", "Signals and Systems",
+            "Power Systems", "Telecommunications"
+        ])
+        dept_civil = Department("Civil Engineering", [
+            "Structural Engineering", "Hydraulic Engineering", "Geotechnics",
+            "Construction Management"
+        ])
+        dept_arch = Department("Architecture", [
+            "Architectural Design", "Building Structures", "Urban Planning",
+            "Interior Design"
+        ])
+        
+        # Business and Economics Departments
+        dept_finance = Department("Finance and Banking", [
+            "Corporate Finance", "Investment Analysis", "Banking and Insurance",
+            "Financial Markets"
+        ])
+        dept_management = Department("Management and Informatics", [
+            "Strategic Management", "Management Information Systems", 
+            "Digital Marketing", "Project Management"
+        ])
+        dept_accounting = Department("Accounting and Auditing", [
+            "Financial Accounting", "Management Accounting", "Auditing",
+            "Tax Planning"
+        ])
+        
+        # Law and Political Science
+        dept_law = Department("Law", [
+            "Constitutional Law", "Criminal Law", "Civil Law",
+            "International Law", "Commercial Law"
+        ])
+        dept_political = Department("Political Science", [
+            "International Relations", "Comparative Politics", 
+            "Public Administration", "Political Theory"
+        ])
+        
+        # Medical Sciences
+        dept_medicine = Department("General Medicine", [
+            "Anatomy", "Physiology", "Pharmacology", "Pathology",
+            "Internal Medicine", "Surgery"
+        ])
+        dept_dentistry = Department("Dentistry", [
+            "Dental Prosthetics", "Oral Surgery", "Orthodontics",
+            "Periodontics"
+        ])
+        dept_pharmacy = Department("Pharmacy", [
+            "Pharmaceutical Chemistry", "Pharmacology", 
+            "Pharmaceutical Technology", "Clinical Pharmacy"
+        ])
+        
+        # Liberal Arts and Sciences
+        dept_albanian_lit = Department("Albanian Language and Literature", [
+            "Albanian Literature", "Albanian Linguistics", "Literary Theory"
+        ])
+        dept_english_lit = Department("English Language and Literature", [
+            "English Literature", "Linguistics", "Translation Studies"
+        ])
+        dept_philosophy = Department("Philosophy", [
+            "History of Philosophy", "Ethics", "Logic", "Metaphysics"
+        ])
+        dept_psychology = Department("Psychology", [
+            "Developmental Psychology", "Cognitive Psychology", 
+            "Clinical Psychology", "Social Psychology"
+        ])
+        dept_math = Department("Mathematics", [
+            "Mathematical Analysis", "Algebra", "Statistics", "Applied Mathematics"
+        ])
+        dept_physics = Department("Physics", [
+            "Classical Physics", "Quantum Physics", "Thermodynamics",
+            "Electromagnetism"
+        ])
+        dept_chemistry = Department("Chemistry", [
+            "Analytical Chemistry", "Biochemistry", "Organic Chemistry",
+            "Inorganic Chemistry"
+        ])
+        dept_biology = Department("Biology", [
+            "Genetics", "Ecology", "Molecular Biology", "Botany", "Zoology"
+        ])
+        
+        # Education and Sports
+        dept_primary_ed = Department("Primary Education", [
+            "Pedagogy", "Didactics", "Child Psychology", "Curriculum Development"
+        ])
+        dept_preschool = Department("Preschool Education", [
+            "Child Psychology", "Teaching Methodology", "Early Childhood Development"
+        ])
+        dept_physical_ed = Department("Physical Education", [
+            "Exercise Physiology", "Sports Training", "Sports Psychology",
+            "Kinesiology"
+        ])
+        
+        # Agriculture and Veterinary
+        dept_agribusiness = Department("Agribusiness", [
+            "Agricultural Economics", "Agricultural Marketing", 
+            "Farm Management", "Rural Development"
+        ])
+        dept_veterinary = Department("Veterinary Medicine", [
+            "Veterinary Anatomy", "Veterinary Pathology", 
+            "Animal Health", "Veterinary Surgery"
+        ])
+        
+        # Arts and Design
+        dept_graphic_design = Department("Graphic Design", [
+            "Graphic Design", "Digital Illustration", "Typography",
+            "Brand Design"
+        ])
+        dept_music = Department("Musicology", [
+            "Music History", "Music Theory", "Composition", "Performance"
+        ])
+        
+        # Create Faculties
+        faculty_cse = Faculty("Faculty of Computer Science and Engineering", 
+                             [dept_se, dept_cs, dept_it, dept_ai, dept_ce])
+        faculty_eee = Faculty("Faculty of Electrical and Computer Engineering", 
+                             [dept_ee, dept_ce])
+        faculty_economics = Faculty("Faculty of Economics", 
+                                   [dept_finance, dept_management, dept_accounting])
+        faculty_law = Faculty("Faculty of Law", [dept_law, dept_political])
+        faculty_medicine = Faculty("Faculty of Medicine", 
+                                  [dept_medicine, dept_dentistry, dept_pharmacy])
+        faculty_architecture = Faculty("Faculty of Architecture and Engineering", 
+                                      [dept_arch, dept_civil])
+        faculty_philology = Faculty("Faculty of Philology", 
+                                   [dept_albanian_lit, dept_english_lit])
+        faculty_philosophy = Faculty("Faculty of Philosophy", 
+                                    [dept_philosophy, dept_psychology])
+        faculty_natural_sciences = Faculty("Faculty of Mathematics and Natural Sciences", 
+                                          [dept_math, dept_physics, dept_chemistry, dept_biology])
+        faculty_education = Faculty("Faculty of Education", 
+                                   [dept_primary_ed, dept_preschool])
+        faculty_agriculture = Faculty("Faculty of Agriculture and Veterinary", 
+                                     [dept_agribusiness, dept_veterinary])
+        faculty_sports = Faculty("Faculty of Sport Sciences", [dept_physical_ed])
+        faculty_arts = Faculty("Faculty of Arts", [dept_graphic_design, dept_music])
+        
+        # Create Universities
+        universities = [
+            University("University of Prishtina \"Hasan Prishtina\"", QYTETET[4], [
+                faculty_cse, faculty_eee, faculty_economics, faculty_law, 
+                faculty_medicine, faculty_architecture, faculty_philology, 
+                faculty_philosophy, faculty_natural_sciences, faculty_education, 
+                faculty_agriculture, faculty_sports, faculty_arts
+            ]),
+            University("Haxhi Zeka University", QYTETET[5], [
+                faculty_economics, faculty_law, faculty_cse
+            ]),
+            University("University of Gjilan \"Kadri Zeka\"", QYTETET[1], [
+                faculty_education, faculty_economics, faculty_cse
+            ]),
+            University("University of Prizren \"Ukshin Hoti\"", QYTETET[3], [
+                faculty_education, faculty_economics, faculty_law, faculty_cse
+            ]),
+            University("University of Gjakova \"Fehmi Agani\"", QYTETET[6], [
+                faculty_medicine, faculty_education, faculty_philology
+            ]),
+            University("University of Applied Sciences in Ferizaj", QYTETET[2], [
+                faculty_cse, faculty_architecture, faculty_eee
+            ]),
+            University("University of Mitrovica \"Isa Boletini\"", QYTETET[7], [
+                faculty_cse, faculty_economics, faculty_law
+            ]),
+        ]
+        
+        return universities
@@ -0,0 +1,92 @@
+"""
+Streaming JSON and JSONL export of the catalogue.
+"""
+
+import json
+import os
+from datetime import datetime
+
+from .loader import COMPRESSION_SUFFIXES, CatalogueLoader
+
+class ExportCancelled(Exception):
+    """Raised when an export is cancelled before it finishes."""
+
+class CatalogueExporter:
+    """Streams the catalogue to JSON or JSONL, one university at a time.
+    
+    Only the university being written is serialized at any moment, and the
+    statistics block comes from the precomputed aggregates; an analytics report
+    (see CatalogueAnalytics.report) follows it when one is given. Output goes to
+    a '.part' file that replaces the target only when the export completes, so
+    a cancelled or failed export never leaves a truncated file behind.
+    
+    JSON writes a faculty or department shared between universities in full
+    once and by reference afterwards. JSONL spells every one out, so each line
+    can be read on its own.
+    """
+    
+    FORMATS = ('json', 'jsonl')
+
+    def __init__(self, universities, statistics, fmt='json', compression=None, analytics=None):
+        if fmt not in self.FORMATS:
+            raise ValueError(f"Unknown export format: {fmt}")
+        if compression is not None and compression not in COMPRESSION_SUFFIXES.values():
+            raise ValueError(f"Unknown compression: {compression}")
+        self.universities = list(universities)
+        self.statistics = statistics
+        self.analytics = analytics
+        self.format = fmt
+        self.compression = compression
+
+    def default_filename(self):
+        suffix = {name: ext for ext, name in COMPRESSION_SUFFIXES.items()}.get(self.compression, '')
+        return f"kosovo_universities_data_{datetime.now().strftime('%Y%m%d_%H%M%S')}.{self.format}{suffix}"
+
+    def export(self, path, progress=None, cancel_event=None):
+        """Write the catalogue to path; progress(done, total) is called per university."""
+        tmp_path = f"{path}.part"
+        try:
+            with CatalogueLoader.open_text(tmp_path, 'w', self.compression) as f:
+                if self.format == 'json':
+                    self._write_json(f, progress, cancel_event)
+                else:
+                    self._write_jsonl(f, progress, cancel_event)
+            os.replace(tmp_path, path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+        return path
+
+    def _records(self, progress, cancel_event, refs=None):
+        # Pass one refs dict for the whole file to write shared faculties once
+        total = len(self.universities)
+        for done, uni in enumerate(self.universities, 1):
+            if cancel_event is not None and cancel_event.is_set():
+                raise ExportCancelled()
+            yield uni.to_dict(refs)
+            if progress is not None:
+                progress(done, total)
+
+    def _write_json(self, f, progress, cancel_event):
+        f.write('{\n  "export_date": %s,\n  "universities": [' %
+                json.dumps(datetime.now().isoformat()))
+        separator = '\n'
+        for record in self._records(progress, cancel_event, refs={}):
+            text = json.dumps(record, indent=2, ensure_ascii=False)
+            f.write(separator + '    ' + text.replace('\n', '\n    '))
+            separator = ',\n'
+        statistics = json.dumps(self.statistics, indent=2, ensure_ascii=False)
+        f.write('\n  ],\n  "statistics": %s' % statistics.replace('\n', '\n  '))
+        if self.analytics is not None:
+            analytics = json.dumps(self.analytics, indent=2, ensure_ascii=False)
+            f.write(',\n  "analytics": %s' % analytics.replace('\n', '\n  '))
+        f.write('\n}\n')
+
+    def _write_jsonl(self, f, progress, cancel_event):
+        f.write(json.dumps({'export_date': datetime.now().isoformat()}) + '\n')
+        for record in self._records(progress, cancel_event):
+            f.write(json.dumps(record, ensure_ascii=False) + '\n')
+        f.write(json.dumps({'statistics': self.statistics}, ensure_ascii=False) + '\n')
+        if self.analytics is not None:
+            f.write(json.dumps({'analytics': self.analytics}, ensure_ascii=False) + '\n')
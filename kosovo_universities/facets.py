@@ -0,0 +1,173 @@
+"""
+Faceted filtering with bitset postings.
+
+Every university gets a slot number, and every facet value (a city, a field of
+study, a department name, a word of a subject name) keeps the universities
+offering it as a Python int used as a bitset: bit i stands for slot i. Any
+combination of facets is then a few big-integer ANDs and counting a value
+under the current filters is one AND plus int.bit_count(), so neither the
+filtering nor the live counts rescan the catalogue.
+"""
+
+import bisect
+
+from .search import fold
+
+# Positions of the set bits of every byte value, for decoding bitsets a byte at a time
+_BYTE_BITS = tuple(tuple(bit for bit in range(8) if byte >> bit & 1) for byte in range(256))
+
+class FacetIndex:
+    """Bitset postings for every facet value, kept in step as universities come and go.
+
+    FACETS are offered for selection with live counts: the city, the field of
+    study (the faculty name) and the department name. Subjects are filtered by
+    keyword instead: every word of the keyword has to start a word of one of
+    the university's subjects, so "data str" finds "Data Structures". Slots are
+    handed out in insertion order and never reused, so decoding a bitset lists
+    universities in catalogue order.
+    """
+
+    FACETS = ('city', 'field', 'department')
+
+    def __init__(self):
+        self.postings = {facet: {} for facet in self.FACETS + ('subject',)}
+        self.all = 0
+        self._slots = {}         # university -> slot
+        self._universities = []  # slot -> university (None once removed)
+        self._values = {}        # university -> {facet: values}, to undo on removal
+        self._folded = {}        # subject name -> its folded words
+        self._words = None       # sorted subject words, rebuilt after changes
+
+    def __len__(self):
+        return len(self._slots)
+
+    def add(self, university, city, fields, departments, subjects):
+        """Index a university under the given facet values; re-adding one re-indexes it."""
+        slot = self._slots.get(university)
+        if slot is None:
+            slot = self._slots[university] = len(self._universities)
+            self._universities.append(university)
+        else:
+            self._clear(university, slot)
+
+        words = set()
+        for subject in subjects:
+            folded = self._folded.get(subject)
+            if folded is None:
+                folded = self._folded[subject] = tuple(set(fold(subject).split()))
+            words.update(folded)
+        values = {'city': {city}, 'field': set(fields), 'department': set(departments),
+                  'subject': words}
+        bit = 1 << slot
+        for facet, facet_values in values.items():
+            postings = self.postings[facet]
+            for value in facet_values:
+                postings[value] = postings.get(value, 0) | bit
+        self._values[university] = values
+        self.all |= bit
+        self._words = None
+
+    def add_university(self, university):
+        faculties = list(university.faculties)
+        departments = [dept for faculty in faculties for dept in faculty.departments]
+        self.add(university, university.city, [faculty.name for faculty in faculties],
+                 [dept.name for dept in departments],
+                 [subject for dept in departments for subject in dept.subjects])
+
+    def remove_university(self, university):
+        slot = self._slots.pop(university, None)
+        if slot is not None:
+            self._clear(university, slot)
+            self._universities[slot] = None
+
+    def _clear(self, university, slot):
+        mask = ~(1 << slot)
+        for facet, facet_values in self._values.pop(university).items():
+            postings = self.postings[facet]
+            for value in facet_values:
+                bits = postings[value] & mask
+                if bits:
+                    postings[value] = bits
+                else:
+                    del postings[value]
+        self.all &= mask
+        self._words = None
+
+    def keyword(self, text):
+        """Bitset of the universities with a subject word starting with each word of text."""
+        if self._words is None:
+            self._words = sorted(self.postings['subject'])
+        words, postings = self._words, self.postings['subject']
+        bits = self.all
+        for prefix in fold(text).split():
+            end = prefix[:-1] + chr(ord(prefix[-1]) + 1)
+            matched = 0
+            for word in words[bisect.bisect_left(words, prefix):bisect.bisect_left(words, end)]:
+                matched |= postings[word]
+            bits &= matched
+            if not bits:
+                break
+        return bits
+
+    def universities_with(self, facet, value):
+        """The universities filed under a facet value (or subject keyword), in catalogue order."""
+        return self.universities_of(self._filter_bits(facet, value))
+
+    def _filter_bits(self, facet, value):
+        if facet == 'subject':
+            return self.keyword(value)
+        return self.postings[facet].get(value, 0)
+
+    def select(self, filters, within=None):
+        """Bitset of the universities passing every filter (and in within, if given).
+
+        filters maps facet names to a value, or to None/'' for no filter;
+        'subject' maps to a keyword.
+        """
+        bits = self.all if within is None else self.all & within
+        for facet, value in filters.items():
+            if value and bits:
+                bits &= self._filter_bits(facet, value)
+        return bits
+
+    def counts(self, filters, within=None):
+        """For each of FACETS, how many universities each of its values would leave.
+
+        A facet is counted under all the other filters but not its own, so the
+        alternatives to the current selection show their counts too.
+        """
+        base = self.all if within is None else self.all & within
+        selected = {facet: self._filter_bits(facet, value)
+                    for facet, value in filters.items() if value}
+        counts = {}
+        for facet in self.FACETS:
+            bits = base
+            for other, other_bits in selected.items():
+                if other != facet:
+                    bits &= other_bits
+            counts[facet] = {value: (posting & bits).bit_count()
+                             for value, posting in self.postings[facet].items()}
+        return counts
+
+    def bits_of(self, universities):
+        """Bitset of the given universities; ones not in the index are ignored."""
+        data = bytearray((len(self._universities) + 7) // 8)
+        for university in universities:
+            slot = self._slots.get(university)
+            if slot is not None:
+                data[slot >> 3] |= 1 << (slot & 7)
+        return int.from_bytes(data, 'little')
+
+    def contains(self, bits, university):
+        slot = self._slots.get(university)
+        return slot is not None and bool(bits >> slot & 1)
+
+    def universities_of(self, bits):
+        """The universities of a bitset, in catalogue order."""
+        universities = self._universities
+        found = []
+        for index, byte in enumerate(bits.to_bytes((bits.bit_length() + 7) // 8, 'little')):
+            if byte:
+                base = index << 3
+                found.extend(universities[base + bit] for bit in _BYTE_BITS[byte])
+        return found
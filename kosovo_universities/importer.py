@@ -0,0 +1,315 @@
+"""
+Bulk import of catalogue dumps spread over many JSON/CSV files.
+
+Each file is parsed and validated in a worker process; the parent only merges
+the per-file results, so throughput grows with the number of cores. A file that
+cannot be read is reported and left out without stopping the batch.
+"""
+
+import csv
+import json
+import os
+import sqlite3
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from .columnar import read_columnar, write_columnar
+from .export import CatalogueExporter
+from .loader import COMPRESSION_SUFFIXES, CatalogueLoader
+from .models import QYTETET, CatalogueInterner, Department, Faculty, University
+from .stats import CatalogueStatistics
+from .storage import SQLiteDataManager
+
+KNOWN_CITIES = frozenset(QYTETET.values())
+
+# Columns of a CSV dump: one row per subject, or per department without subjects
+CSV_COLUMNS = ('university', 'city', 'faculty', 'department', 'subject')
+
+class ImportIssue:
+    """A problem found in one input file; errors drop data, warnings only report it."""
+
+    __slots__ = ('path', 'level', 'message')
+
+    def __init__(self, path, level, message):
+        self.path = path
+        self.level = level
+        self.message = message
+
+    def __str__(self):
+        return f"{self.path}: {self.level}: {self.message}"
+
+class FileResult:
+    """The universities parsed from one file and the issues found in it."""
+
+    __slots__ = ('path', 'universities', 'issues', 'seconds')
+
+    def __init__(self, path, universities=(), issues=(), seconds=0.0):
+        self.path = path
+        self.universities = list(universities)
+        self.issues = list(issues)
+        self.seconds = seconds
+
+    @property
+    def failed(self):
+        """True if nothing usable came out of the file."""
+        return not self.universities and any(issue.level == 'error' for issue in self.issues)
+
+def read_csv(path):
+    """Read a CSV dump with a university,city,faculty,department,subject header."""
+    universities = {}
+    with CatalogueLoader.open_text(path, 'r') as f:
+        reader = csv.DictReader(f)
+        columns = [name.strip().lower() for name in reader.fieldnames or ()]
+        missing = [name for name in CSV_COLUMNS[:2] if name not in columns]
+        if missing:
+            raise ValueError(f"missing CSV column(s): {', '.join(missing)}")
+        reader.fieldnames = columns
+
+        faculties, departments = {}, {}
+        for row in reader:
+            values = [(row.get(name) or '').strip() for name in CSV_COLUMNS]
+            uni_name, city, faculty_name, dept_name, subject = values
+            key = (uni_name, city)
+            university = universities.get(key)
+            if university is None:
+                university = universities[key] = University(uni_name, city, [])
+            if not faculty_name:
+                continue
+            faculty = faculties.get(key + (faculty_name,))
+            if faculty is None:
+                faculty = faculties[key + (faculty_name,)] = Faculty(faculty_name, [])
+                university.faculties.append(faculty)
+            if not dept_name:
+                continue
+            dept_key = key + (faculty_name, dept_name)
+            department = departments.get(dept_key)
+            if department is None:
+                department = departments[dept_key] = Department(dept_name, [])
+                faculty.departments.append(department)
+            if subject:
+                department.subjects.append(subject)
+    return list(universities.values())
+
+def read_json_document(path):
+    """Read a JSON file holding one university, a list of them, or an export."""
+    with CatalogueLoader.open_text(path, 'r') as f:
+        data = json.load(f)
+    if isinstance(data, dict):
+        data = data['universities'] if 'universities' in data else [data]
+    if not isinstance(data, list):
+        raise ValueError("expected a university object or a list of universities")
+    refs = {}
+    return [University.from_dict(item, refs) for item in data]
+
+def read_source(path):
+    """Parse any supported input file into a list of universities."""
+    base, extension = os.path.splitext(path)
+    if extension.lower() in COMPRESSION_SUFFIXES:
+        extension = os.path.splitext(base)[1]
+    extension = extension.lower()
+    if extension == '.csv':
+        return read_csv(path)
+    if extension == '.json':
+        return read_json_document(path)
+    return list(CatalogueLoader.reader_for(path)(path))
+
+def validate(path, universities):
+    """Return the issues of one file's universities, and the universities to keep."""
+    issues = []
+    kept = []
+    seen = set()
+    for uni in universities:
+        if not uni.name or not uni.city:
+            issues.append(ImportIssue(path, 'error', f"university without a name or city: "
+                                                     f"{uni.name or '?'} ({uni.city or '?'})"))
+            continue
+        if (uni.name, uni.city) in seen:
+            issues.append(ImportIssue(path, 'warning',
+                                      f"duplicate university {uni.name} ({uni.city}) skipped"))
+            continue
+        seen.add((uni.name, uni.city))
+        kept.append(uni)
+
+        if uni.city not in KNOWN_CITIES:
+            issues.append(ImportIssue(path, 'warning',
+                                      f"{uni.name}: unknown city '{uni.city}'"))
+        faculty_names = set()
+        for faculty in uni.faculties:
+            if faculty.name in faculty_names:
+                issues.append(ImportIssue(path, 'warning',
+                                          f"{uni.name}: duplicate faculty '{faculty.name}'"))
+            faculty_names.add(faculty.name)
+            dept_names = set()
+            for dept in faculty.departments:
+                where = f"{uni.name} / {faculty.name} / {dept.name}"
+                if dept.name in dept_names:
+                    issues.append(ImportIssue(path, 'warning', f"{where}: duplicate department"))
+                dept_names.add(dept.name)
+                if not dept.subjects:
+                    issues.append(ImportIssue(path, 'warning',
+                                              f"{where}: department has no subjects"))
+    return issues, kept
+
+def parse_file(path):
+    """Parse and validate one file; runs in a worker process and never raises."""
+    started = time.perf_counter()
+    try:
+        universities = read_source(path)
+    except Exception as e:
+        # Anything a malformed file can trigger: report it and let the batch go on
+        message = f"could not read file: {type(e).__name__}: {e}"
+        return FileResult(path, issues=[ImportIssue(path, 'error', message)],
+                          seconds=time.perf_counter() - started)
+    issues, universities = validate(path, universities)
+    # Sharing equal faculties here also shrinks what is pickled back to the parent
+    universities = CatalogueInterner().normalize(universities)
+    return FileResult(path, universities, issues, time.perf_counter() - started)
+
+class ImportReport:
+    """Outcome of an import: the merged catalogue, the issues and per-file timings."""
+
+    def __init__(self):
+        self.universities = []
+        self.issues = []
+        self.files = 0
+        self.failed_files = 0
+        self.parse_seconds = 0.0
+        self.seconds = 0.0
+        self.interner = CatalogueInterner()
+        self._sources = {}  # (name, city) -> file it was imported from
+
+    @property
+    def errors(self):
+        return [issue for issue in self.issues if issue.level == 'error']
+
+    @property
+    def warnings(self):
+        return [issue for issue in self.issues if issue.level == 'warning']
+
+    def merge(self, result):
+        """Fold one file's result in; universities already imported are skipped."""
+        self.files += 1
+        self.failed_files += result.failed
+        self.parse_seconds += result.seconds
+        self.issues.extend(result.issues)
+        for uni in result.universities:
+            key = (uni.name, uni.city)
+            source = self._sources.get(key)
+            if source is not None:
+                self.issues.append(ImportIssue(
+                    result.path, 'warning',
+                    f"duplicate university {uni.name} ({uni.city}), already in {source}; skipped"))
+                continue
+            self._sources[key] = result.path
+            self.universities.append(self.interner.university(uni))
+
+    def statistics(self):
+        stats = CatalogueStatistics()
+        for uni in self.universities:
+            stats.add_university(uni)
+        return stats.statistics()
+
+    def summary_lines(self):
+        faculties = {id(faculty) for uni in self.universities for faculty in uni.faculties}
+        offered = sum(len(uni.faculties) for uni in self.universities)
+        return [
+            f"Imported {len(self.universities)} universities from "
+            f"{self.files - self.failed_files} of {self.files} files "
+            f"in {self.seconds:.2f} s ({self.parse_seconds:.2f} s of parsing)",
+            f"{offered} faculties offered, {len(faculties)} distinct after merging shared ones",
+            f"{len(self.errors)} errors, {len(self.warnings)} warnings",
+        ]
+
+    def write(self, path):
+        """Write the merged catalogue in the format implied by path's extension.
+
+        .sqlite/.db files can be opened in place by the sqlite backend and .kuc
+        files by the mapped one; .json writes shared faculties once, by reference,
+        and .jsonl in full on every line (both optionally compressed).
+        """
+        reader = CatalogueLoader.reader_for(path)
+        if reader == read_columnar:
+            return write_columnar(self.universities, path)
+        if reader == CatalogueLoader.read_sqlite:
+            tmp_path = f"{path}.part"
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            try:
+                manager = SQLiteDataManager(tmp_path)
+                manager.replace_all(self.universities)
+                manager.close()
+                os.replace(tmp_path, path)
+            except (OSError, sqlite3.Error):
+                if os.path.exists(tmp_path):
+                    os.remove(tmp_path)
+                raise
+            return path
+        fmt = 'jsonl' if reader == CatalogueLoader.read_jsonl else 'json'
+        exporter = CatalogueExporter(self.universities, self.statistics(), fmt=fmt,
+                                     compression=CatalogueLoader.compression_for(path))
+        return exporter.export(path)
+
+class CatalogueImporter:
+    """Parses and validates many input files in parallel and merges them.
+
+    Inputs may be files or directories (searched recursively for EXTENSIONS,
+    optionally compressed). Results are merged in input order whichever worker
+    finishes first, so the same inputs always give the same catalogue.
+    """
+
+    EXTENSIONS = ('.json', '.jsonl', '.ndjson', '.csv')
+
+    def __init__(self, workers=None):
+        self.workers = workers or os.cpu_count() or 1
+
+    def collect(self, inputs):
+        """Expand directories into the sorted list of supported files they contain."""
+        paths = []
+        for path in inputs:
+            if not os.path.isdir(path):
+                paths.append(path)
+                continue
+            found = []
+            for directory, _, names in os.walk(path):
+                for name in names:
+                    base, extension = os.path.splitext(name)
+                    if extension.lower() in COMPRESSION_SUFFIXES:
+                        extension = os.path.splitext(base)[1]
+                    if extension.lower() in self.EXTENSIONS:
+                        found.append(os.path.join(directory, name))
+            paths.extend(sorted(found))
+        return paths
+
+    def run(self, inputs, progress=None):
+        """Import the inputs; progress(done, total) is called as files complete."""
+        started = time.perf_counter()
+        paths = self.collect(inputs)
+        report = ImportReport()
+        if self.workers <= 1 or len(paths) <= 1:
+            results = map(parse_file, paths)
+            self._merge_all(report, paths, results, progress)
+        else:
+            workers = min(self.workers, len(paths))
+            # A few chunks per worker: small files batch up, big ones still spread out
+            chunksize = max(1, len(paths) // (workers * 4))
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                results = executor.map(parse_file, paths, chunksize=chunksize)
+                self._merge_all(report, paths, results, progress)
+        report.seconds = time.perf_counter() - started
+        return report
+
+    @staticmethod
+    def _merge_all(report, paths, results, progress):
+        done = 0
+        try:
+            for result in results:
+                report.merge(result)
+                done += 1
+                if progress is not None:
+                    progress(done, len(paths))
+        except BrokenProcessPool as e:
+            # A worker died (e.g. out of memory): the files it had not returned are lost
+            for path in paths[done:]:
+                report.merge(FileResult(path, issues=[
+                    ImportIssue(path, 'error', f"worker process failed: {e}")]))
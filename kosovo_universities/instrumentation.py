@@ -0,0 +1,165 @@
+"""
+Optional timing instrumentation for hot paths, and session profiling.
+
+Functions decorated with @timed() and blocks wrapped in `with span(name):`
+record call counts and a latency histogram per event name while recording is
+enabled. Disabled (the default), a decorated call costs one attribute check and
+span() hands back a shared no-op context manager.
+"""
+
+import bisect
+import contextlib
+import cProfile
+import functools
+import io
+import pstats
+import threading
+import time
+from collections import deque
+
+class EventStats:
+    """Call count, total/max latency and a histogram of one event."""
+
+    __slots__ = ('name', 'count', 'total', 'max', 'buckets')
+
+    def __init__(self, name, bucket_count):
+        self.name = name
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.buckets = [0] * bucket_count
+
+    def percentile(self, fraction, bounds):
+        """Upper bucket bound (ms) below which `fraction` of the calls finished."""
+        if not self.count:
+            return 0.0
+        wanted = fraction * self.count
+        seen = 0
+        for bound, hits in zip(bounds, self.buckets):
+            seen += hits
+            if seen >= wanted:
+                return min(bound, self.max * 1000)
+        return self.max * 1000
+
+class Instrumentation:
+    """Collects per-event call counts and latency histograms.
+
+    Latencies are bucketed on BOUNDS_MS (the last bucket is open-ended), so
+    recording is O(log buckets) and memory stays constant however long the
+    session runs. Calls slower than slow_ms are also kept, newest last, in
+    slow_events.
+    """
+
+    BOUNDS_MS = (0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 16, 25, 50, 100, 250,
+                 500, 1000, 2500, float('inf'))
+
+    def __init__(self, enabled=False, slow_ms=50, keep_slow=200):
+        self.enabled = enabled
+        self.slow_ms = slow_ms
+        self.events = {}
+        self.slow_events = deque(maxlen=keep_slow)
+        self._lock = threading.Lock()
+
+    def record(self, name, seconds):
+        """Record one call of `name` that took `seconds`."""
+        ms = seconds * 1000
+        bucket = bisect.bisect_left(self.BOUNDS_MS, ms)
+        with self._lock:
+            stats = self.events.get(name)
+            if stats is None:
+                stats = self.events[name] = EventStats(name, len(self.BOUNDS_MS))
+            stats.count += 1
+            stats.total += seconds
+            stats.max = max(stats.max, seconds)
+            stats.buckets[bucket] += 1
+            if ms >= self.slow_ms:
+                self.slow_events.append((time.time(), name, ms))
+
+    def timed(self, name=None):
+        """Decorator recording every call of a function under `name` (default: its qualname)."""
+        def decorate(func):
+            event = name or func.__qualname__
+
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                if not self.enabled:
+                    return func(*args, **kwargs)
+                started = time.perf_counter()
+                try:
+                    return func(*args, **kwargs)
+                finally:
+                    self.record(event, time.perf_counter() - started)
+            return wrapper
+        return decorate
+
+    def span(self, name):
+        """Context manager recording the time spent in its block under `name`."""
+        if not self.enabled:
+            return _NO_SPAN
+        return _Span(self, name)
+
+    def reset(self):
+        with self._lock:
+            self.events.clear()
+            self.slow_events.clear()
+
+    def summary(self):
+        """Per-event statistics as dicts, slowest total first."""
+        with self._lock:
+            events = list(self.events.values())
+            rows = [
+                {
+                    'event': stats.name,
+                    'calls': stats.count,
+                    'total_ms': stats.total * 1000,
+                    'mean_ms': stats.total * 1000 / stats.count,
+                    'p50_ms': stats.percentile(0.5, self.BOUNDS_MS),
+                    'p95_ms': stats.percentile(0.95, self.BOUNDS_MS),
+                    'max_ms': stats.max * 1000,
+                    'histogram': dict(zip(map(str, self.BOUNDS_MS), stats.buckets)),
+                }
+                for stats in events
+            ]
+        rows.sort(key=lambda row: row['total_ms'], reverse=True)
+        return rows
+
+class _Span:
+    __slots__ = ('instrumentation', 'name', 'started')
+
+    def __init__(self, instrumentation, name):
+        self.instrumentation = instrumentation
+        self.name = name
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.instrumentation.record(self.name, time.perf_counter() - self.started)
+        return False
+
+_NO_SPAN = contextlib.nullcontext()
+
+# The application-wide instance the GUI handlers report to
+instrumentation = Instrumentation()
+timed = instrumentation.timed
+span = instrumentation.span
+
+@contextlib.contextmanager
+def profile_session(path, top=40):
+    """Profile the enclosed block with cProfile.
+
+    The raw stats are dumped to `path` (load them with pstats or snakeviz) and
+    the `top` entries by cumulative time are written as text to path + '.txt'.
+    """
+    profiler = cProfile.Profile()
+    profiler.enable()
+    try:
+        yield profiler
+    finally:
+        profiler.disable()
+        profiler.dump_stats(path)
+        report = io.StringIO()
+        pstats.Stats(profiler, stream=report).sort_stats('cumulative').print_stats(top)
+        with open(path + '.txt', 'w', encoding='utf-8') as f:
+            f.write(report.getvalue())
@@ -0,0 +1,309 @@
+"""
+Loading the catalogue from external JSON, JSONL and SQLite data files.
+"""
+
+import bz2
+import gzip
+import hashlib
+import json
+import lzma
+import os
+import pickle
+import re
+import sqlite3
+
+from .models import CatalogueInterner, Department, Faculty, University
+
+try:
+    from compression import zstd  # Python 3.14+
+except ImportError:
+    zstd = None
+
+# Compressed data files, by suffix
+COMPRESSION_SUFFIXES = {'.gz': 'gzip', '.bz2': 'bz2', '.xz': 'xz'}
+COMPRESSION_OPENERS = {'gzip': gzip.open, 'bz2': bz2.open, 'xz': lzma.open}
+if zstd is not None:
+    COMPRESSION_SUFFIXES['.zst'] = 'zstd'
+    COMPRESSION_OPENERS['zstd'] = zstd.open
+
+class CatalogueLoader:
+    """Loads the university catalogue from an external data file.
+    
+    Readers are chosen by file extension and can be extended with
+    register_reader(). JSON files use the same schema export_data writes, JSONL
+    files hold one university object per line, and SQLite files use the
+    SQLITE_SCHEMA tables. Every parsed catalogue is cached as a pickled snapshot
+    keyed by the source's mtime and SHA-256, so warm starts skip parsing.
+    Unpickling runs code, so a snapshot is only read when it and the cache
+    directory belong to the current user and are not group or world writable.
+    """
+    
+    SNAPSHOT_VERSION = 2
+    CHUNK_SIZE = 1 << 16
+    SQLITE_SCHEMA = """
+        CREATE TABLE IF NOT EXISTS universities (
+            id INTEGER PRIMARY KEY, name TEXT NOT NULL, city TEXT NOT NULL);
+        CREATE TABLE IF NOT EXISTS faculties (
+            id INTEGER PRIMARY KEY, university_id INTEGER NOT NULL
+                REFERENCES universities(id), name TEXT NOT NULL);
+        CREATE TABLE IF NOT EXISTS departments (
+            id INTEGER PRIMARY KEY, faculty_id INTEGER NOT NULL
+                REFERENCES faculties(id), name TEXT NOT NULL);
+        CREATE TABLE IF NOT EXISTS subjects (
+            id INTEGER PRIMARY KEY, department_id INTEGER NOT NULL
+                REFERENCES departments(id), name TEXT NOT NULL);
+    """
+    readers = {}
+
+    def __init__(self, cache_dir=None):
+        if cache_dir is None:
+            cache_dir = os.path.join(os.path.expanduser("~"), ".cache", "kosovo_universities")
+        self.cache_dir = cache_dir
+
+    @classmethod
+    def register_reader(cls, extensions, reader):
+        """Register reader(path) -> iterable of University for the given extensions."""
+        for extension in extensions:
+            cls.readers[extension.lower()] = reader
+
+    @staticmethod
+    def compression_for(path):
+        """Return the compression implied by a file name, or None."""
+        return COMPRESSION_SUFFIXES.get(os.path.splitext(path)[1].lower())
+
+    @classmethod
+    def open_text(cls, path, mode='r', compression=None):
+        """Open a (possibly compressed) UTF-8 text file; compression defaults to the suffix."""
+        compression = compression or cls.compression_for(path)
+        if compression is None:
+            return open(path, mode, encoding='utf-8')
+        return COMPRESSION_OPENERS[compression](path, mode + 't', encoding='utf-8')
+
+    @classmethod
+    def reader_for(cls, path):
+        base, extension = os.path.splitext(path)
+        if extension.lower() in COMPRESSION_SUFFIXES:
+            extension = os.path.splitext(base)[1]
+        extension = extension.lower()
+        try:
+            return cls.readers[extension]
+        except KeyError:
+            raise ValueError(f"Unsupported data file type: {extension or path}") from None
+
+    def load(self, path):
+        """Return the list of universities stored in path, using the snapshot cache."""
+        path = os.path.abspath(path)
+        reader = self.reader_for(path)
+        stat = os.stat(path)
+        snapshot_path = self.snapshot_path(path)
+        
+        meta, universities = self._read_snapshot(snapshot_path, stat)
+        if universities is not None:
+            return universities
+            
+        digest = self.file_digest(path)
+        if meta is not None and meta.get('sha256') == digest:
+            # Same content with a new mtime (e.g. a copy): reuse and re-key the snapshot
+            _, universities = self._read_snapshot(snapshot_path, None)
+            if universities is not None:
+                self._write_snapshot(snapshot_path, path, stat, digest, universities)
+                return universities
+                
+        universities = CatalogueInterner().normalize(reader(path))
+        self._write_snapshot(snapshot_path, path, stat, digest, universities)
+        return universities
+
+    def snapshot_path(self, path):
+        key = hashlib.sha1(os.path.abspath(path).encode('utf-8')).hexdigest()
+        return os.path.join(self.cache_dir, f"{key}.snapshot")
+
+    def store_path(self, path, extension):
+        """Cache file for a store built from path, or from the built-in data if path is None.
+
+        Keyed by path like the snapshots, so stores of different sources never
+        overwrite each other.
+        """
+        key = hashlib.sha1(os.path.abspath(path).encode('utf-8')).hexdigest() if path else "builtin"
+        return os.path.join(self.cache_dir, f"{key}{extension}")
+
+    def source_stamp(self, path, recorded=None):
+        """Return (stamp, current) for a store built from path (None for the built-in data).
+        
+        stamp is the {'source', 'mtime_ns', 'size'} to record with the store, as
+        strings; current tells whether recorded, the stamp read back from the
+        store, still describes path. Like load(), the file is only hashed when
+        its mtime or size changed, so a current store costs one stat().
+        """
+        recorded = recorded or {}
+        if not path:
+            return {'source': "builtin"}, recorded.get('source') == "builtin"
+        stat = os.stat(path)
+        stamp = {'mtime_ns': str(stat.st_mtime_ns), 'size': str(stat.st_size)}
+        if (recorded.get('source') is not None and recorded.get('mtime_ns') == stamp['mtime_ns']
+                and recorded.get('size') == stamp['size']):
+            stamp['source'] = recorded['source']
+            return stamp, True
+        stamp['source'] = self.file_digest(path)
+        return stamp, recorded.get('source') == stamp['source']
+
+    @staticmethod
+    def file_digest(path):
+        digest = hashlib.sha256()
+        with open(path, 'rb') as f:
+            for block in iter(lambda: f.read(1 << 20), b''):
+                digest.update(block)
+        return digest.hexdigest()
+
+    def _read_snapshot(self, snapshot_path, stat):
+        """Return (meta, universities); universities is None unless the snapshot is current.
+        
+        With stat=None the payload is returned whenever the snapshot is readable.
+        """
+        if not (self._is_private(self.cache_dir) and self._is_private(snapshot_path)):
+            return None, None
+        try:
+            with open(snapshot_path, 'rb') as f:
+                meta = pickle.load(f)
+                if meta.get('version') != self.SNAPSHOT_VERSION:
+                    return None, None
+                if stat is not None and (meta.get('mtime_ns') != stat.st_mtime_ns
+                                         or meta.get('size') != stat.st_size):
+                    return meta, None
+                return meta, pickle.load(f)
+        except (OSError, pickle.UnpicklingError, EOFError, AttributeError, TypeError,
+                ImportError):
+            # ImportError: the snapshot refers to a module or class that no longer exists
+            return None, None
+
+    @staticmethod
+    def _is_private(path):
+        """Return True if path belongs to the current user and only they can write it."""
+        if not hasattr(os, 'getuid'):
+            return True
+        try:
+            st = os.stat(path)
+        except OSError:
+            return False
+        return st.st_uid == os.getuid() and not st.st_mode & 0o022
+
+    def _write_snapshot(self, snapshot_path, path, stat, digest, universities):
+        meta = {
+            'version': self.SNAPSHOT_VERSION,
+            'source': path,
+            'mtime_ns': stat.st_mtime_ns,
+            'size': stat.st_size,
+            'sha256': digest,
+        }
+        tmp_path = f"{snapshot_path}.{os.getpid()}.tmp"
+        try:
+            os.makedirs(self.cache_dir, mode=0o700, exist_ok=True)
+            with open(tmp_path, 'wb') as f:
+                pickle.dump(meta, f, protocol=pickle.HIGHEST_PROTOCOL)
+                pickle.dump(universities, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.chmod(tmp_path, 0o600)
+            os.replace(tmp_path, snapshot_path)
+        except OSError:
+            # The cache is an optimisation only; a read-only home must not break loading
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+    @classmethod
+    def iter_json_array(cls, f, key):
+        """Yield the elements of the top-level array (or the array under key) one by one."""
+        decoder = json.JSONDecoder()
+        buffer = f.read(cls.CHUNK_SIZE)
+        if buffer.lstrip().startswith('['):
+            pos = buffer.index('[') + 1
+        else:
+            pattern = re.compile(r'"%s"\s*:\s*\[' % re.escape(key))
+            match = pattern.search(buffer)
+            while match is None:
+                chunk = f.read(max(cls.CHUNK_SIZE, len(buffer)))
+                if not chunk:
+                    raise ValueError(f"No '{key}' array found in JSON data")
+                buffer += chunk
+                match = pattern.search(buffer)
+            pos = match.end()
+            
+        while True:
+            while pos < len(buffer) and buffer[pos] in ' \t\r\n,':
+                pos += 1
+            if pos == len(buffer):
+                chunk = f.read(cls.CHUNK_SIZE)
+                if not chunk:
+                    raise ValueError("Unterminated JSON array")
+                buffer, pos = chunk, 0
+                continue
+            if buffer[pos] == ']':
+                return
+            try:
+                item, pos = decoder.raw_decode(buffer, pos)
+            except json.JSONDecodeError:
+                # Incomplete element: read more, growing geometrically for huge items
+                chunk = f.read(max(cls.CHUNK_SIZE, len(buffer) - pos))
+                if not chunk:
+                    raise
+                buffer, pos = buffer[pos:] + chunk, 0
+                continue
+            yield item
+
+    @classmethod
+    def read_json(cls, path):
+        refs = {}
+        with cls.open_text(path) as f:
+            for item in cls.iter_json_array(f, 'universities'):
+                yield University.from_dict(item, refs)
+
+    @classmethod
+    def read_jsonl(cls, path):
+        refs = {}
+        with cls.open_text(path) as f:
+            for line_number, line in enumerate(f, 1):
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError as e:
+                    raise ValueError(f"{path}:{line_number}: {e}") from None
+                # Metadata records (export date, statistics, analytics) carry no faculties
+                if 'faculties' in record:
+                    yield University.from_dict(record, refs)
+
+    @staticmethod
+    def read_sqlite(path):
+        connection = sqlite3.connect(f"file:{path}?mode=ro", uri=True)
+        try:
+            rows = connection.execute("""
+                SELECT u.id, u.name, u.city, f.id, f.name, d.id, d.name, s.name
+                FROM universities u
+                LEFT JOIN faculties f ON f.university_id = u.id
+                LEFT JOIN departments d ON d.faculty_id = f.id
+                LEFT JOIN subjects s ON s.department_id = d.id
+                ORDER BY u.id, f.id, d.id, s.id
+            """)
+            university = faculty = department = None
+            university_id = faculty_id = department_id = None
+            for uni_id, uni_name, city, fac_id, fac_name, dept_id, dept_name, subject in rows:
+                if uni_id != university_id:
+                    if university is not None:
+                        yield university
+                    university, university_id = University(uni_name, city, []), uni_id
+                    faculty_id = department_id = None
+                if fac_id is not None and fac_id != faculty_id:
+                    faculty, faculty_id = Faculty(fac_name, []), fac_id
+                    university.faculties.append(faculty)
+                    department_id = None
+                if dept_id is not None and dept_id != department_id:
+                    department, department_id = Department(dept_name, []), dept_id
+                    faculty.departments.append(department)
+                if subject is not None:
+                    department.subjects.append(subject)
+            if university is not None:
+                yield university
+        finally:
+            connection.close()
+
+CatalogueLoader.register_reader(('.json',), CatalogueLoader.read_json)
+CatalogueLoader.register_reader(('.jsonl', '.ndjson'), CatalogueLoader.read_jsonl)
+CatalogueLoader.register_reader(('.sqlite', '.sqlite3', '.db'), CatalogueLoader.read_sqlite)
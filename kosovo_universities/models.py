@@ -0,0 +1,167 @@
+"""
+Data model of the Kosovo Universities Information System: cities, universities,
+faculties and departments.
+"""
+
+import sys
+
+# Data structures
+QYTETET = {
+    1: "Gjilan",
+    2: "Ferizaj", 
+    3: "Prizren",
+    4: "Prishtina",
+    5: "Peja",
+    6: "Gjakova",
+    7: "Mitrovica",
+    8: "Lipjan",
+}
+
+class University:
+    """Represents a university with its location and faculties."""
+    
+    __slots__ = ('name', 'city', 'faculties')
+    
+    def __init__(self, name, city, faculties):
+        self.name = name
+        self.city = city
+        self.faculties = faculties
+
+    def __str__(self):
+        return f"{self.name}, City: {self.city}, Faculties: {len(self.faculties)}"
+
+    def to_dict(self, refs=None):
+        """Serialize the university.
+        
+        Pass the same refs dict for a whole export to write each shared faculty
+        and department in full once, with an 'id', and as {'ref': id} afterwards.
+        """
+        return {
+            'name': self.name,
+            'city': self.city,
+            'faculties': [faculty.to_dict(refs) for faculty in self.faculties]
+        }
+
+    @classmethod
+    def from_dict(cls, data, refs=None):
+        """Build a university; refs resolves the {'ref': id} entries written by to_dict."""
+        if refs is None:
+            refs = {}
+        return cls(data['name'], data['city'],
+                   [Faculty.from_dict(faculty, refs) for faculty in data.get('faculties', [])])
+
+class Faculty:
+    """Represents a faculty with its departments."""
+    
+    __slots__ = ('name', 'departments')
+    
+    def __init__(self, name, departments):
+        self.name = name
+        self.departments = departments
+
+    def __str__(self):
+        return f"Faculty: {self.name}, Departments: {len(self.departments)}"
+
+    def to_dict(self, refs=None):
+        if refs is not None:
+            if self in refs:
+                return {'ref': refs[self]}
+            refs[self] = len(refs)
+            return {
+                'id': refs[self],
+                'name': self.name,
+                'departments': [dept.to_dict(refs) for dept in self.departments]
+            }
+        return {
+            'name': self.name,
+            'departments': [dept.to_dict() for dept in self.departments]
+        }
+
+    @classmethod
+    def from_dict(cls, data, refs=None):
+        if refs is None:
+            refs = {}
+        if 'ref' in data:
+            return refs[data['ref']]
+        faculty = cls(data['name'],
+                      [Department.from_dict(dept, refs) for dept in data.get('departments', [])])
+        if 'id' in data:
+            refs[data['id']] = faculty
+        return faculty
+
+class Department:
+    """Represents a department with its subjects."""
+    
+    __slots__ = ('name', 'subjects')
+    
+    def __init__(self, name, subjects):
+        self.name = name
+        self.subjects = subjects
+
+    def __str__(self):
+        return f"Department: {self.name}, Subjects: {', '.join(self.subjects)}"
+
+    def to_dict(self, refs=None):
+        if refs is not None:
+            if self in refs:
+                return {'ref': refs[self]}
+            refs[self] = len(refs)
+            return {
+                'id': refs[self],
+                'name': self.name,
+                'subjects': self.subjects
+            }
+        return {
+            'name': self.name,
+            'subjects': self.subjects
+        }
+
+    @classmethod
+    def from_dict(cls, data, refs=None):
+        if refs is not None and 'ref' in data:
+            return refs[data['ref']]
+        department = cls(data['name'], list(data.get('subjects', [])))
+        if refs is not None and 'id' in data:
+            refs[data['id']] = department
+        return department
+
+class CatalogueInterner:
+    """Normalizes the object graph so equal departments and faculties are shared.
+    
+    Names and subjects are interned with sys.intern, departments are pooled by
+    name and subject list, and faculties by name and (pooled) departments. The
+    pools persist, so universities added later are folded into the same graph.
+    """
+    
+    def __init__(self):
+        self._departments = {}
+        self._faculties = {}
+
+    def department(self, dept):
+        key = (dept.name, tuple(dept.subjects))
+        canonical = self._departments.get(key)
+        if canonical is None:
+            dept.name = sys.intern(dept.name)
+            dept.subjects = [sys.intern(subject) for subject in dept.subjects]
+            canonical = self._departments[key] = dept
+        return canonical
+
+    def faculty(self, faculty):
+        departments = [self.department(dept) for dept in faculty.departments]
+        key = (faculty.name, tuple(id(dept) for dept in departments))
+        canonical = self._faculties.get(key)
+        if canonical is None:
+            faculty.name = sys.intern(faculty.name)
+            faculty.departments = departments
+            canonical = self._faculties[key] = faculty
+        return canonical
+
+    def university(self, university):
+        """Point a university at the pooled faculties; returns the same university."""
+        university.name = sys.intern(university.name)
+        university.city = sys.intern(university.city)
+        university.faculties = [self.faculty(faculty) for faculty in university.faculties]
+        return university
+
+    def normalize(self, universities):
+        return [self.university(university) for university in universities]
@@ -0,0 +1,201 @@
+"""
+Reverse index answering "where can I study X": subject and department names to
+the places offering them.
+
+The catalogue only links downwards (university -> faculty -> department ->
+subjects), so finding every university teaching a subject means walking the
+whole tree. OfferingIndex keeps the links the other way round: every folded
+subject or department name maps straight to the (university, faculty,
+department) paths offering it, so a lookup is one dict access and results are
+sorted once per name, by city in QYTETET order and then by university.
+"""
+
+from collections import Counter
+
+from .models import QYTETET
+from .search import fold
+
+_CITY_ORDER = {city: rank for rank, city in enumerate(QYTETET.values())}
+
+class Offering:
+    """One place a subject or department is taught: a department of a university's faculty.
+
+    The faculty and department are given by name and by position among the
+    university's faculties and the faculty's departments, so a path can be
+    followed back to the model objects without any name lookups.
+    """
+
+    __slots__ = ('university', 'faculty', 'department', 'faculty_index', 'department_index')
+
+    def __init__(self, university, faculty, department, faculty_index, department_index):
+        self.university = university
+        self.faculty = faculty
+        self.department = department
+        self.faculty_index = faculty_index
+        self.department_index = department_index
+
+    def __str__(self):
+        return f"{self.university.name} / {self.faculty} / {self.department}"
+
+    @property
+    def city(self):
+        return self.university.city
+
+    def locate(self):
+        """Return the (Faculty, Department) objects of the path."""
+        faculty = self.university.faculties[self.faculty_index]
+        return faculty, faculty.departments[self.department_index]
+
+    def to_dict(self):
+        return {'university': self.university.name, 'city': self.university.city,
+                'faculty': self.faculty, 'department': self.department}
+
+def university_ranks(universities):
+    """Number universities by city (QYTETET order, unknown cities last) and then name."""
+    order = sorted(universities, key=lambda uni: (_CITY_ORDER.get(uni.city, len(_CITY_ORDER)),
+                                                  uni.city, fold(uni.name)))
+    return {uni: rank for rank, uni in enumerate(order)}
+
+def offering_order(offerings, ranks=None):
+    """Sort offerings by university (see university_ranks) and then by path.
+    
+    ranks may be given to reuse a university_ranks() covering every offering.
+    """
+    if ranks is None:
+        ranks = university_ranks({offering.university for offering in offerings})
+    return sorted(offerings, key=lambda offering: (ranks[offering.university],
+                                                  offering.faculty_index,
+                                                  offering.department_index))
+
+class OfferingPage:
+    """One page of the offerings of a name, grouped by city.
+
+    Pages are numbered from 1; a page past the end is clamped to the last one.
+    groups lists (city, offerings on this page) in order and city_totals the
+    number of offerings per city over all pages.
+    """
+
+    def __init__(self, name, level, offerings, page=1, per_page=50):
+        self.name = name
+        self.level = level
+        self.total = len(offerings)
+        self.per_page = max(1, per_page)
+        self.pages = max(1, -(-self.total // self.per_page))
+        self.page = min(max(1, page), self.pages)
+        start = (self.page - 1) * self.per_page
+        self.groups = []
+        for offering in offerings[start:start + self.per_page]:
+            if not self.groups or self.groups[-1][0] != offering.city:
+                self.groups.append((offering.city, []))
+            self.groups[-1][1].append(offering)
+        self.city_totals = Counter(offering.city for offering in offerings)
+
+    @property
+    def offerings(self):
+        return [offering for _, offerings in self.groups for offering in offerings]
+
+    def to_dict(self):
+        return {
+            'name': self.name,
+            'level': self.level,
+            'total': self.total,
+            'page': self.page,
+            'pages': self.pages,
+            'per_page': self.per_page,
+            'cities': [
+                {'city': city, 'total': self.city_totals[city],
+                 'offerings': [offering.to_dict() for offering in offerings]}
+                for city, offerings in self.groups
+            ],
+        }
+
+class OfferingIndex:
+    """Subject and department names -> the Offerings teaching them.
+
+    Names are matched after fold(), so "machine learning" finds "Machine
+    Learning". Each university contributes one Offering per department it
+    offers, shared by all of that department's subjects; the in-memory backend
+    keeps the index in step with edits, the others build it on first use.
+    """
+
+    LEVELS = ('subject', 'department')
+    PAGE_SIZE = 50
+
+    def __init__(self):
+        self.postings = {level: {} for level in self.LEVELS}  # level -> folded -> [Offering]
+        self._names = {level: {} for level in self.LEVELS}    # level -> folded -> display name
+        self._keys = {}    # university -> (level, folded name) keys it was posted under
+        self._sorted = {}  # (level, folded name) -> offerings in offering_order
+        self._folded = {}  # name -> fold(name), as the same names recur everywhere
+        self._ranks = None  # university_ranks() of the indexed universities
+
+    def __len__(self):
+        return len(self._keys)
+
+    def add(self, university, offerings_with_subjects):
+        """Index a university's (Offering, subjects) pairs; re-adding one re-indexes it."""
+        self.remove_university(university)
+        keys = {}
+        folded_names = self._folded
+        for offering, subjects in offerings_with_subjects:
+            for level, names in (('department', (offering.department,)),
+                                 ('subject', dict.fromkeys(subjects))):
+                postings = self.postings[level]
+                for name in names:
+                    folded = folded_names.get(name)
+                    if folded is None:
+                        folded = folded_names[name] = fold(name)
+                    offerings = postings.get(folded)
+                    if offerings is None:
+                        offerings = postings[folded] = []
+                        self._names[level][folded] = name
+                    offerings.append(offering)
+                    keys[level, folded] = None
+        self._keys[university] = keys
+        self._sorted.clear()
+        self._ranks = None
+
+    def add_university(self, university):
+        self.add(university, (
+            (Offering(university, faculty.name, dept.name, fi, di), dept.subjects)
+            for fi, faculty in enumerate(university.faculties)
+            for di, dept in enumerate(faculty.departments)))
+
+    def remove_university(self, university):
+        keys = self._keys.pop(university, None)
+        if keys is None:
+            return
+        for level, folded in keys:
+            offerings = [offering for offering in self.postings[level][folded]
+                         if offering.university is not university]
+            if offerings:
+                self.postings[level][folded] = offerings
+            else:
+                del self.postings[level][folded]
+                del self._names[level][folded]
+        self._sorted.clear()
+        self._ranks = None
+
+    def canonical(self, name, level='subject'):
+        """The catalogue's spelling of a name, or None if nothing offers it."""
+        return self._names[level].get(fold(name))
+
+    def lookup(self, name, level='subject'):
+        """All Offerings of a subject or department name, sorted by city and university."""
+        key = (level, fold(name))
+        offerings = self._sorted.get(key)
+        if offerings is None:
+            offerings = self.postings[level].get(key[1])
+            if not offerings:
+                return []
+            if self._ranks is None:
+                self._ranks = university_ranks(self._keys)
+            offerings = self._sorted[key] = offering_order(offerings, self._ranks)
+        return offerings
+
+    def page(self, name, level='subject', page=1, per_page=PAGE_SIZE):
+        """An OfferingPage of a name's offerings, or None if nothing offers it."""
+        canonical = self.canonical(name, level)
+        if canonical is None:
+            return None
+        return OfferingPage(canonical, level, self.lookup(name, level), page, per_page)
@@ -0,0 +1,303 @@
+"""
+Inverted n-gram search index over every name in the catalogue.
+"""
+
+import heapq
+import math
+import unicodedata
+from collections import Counter
+
+# ASCII characters in Unicode's punctuation categories (quotes, dashes, brackets, ...)
+_ASCII_PUNCTUATION = str.maketrans({char: ' ' for char in map(chr, range(128))
+                                    if unicodedata.category(char).startswith('P')})
+
+def fold(text):
+    """Case- and accent-fold text, so "Prishtinë" and "PRISHTINE" compare equal.
+    
+    Diacritics (ë, ç, ...) are stripped after NFKD decomposition, punctuation
+    such as the quotes in 'University of Gjilan "Kadri Zeka"' becomes a space
+    and runs of whitespace collapse to a single space.
+    """
+    text = text.casefold()
+    if not text.isascii():
+        text = ''.join(' ' if unicodedata.category(char).startswith('P') else char
+                       for char in unicodedata.normalize('NFKD', text)
+                       if not unicodedata.combining(char))
+    return ' '.join(text.translate(_ASCII_PUNCTUATION).split())
+
+def trigrams(folded):
+    """The trigrams of a folded name, padded so word boundaries count."""
+    padded = f" {folded} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+def exact_score(term, folded):
+    """Score of a name containing the search term: shorter names rank higher."""
+    return 0.7 + 0.3 * len(term) / len(folded)
+
+def fuzzy_score(shared, term_grams, name_grams):
+    """Score of a name sharing `shared` trigrams with the query.
+    
+    Mostly the share of the query's trigrams found in the name (so a short
+    query still matches a long name), plus a little Dice overlap so names
+    close to the query's length win ties.
+    """
+    return 0.7 * shared / term_grams + 0.3 * 2 * shared / (term_grams + name_grams)
+
+def rank_key(exact, score, folded):
+    """Sort key of a ranked name: containing ones first, then by score, ties by name.
+    
+    Every backend orders by it, so equal scores never fall back to ids that
+    differ between stores.
+    """
+    return (not exact, -score, folded)
+
+class SearchCancelled(Exception):
+    """Raised when a running search is cancelled by a newer query."""
+
+class SearchMatch:
+    """A single search hit, recording which level of the hierarchy matched."""
+    
+    def __init__(self, university, level, name, context=None):
+        self.university = university
+        self.level = level
+        self.name = name
+        self.context = context
+        self.position = 0
+        self.score = None
+
+    def __str__(self):
+        text = f"matched {self.level} '{self.name}'"
+        if self.context is not None:
+            text += f" in {self.context}"
+        if self.score is not None:
+            text += f" ({self.score:.0%})"
+        return text
+
+    def ranked(self, score):
+        """Return a copy of this match carrying a ranking score."""
+        match = SearchMatch(self.university, self.level, self.name, self.context)
+        match.position = self.position
+        match.score = score
+        return match
+
+class SearchIndex:
+    """Inverted n-gram index over university, faculty, department and subject names.
+    
+    Every distinct folded name (see fold) is indexed once under the 2- and
+    3-grams of " name ", so a substring lookup only has to verify the names
+    sharing all n-grams of the query instead of walking the whole
+    University -> Faculty -> Department tree, and a fuzzy lookup only has to
+    score the names sharing some of its rarest trigrams.
+    """
+    
+    LEVELS = ('university', 'faculty', 'department', 'subject')
+    GRAM_SIZES = (2, 3)
+    FUZZY_THRESHOLD = 0.5     # share of the query's trigrams a fuzzy match must contain
+
+    def __init__(self):
+        self._name_ids = {}       # folded name -> name id
+        self._names = []          # name id -> folded name (None once released)
+        self._free_ids = []       # released name ids, reused before new ones are handed out
+        self._gram_counts = []    # name id -> number of trigrams of the name
+        self._postings = {}       # n-gram -> set of name ids
+        self._matches = []        # name id -> {university: [SearchMatch, ...]}
+        self._by_university = {}  # university -> set of name ids it contributed
+        self._order = {}          # university -> insertion sequence
+        self._sequence = 0
+        self._positions = 0       # tie-breaker keeping matches in tree order
+
+    def __len__(self):
+        return len(self._order)
+
+    @classmethod
+    def _grams(cls, text, size):
+        return {text[i:i + size] for i in range(len(text) - size + 1)}
+
+    def _intern_name(self, folded):
+        name_id = self._name_ids.get(folded)
+        if name_id is None:
+            if self._free_ids:
+                # Recycle a released slot, so add/remove cycles do not grow the lists
+                name_id = self._free_ids.pop()
+                self._names[name_id] = folded
+                self._gram_counts[name_id] = len(trigrams(folded))
+                self._matches[name_id] = {}
+            else:
+                name_id = len(self._names)
+                self._names.append(folded)
+                self._gram_counts.append(len(trigrams(folded)))
+                self._matches.append({})
+            self._name_ids[folded] = name_id
+            for size in self.GRAM_SIZES:
+                for gram in self._grams(f" {folded} ", size):
+                    self._postings.setdefault(gram, set()).add(name_id)
+        return name_id
+
+    def _release_name(self, name_id):
+        folded = self._names[name_id]
+        for size in self.GRAM_SIZES:
+            for gram in self._grams(f" {folded} ", size):
+                postings = self._postings.get(gram)
+                if postings is not None:
+                    postings.discard(name_id)
+                    if not postings:
+                        del self._postings[gram]
+        del self._name_ids[folded]
+        self._names[name_id] = None
+        self._free_ids.append(name_id)
+
+    def _add_match(self, match):
+        match.position = self._positions
+        self._positions += 1
+        name_id = self._intern_name(fold(match.name))
+        self._matches[name_id].setdefault(match.university, []).append(match)
+        self._by_university[match.university].add(name_id)
+
+    def add_university(self, university):
+        """Index a university together with all of its faculties, departments and subjects."""
+        sequence = self._order.get(university)
+        if sequence is not None:
+            # Re-indexing an edited university keeps its original position
+            self.remove_university(university)
+        else:
+            sequence = self._sequence
+            self._sequence += 1
+        self._order[university] = sequence
+        self._by_university[university] = set()
+        
+        self._add_match(SearchMatch(university, 'university', university.name))
+        for faculty in university.faculties:
+            self._add_match(SearchMatch(university, 'faculty', faculty.name, university.name))
+            for dept in faculty.departments:
+                self._add_match(SearchMatch(university, 'department', dept.name, faculty.name))
+                for subject in dept.subjects:
+                    self._add_match(SearchMatch(university, 'subject', subject, dept.name))
+
+    def remove_university(self, university):
+        """Drop every entry contributed by a university."""
+        name_ids = self._by_university.pop(university, None)
+        if name_ids is None:
+            return
+        del self._order[university]
+        for name_id in name_ids:
+            by_university = self._matches[name_id]
+            by_university.pop(university, None)
+            if not by_university:
+                self._release_name(name_id)
+
+    def _candidates(self, term):
+        if len(term) < min(self.GRAM_SIZES):
+            return [name_id for folded, name_id in self._name_ids.items() if term in folded]
+        
+        size = max(s for s in self.GRAM_SIZES if s <= len(term))
+        postings = [self._postings.get(gram) for gram in self._grams(term, size)]
+        if not all(postings):
+            return []
+        postings.sort(key=len)
+        candidates = set(postings[0])
+        for other in postings[1:]:
+            candidates &= other
+            if not candidates:
+                break
+        return candidates
+
+    def search(self, search_term, cancel_event=None):
+        """Return SearchMatch objects for every name containing the search term.
+        
+        Case and diacritics are ignored. Matches are ordered by university (in
+        indexing order) and then by level, so the university itself comes before
+        its faculties, departments and subjects. If cancel_event (a
+        threading.Event) gets set while the lookup runs, SearchCancelled is raised.
+        """
+        term = fold(search_term)
+        if not term:
+            return []
+        
+        results = []
+        for checked, name_id in enumerate(self._candidates(term)):
+            if cancel_event is not None and checked % 256 == 0 and cancel_event.is_set():
+                raise SearchCancelled(search_term)
+            if term in self._names[name_id]:
+                for matches in self._matches[name_id].values():
+                    results.extend(matches)
+                    
+        level_rank = {level: rank for rank, level in enumerate(self.LEVELS)}
+        results.sort(key=lambda m: (self._order[m.university], level_rank[m.level], m.position))
+        return results
+
+    def _exact_scores(self, term, cancel_event):
+        """Scores of the names containing term; short terms must start a word."""
+        scores = {}
+        if len(term) < 3:
+            candidates = self._postings.get(" " + term, ())
+            term = " " + term
+        else:
+            candidates = self._candidates(term)
+        for checked, name_id in enumerate(candidates):
+            if cancel_event is not None and checked % 256 == 0 and cancel_event.is_set():
+                raise SearchCancelled(term)
+            folded = self._names[name_id]
+            if term in f" {folded}":
+                scores[name_id] = exact_score(term.strip(), folded)
+        return scores
+
+    def _fuzzy_scores(self, term, cancel_event):
+        """Scores of the names sharing enough trigrams with term.
+        
+        A name sharing at least `needed` of the query's q trigrams must appear in
+        one of the q - needed + 1 rarest postings, so only those are merged; the
+        commoner postings are then only probed for the candidates found.
+        """
+        grams = sorted(trigrams(term), key=lambda gram: len(self._postings.get(gram, ())))
+        needed = max(2, math.ceil(self.FUZZY_THRESHOLD * len(grams)))
+        if needed > len(grams):
+            return {}
+        probe = len(grams) - needed + 1
+        shared = Counter()
+        for gram in grams[:probe]:
+            shared.update(self._postings.get(gram, ()))
+        for gram in grams[probe:]:
+            if cancel_event is not None and cancel_event.is_set():
+                raise SearchCancelled(term)
+            postings = self._postings.get(gram)
+            if postings:
+                shared.update(shared.keys() & postings)
+        return {
+            name_id: fuzzy_score(count, len(grams), self._gram_counts[name_id])
+            for name_id, count in shared.items() if count >= needed
+        }
+
+    def ranked_search(self, search_term, limit=50, cancel_event=None):
+        """Return up to limit SearchMatch copies ranked by how well their names match.
+        
+        Case and diacritics are ignored and typos tolerated: names containing the
+        term rank first (shorter names higher), followed by names sharing at least
+        FUZZY_THRESHOLD of the term's trigrams, by trigram similarity. Each match
+        carries its .score in (0, 1]; names scoring the same are taken in
+        alphabetical order. Terms under three characters only match names with a
+        word starting with them.
+        """
+        term = fold(search_term)
+        if not term or limit <= 0:
+            return []
+        
+        exact = self._exact_scores(term, cancel_event)
+        ranked = {name_id: (True, score) for name_id, score in exact.items()}
+        if len(term) >= 3 and len(exact) < limit:
+            for name_id, score in self._fuzzy_scores(term, cancel_event).items():
+                ranked.setdefault(name_id, (False, score))
+            
+        # Every name carries at least one match, so the best `limit` names suffice
+        level_rank = {level: rank for rank, level in enumerate(self.LEVELS)}
+        results = []
+        best = heapq.nsmallest(limit, ranked,
+                               key=lambda name_id: rank_key(*ranked[name_id], self._names[name_id]))
+        for name_id in best:
+            score = ranked[name_id][1]
+            matches = [match for by_university in self._matches[name_id].values()
+                       for match in by_university]
+            matches.sort(key=lambda m: (level_rank[m.level], self._order[m.university], m.position))
+            results.extend(match.ranked(round(score, 3)) for match in matches[:limit - len(results)])
+            if len(results) >= limit:
+                break
+        return results
@@ -0,0 +1,404 @@
+"""
+Local HTTP/JSON service for the catalogue.
+
+Serves the catalogue read-only on the loopback interface so other tools on the
+same machine can query it without loading and indexing it themselves:
+
+    GET /cities                                     cities with university counts
+    GET /cities/<city>                              universities in a city
+    GET /universities                               all universities
+    GET /universities/<name>                        a university (?city= picks among namesakes)
+    GET /universities/<name>/faculties              faculties of a university
+    GET /universities/<name>/faculties/<faculty>    a faculty with departments and subjects
+    GET /universities/<name>/faculties/<faculty>/departments
+    GET /departments?name=<department>              everywhere a department is taught
+    GET /where?subject=<subject>[&page=N][&per_page=N]
+                                                    where a subject is taught, by city
+                                                    (or ?department=<department>)
+    GET /search?q=<term>[&limit=N][&fuzzy=1]        search matches grouped by university
+    GET /suggest?q=<prefix>[&limit=N]               names starting with a prefix, most offered first
+    GET /stats                                      catalogue statistics
+
+Every successful response is encoded once per catalogue version and kept in
+memory together with its ETag, so hot endpoints are answered without touching
+the catalogue and clients sending If-None-Match get an empty 304 instead.
+"""
+
+import asyncio
+import hashlib
+import ipaddress
+import json
+from collections import OrderedDict
+from urllib.parse import parse_qs, unquote, urlsplit
+
+from .models import QYTETET
+from .offerings import OfferingIndex
+from .suggest import SuggestionIndex
+
+DEFAULT_HOST = '127.0.0.1'
+DEFAULT_PORT = 8765
+
+STATUS_REASONS = {
+    200: 'OK',
+    304: 'Not Modified',
+    400: 'Bad Request',
+    404: 'Not Found',
+    405: 'Method Not Allowed',
+    500: 'Internal Server Error',
+}
+
+class ServiceError(Exception):
+    """An error answered with an HTTP status and a JSON {"error": ...} body."""
+
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+class CachedResponse:
+    """An encoded JSON response body and its ETag."""
+
+    __slots__ = ('body', 'etag')
+
+    def __init__(self, payload):
+        self.body = json.dumps(payload, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+        self.etag = f'"{hashlib.blake2b(self.body, digest_size=12).hexdigest()}"'
+
+    def matches(self, if_none_match):
+        """True if an If-None-Match header value names this response."""
+        if not if_none_match:
+            return False
+        tags = [tag.strip() for tag in if_none_match.split(',')]
+        return '*' in tags or any(tag.removeprefix('W/') == self.etag for tag in tags)
+
+def is_loopback(host):
+    """True if host names the loopback interface."""
+    if host == 'localhost':
+        return True
+    try:
+        return ipaddress.ip_address(host).is_loopback
+    except ValueError:
+        return False
+
+def university_summary(uni):
+    return {'name': uni.name, 'city': uni.city, 'faculties': len(uni.faculties)}
+
+class CatalogueService:
+    """Answers catalogue queries over HTTP on the loopback interface."""
+
+    HOT_PATHS = ('/stats', '/cities', '/universities')
+    FUZZY_MATCHES = 200
+    CACHE_SIZE = 1024
+    KEEPALIVE_TIMEOUT = 15
+
+    def __init__(self, manager, host=DEFAULT_HOST, port=DEFAULT_PORT, cache_size=CACHE_SIZE):
+        if not is_loopback(host):
+            raise ValueError(f"the catalogue service only listens on loopback, not {host!r}")
+        self.manager = manager
+        self.host = host
+        self.port = port
+        self.cache_size = cache_size
+        self._responses = OrderedDict()
+        self._version = None
+        self._server = None
+
+    # Responses
+
+    def _check_version(self):
+        """Drop every cached response once the catalogue has changed."""
+        version = getattr(self.manager, 'version', None)
+        if version != self._version:
+            self._responses.clear()
+            self._version = version
+
+    def cached(self, key):
+        self._check_version()
+        response = self._responses.get(key)
+        if response is not None:
+            self._responses.move_to_end(key)
+        return response
+
+    def store(self, key, response, version):
+        if version != getattr(self.manager, 'version', None):
+            # The catalogue changed while the response was being built
+            return
+        self._responses[key] = response
+        self._responses.move_to_end(key)
+        while len(self._responses) > self.cache_size:
+            self._responses.popitem(last=False)
+
+    def warm(self):
+        """Encode the hot endpoints ahead of the first request."""
+        for path in self.HOT_PATHS:
+            self.get(path)
+
+    def get(self, target):
+        """Return the CachedResponse for a request target, building it on a cache miss.
+
+        Raises ServiceError for unknown routes and bad parameters.
+        """
+        key, segments, query = self.parse_target(target)
+        response = self.cached(key)
+        if response is None:
+            version = self._version
+            response = self.build(segments, query)
+            self.store(key, response, version)
+        return response
+
+    def build(self, segments, query):
+        """Encode the response of a route; safe to call off the event loop."""
+        return CachedResponse(self.payload(segments, query))
+
+    @staticmethod
+    def parse_target(target):
+        """Split a request target into (cache key, path segments, query dict)."""
+        parts = urlsplit(target)
+        segments = [unquote(segment) for segment in parts.path.strip('/').split('/') if segment]
+        query = {name: values[-1] for name, values in parse_qs(parts.query).items()}
+        key = '/' + '/'.join(segments)
+        if query:
+            key += '?' + '&'.join(f"{name}={query[name]}" for name in sorted(query))
+        return key, segments, query
+
+    def payload(self, segments, query):
+        """Build the JSON payload of a route."""
+        if not segments:
+            return {'endpoints': ['/cities', '/universities', '/departments?name=',
+                                  '/where?subject=', '/search?q=', '/suggest?q=', '/stats']}
+        head, rest = segments[0], segments[1:]
+        if head == 'stats' and not rest:
+            return self.manager.statistics()
+        if head == 'cities':
+            return self.city_payload(*rest) if len(rest) <= 1 else self.not_found()
+        if head == 'universities':
+            return self.university_payload(rest, query.get('city'))
+        if head == 'departments' and not rest:
+            return self.department_payload(query)
+        if head == 'where' and not rest:
+            return self.where_payload(query)
+        if head == 'search' and not rest:
+            return self.search_payload(query)
+        if head == 'suggest' and not rest:
+            return self.suggest_payload(query)
+        return self.not_found()
+
+    @staticmethod
+    def not_found(what="No such resource"):
+        raise ServiceError(404, what)
+
+    @staticmethod
+    def positive_int(query, name, default=None):
+        """The integer query parameter name, or default if it is missing; 400 unless it is > 0."""
+        if name not in query:
+            return default
+        try:
+            value = int(query[name])
+        except ValueError:
+            value = 0
+        if value < 1:
+            raise ServiceError(400, f"'{name}' must be a positive integer")
+        return value
+
+    def city_payload(self, city=None):
+        if city is None:
+            cities = self.manager.statistics()['cities']
+            names = list(QYTETET.values())
+            names += [name for name in cities if name not in names]
+            payload = []
+            for name in names:
+                counts = cities.get(name, {})
+                payload.append({'city': name, 'universities': counts.get('unis', 0),
+                                'faculties': counts.get('faculties', 0)})
+            return payload
+        universities = self.manager.universities_in_city(city)
+        if not universities and city not in QYTETET.values():
+            self.not_found(f"Unknown city '{city}'")
+        return {'city': city, 'universities': [university_summary(uni) for uni in universities]}
+
+    def university_payload(self, path, city=None):
+        if not path:
+            return [university_summary(uni) for uni in self.manager.universities]
+
+        name, rest = path[0], path[1:]
+        universities = self.manager.find_universities(name)
+        if city:
+            universities = [uni for uni in universities if uni.city == city]
+        if not universities:
+            self.not_found(f"No university named '{name}'")
+        uni = universities[0]
+
+        if not rest:
+            return uni.to_dict()
+        if rest[0] != 'faculties' or len(rest) > 3 or (len(rest) == 3 and rest[2] != 'departments'):
+            return self.not_found()
+        if len(rest) == 1:
+            return [{'name': faculty.name, 'departments': len(faculty.departments)}
+                    for faculty in uni.faculties]
+
+        faculty = next((faculty for faculty in uni.faculties if faculty.name == rest[1]), None)
+        if faculty is None:
+            self.not_found(f"{uni.name} has no faculty named '{rest[1]}'")
+        if len(rest) == 3:
+            return [dept.to_dict() for dept in faculty.departments]
+        return dict(faculty.to_dict(), university=uni.name, city=uni.city)
+
+    def department_payload(self, query):
+        name = query.get('name')
+        if not name:
+            raise ServiceError(400, "Missing department 'name' parameter")
+        offerings = self.manager.offering_index().lookup(name, 'department')
+        return [
+            {'university': offering.university.name, 'city': offering.city,
+             'faculty': offering.faculty, 'department': offering.locate()[1].to_dict()}
+            for offering in offerings
+        ]
+
+    def where_payload(self, query):
+        level = next((level for level in OfferingIndex.LEVELS if query.get(level)), None)
+        if level is None:
+            raise ServiceError(400, "Missing 'subject' or 'department' parameter")
+        page = self.positive_int(query, 'page', 1)
+        per_page = self.positive_int(query, 'per_page', OfferingIndex.PAGE_SIZE)
+        result = self.manager.offering_index().page(query[level], level, page, per_page)
+        if result is None:
+            self.not_found(f"No {level} named '{query[level]}'")
+        return result.to_dict()
+
+    def search_payload(self, query):
+        term = query.get('q', '').strip()
+        if not term:
+            raise ServiceError(400, "Missing search term 'q' parameter")
+        limit = self.positive_int(query, 'limit')
+
+        if query.get('fuzzy', '0') not in ('', '0', 'false'):
+            matches = self.manager.ranked_search(term, self.FUZZY_MATCHES)
+        else:
+            matches = self.manager.search(term)
+        matches_by_uni = {}
+        for match in matches:
+            matches_by_uni.setdefault(match.university, []).append(match)
+        return {
+            'query': term,
+            'total': len(matches_by_uni),
+            'results': [
+                {
+                    'university': uni.name,
+                    'city': uni.city,
+                    'matches': [{'level': m.level, 'name': m.name, 'context': m.context,
+                                 'score': m.score}
+                                for m in matches],
+                }
+                for uni, matches in list(matches_by_uni.items())[:limit]
+            ],
+        }
+
+    def suggest_payload(self, query):
+        prefix = query.get('q', '').strip()
+        if not prefix:
+            raise ServiceError(400, "Missing prefix 'q' parameter")
+        limit = self.positive_int(query, 'limit', SuggestionIndex.TOP_K)
+        suggestions = self.manager.suggestion_index().complete(prefix, limit)
+        return {'query': prefix,
+                'suggestions': [suggestion.to_dict() for suggestion in suggestions]}
+
+    # HTTP
+
+    async def respond(self, method, target, headers):
+        """Return (status, extra headers, body) for a request."""
+        if method not in ('GET', 'HEAD'):
+            error = CachedResponse({'error': f"Method {method} not allowed"})
+            return 405, [('Allow', 'GET, HEAD')], error.body
+
+        key, segments, query = self.parse_target(target)
+        response = self.cached(key)
+        if response is None:
+            # Cold routes (searches, large lists) are built off the event loop;
+            # the cache itself is only touched from the loop
+            version = self._version
+            loop = asyncio.get_running_loop()
+            try:
+                response = await loop.run_in_executor(None, self.build, segments, query)
+            except ServiceError as e:
+                return e.status, [], CachedResponse({'error': str(e)}).body
+            except Exception as e:
+                return 500, [], CachedResponse({'error': f"{type(e).__name__}: {e}"}).body
+            self.store(key, response, version)
+
+        response_headers = [('ETag', response.etag), ('Cache-Control', 'no-cache')]
+        if response.matches(headers.get('if-none-match')):
+            return 304, response_headers, b''
+        return 200, response_headers, response.body
+
+    @staticmethod
+    def encode_response(status, headers, body, keep_alive, head_only=False):
+        lines = [f"HTTP/1.1 {status} {STATUS_REASONS.get(status, '')}"]
+        if status != 304:
+            lines.append("Content-Type: application/json; charset=utf-8")
+            lines.append(f"Content-Length: {len(body)}")
+        lines.extend(f"{name}: {value}" for name, value in headers)
+        lines.append(f"Connection: {'keep-alive' if keep_alive else 'close'}")
+        head = ('\r\n'.join(lines) + '\r\n\r\n').encode('latin-1')
+        return head if head_only or status == 304 else head + body
+
+    async def handle_connection(self, reader, writer):
+        """Serve the requests of one (possibly keep-alive) connection."""
+        try:
+            while True:
+                try:
+                    request_line = await asyncio.wait_for(reader.readline(), self.KEEPALIVE_TIMEOUT)
+                except asyncio.TimeoutError:
+                    break
+                if not request_line.strip():
+                    break
+
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b'\r\n', b'\n', b''):
+                        break
+                    name, _, value = line.decode('latin-1').partition(':')
+                    headers[name.strip().lower()] = value.strip()
+
+                try:
+                    method, target, version = request_line.decode('latin-1').split()
+                except ValueError:
+                    error = CachedResponse({'error': "Malformed request line"})
+                    writer.write(self.encode_response(400, [], error.body, keep_alive=False))
+                    break
+
+                connection = headers.get('connection', '').lower()
+                keep_alive = (connection != 'close' if version == 'HTTP/1.1'
+                              else connection == 'keep-alive')
+                status, response_headers, body = await self.respond(method, target, headers)
+                if status == 405:
+                    # Any request body is left unread, so the connection cannot be reused
+                    keep_alive = False
+                writer.write(self.encode_response(status, response_headers, body, keep_alive,
+                                                  head_only=method == 'HEAD'))
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (ConnectionError, ValueError, asyncio.IncompleteReadError):
+            # Client went away mid-request, or sent an oversized line
+            pass
+        finally:
+            writer.close()
+
+    async def start(self):
+        """Start listening; returns the asyncio server (self.port is set to the bound port)."""
+        self.warm()
+        self._server = await asyncio.start_server(self.handle_connection, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+        return self._server
+
+def run_service(manager, host=DEFAULT_HOST, port=DEFAULT_PORT, ready=None):
+    """Serve the catalogue until interrupted; ready(service) is called once listening."""
+    service = CatalogueService(manager, host, port)
+
+    async def serve():
+        server = await service.start()
+        if ready:
+            ready(service)
+        async with server:
+            await server.serve_forever()
+
+    asyncio.run(serve())
@@ -0,0 +1,146 @@
+"""
+Incrementally maintained catalogue statistics.
+"""
+
+import heapq
+
+class StatisticsAggregate:
+    """Offered and unique counts for one slice of the catalogue (a city or all of it)."""
+    
+    def __init__(self):
+        self.universities = 0
+        self.faculties = 0
+        self.departments = 0
+        self.subjects = 0
+        self.faculty_refs = {}
+        self.department_refs = {}
+        self.subject_refs = {}
+
+    @staticmethod
+    def _count(refs, keys, sign):
+        for key in keys:
+            count = refs.get(key, 0) + sign
+            if count:
+                refs[key] = count
+            else:
+                del refs[key]
+
+    def apply(self, contribution, sign):
+        """Add (sign=1) or subtract (sign=-1) one university's contribution."""
+        _, faculties, departments, subjects = contribution
+        self.universities += sign
+        self.faculties += sign * len(faculties)
+        self.departments += sign * len(departments)
+        self.subjects += sign * len(subjects)
+        self._count(self.faculty_refs, faculties, sign)
+        self._count(self.department_refs, departments, sign)
+        self._count(self.subject_refs, subjects, sign)
+
+    def as_dict(self):
+        return {
+            'unis': self.universities,
+            'faculties': self.faculties,
+            'departments': self.departments,
+            'subjects': self.subjects,
+            'unique_faculties': len(self.faculty_refs),
+            'unique_departments': len(self.department_refs),
+            'unique_subjects': len(self.subject_refs),
+        }
+
+class CatalogueStatistics:
+    """Catalogue aggregates maintained incrementally as universities come and go.
+    
+    Each university's contribution is recorded when it is added, so removing or
+    re-adding it only touches its own counts. Totals count every offering (a
+    faculty shared by three universities counts three times); unique counts see
+    each Faculty and Department object and each subject name once. The largest
+    universities are kept in a bounded min-heap, and the statistics() snapshot
+    is cached until the next change.
+    """
+    
+    def __init__(self, top_n=5):
+        self.top_n = top_n
+        self.totals = StatisticsAggregate()
+        self.cities = {}
+        self._contributions = {}  # university -> (city, faculties, departments, subjects)
+        self._sequence = {}       # university -> insertion sequence, used to break ties
+        self._next_sequence = 0
+        self._top = []            # min-heap of (faculty count, -sequence, university)
+        self._top_complete = True
+        self._snapshot = None
+
+    @staticmethod
+    def contribution(university):
+        faculties = list(university.faculties)
+        departments = [dept for faculty in faculties for dept in faculty.departments]
+        subjects = [subject for dept in departments for subject in dept.subjects]
+        return university.city, faculties, departments, subjects
+
+    def add_university(self, university):
+        """Count a university; adding one that is already counted re-counts it."""
+        if university in self._contributions:
+            self._subtract(university)
+        else:
+            self._sequence[university] = self._next_sequence
+            self._next_sequence += 1
+            
+        contribution = self.contribution(university)
+        self._contributions[university] = contribution
+        self.totals.apply(contribution, 1)
+        self.cities.setdefault(contribution[0], StatisticsAggregate()).apply(contribution, 1)
+        
+        entry = (len(contribution[1]), -self._sequence[university], university)
+        if len(self._top) < self.top_n:
+            if self._top_complete:
+                heapq.heappush(self._top, entry)
+        elif entry > self._top[0]:
+            heapq.heapreplace(self._top, entry)
+        self._snapshot = None
+
+    def remove_university(self, university):
+        """Subtract a university's recorded contribution."""
+        if university in self._contributions:
+            self._subtract(university)
+            del self._sequence[university]
+
+    def _subtract(self, university):
+        contribution = self._contributions.pop(university)
+        self.totals.apply(contribution, -1)
+        city = self.cities[contribution[0]]
+        city.apply(contribution, -1)
+        if not city.universities:
+            del self.cities[contribution[0]]
+            
+        if any(entry[2] is university for entry in self._top):
+            # The heap only holds the current top N; refill it lazily on next read
+            self._top = [entry for entry in self._top if entry[2] is not university]
+            heapq.heapify(self._top)
+            self._top_complete = False
+        self._snapshot = None
+
+    def largest(self):
+        """Return the top_n universities by faculty count as (name, count) pairs."""
+        if not self._top_complete:
+            self._top = heapq.nlargest(
+                self.top_n,
+                ((len(c[1]), -self._sequence[uni], uni) for uni, c in self._contributions.items()))
+            heapq.heapify(self._top)
+            self._top_complete = True
+        return [(uni.name, count) for count, _, uni in sorted(self._top, reverse=True)]
+
+    def statistics(self):
+        """Return the aggregates as a dictionary (cached until the next change)."""
+        if self._snapshot is None:
+            totals = self.totals.as_dict()
+            self._snapshot = {
+                'total_universities': totals['unis'],
+                'total_faculties': totals['faculties'],
+                'total_departments': totals['departments'],
+                'total_subjects': totals['subjects'],
+                'unique_faculties': totals['unique_faculties'],
+                'unique_departments': totals['unique_departments'],
+                'unique_subjects': totals['unique_subjects'],
+                'cities': {city: aggregate.as_dict() for city, aggregate in self.cities.items()},
+                'largest': self.largest(),
+            }
+        return self._snapshot
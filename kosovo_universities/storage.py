@@ -0,0 +1,687 @@
+"""
+SQLite-backed catalogue backend with lazily loaded faculties and departments.
+"""
+
+import heapq
+import json
+import math
+import os
+import sqlite3
+import sys
+import threading
+from collections.abc import Sequence
+
+from .compare import ComparisonIndex
+from .data import UniversityDataManager
+from .facets import FacetIndex
+from .loader import CatalogueLoader
+from .models import Department, Faculty, University
+from .offerings import Offering, OfferingIndex
+from .search import (SearchCancelled, SearchIndex, SearchMatch, exact_score, fold,
+                     fuzzy_score, rank_key, trigrams)
+from .suggest import SuggestionIndex
+
+class LazyList(Sequence):
+    """Read-only sequence whose items are fetched on first access.
+    
+    The length is known up front, so views that only print counts never
+    trigger the load.
+    """
+    
+    def __init__(self, count, load):
+        self._count = count
+        self._load = load
+        self._items = None
+
+    def _materialize(self):
+        if self._items is None:
+            self._items = self._load()
+            self._load = None
+        return self._items
+
+    @property
+    def loaded(self):
+        return self._items is not None
+
+    def __len__(self):
+        return self._count if self._items is None else len(self._items)
+
+    def __getitem__(self, index):
+        return self._materialize()[index]
+
+    def __iter__(self):
+        return iter(self._materialize())
+
+class SQLiteDataManager:
+    """Catalogue backend that keeps the data in an on-disk SQLite store.
+    
+    Only university rows are held in memory; faculties and departments are
+    fetched lazily the first time a university or faculty is drilled into.
+    City filtering, name lookup and statistics are indexed SQL queries and the
+    search box is served by an FTS5 trigram index. The interface mirrors
+    UniversityDataManager so the GUI can use either backend.
+    """
+    
+    LEVEL_CODES = {level: code for code, level in enumerate(SearchIndex.LEVELS)}
+    FUZZY_CANDIDATES = 20000
+    INDEXES = """
+        CREATE INDEX IF NOT EXISTS idx_universities_city ON universities(city);
+        CREATE INDEX IF NOT EXISTS idx_universities_name ON universities(name);
+        CREATE INDEX IF NOT EXISTS idx_faculties_university ON faculties(university_id);
+        CREATE INDEX IF NOT EXISTS idx_departments_faculty ON departments(faculty_id);
+        CREATE INDEX IF NOT EXISTS idx_subjects_department ON subjects(department_id);
+        CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT);
+    """
+    # What INDEXES and _ensure_fts add to a plain catalogue file
+    DERIVED = ('idx_universities_city', 'idx_universities_name', 'idx_faculties_university',
+               'idx_departments_faculty', 'idx_subjects_department', 'meta', 'names_fts',
+               'names_vocab')
+    # Per-city statistics, in the order of StatisticsAggregate.as_dict()
+    CITY_COUNTS = ('unis', 'faculties', 'departments', 'subjects', 'unique_faculties',
+                   'unique_departments', 'unique_subjects')
+
+    def __init__(self, path, data_source=None, read_only=False):
+        """Open the store at path; read_only opens it with mode=ro and never writes to it.
+        
+        A read-only store must already have everything this backend derives
+        (see is_ready); editing it raises sqlite3.OperationalError.
+        """
+        self.path = path
+        self.data_source = data_source
+        self.read_only = read_only
+        self._lock = threading.RLock()
+        if read_only:
+            self._connection = sqlite3.connect(f"file:{path}?mode=ro", uri=True,
+                                               check_same_thread=False)
+            self._has_fts = True
+        else:
+            self._connection = sqlite3.connect(path, check_same_thread=False)
+            self._connection.executescript(CatalogueLoader.SQLITE_SCHEMA + self.INDEXES)
+            self._has_fts = self._ensure_fts()
+        self._stats = None
+        self._facets = None
+        self._offerings = None
+        self._comparisons = None
+        self._suggestions = None
+        self.version = 0
+        self._row_ids = {}
+        self.universities = self._load_universities()
+
+    @classmethod
+    def from_source(cls, data_source=None, store_path=None, loader=None):
+        """Open a SQLite store for data_source, building it if it is missing or stale.
+        
+        A .sqlite data source that already has the indexes and FTS tables (as
+        the importer writes it) is opened read-only in place. Any other source,
+        a plain .sqlite catalogue or the built-in data is imported once into
+        store_path (by default a cache file of its own) and re-imported when it
+        changes (checked by mtime and size, hashing only when they differ), so
+        the data source itself is never written to.
+        """
+        loader = loader or CatalogueLoader()
+        if (data_source and CatalogueLoader.reader_for(data_source) == CatalogueLoader.read_sqlite
+                and cls.is_ready(data_source)):
+            return cls(data_source, data_source=data_source, read_only=True)
+            
+        if store_path is None:
+            store_path = loader.store_path(data_source, ".sqlite")
+        os.makedirs(os.path.dirname(os.path.abspath(store_path)), exist_ok=True)
+        
+        manager = cls(store_path, data_source=data_source)
+        recorded = {key: manager.get_meta(key) for key in ('source', 'mtime_ns', 'size')}
+        stamp, current = loader.source_stamp(data_source, recorded)
+        if not current:
+            if data_source:
+                universities = loader.load(data_source)
+            else:
+                universities = UniversityDataManager.initialize_data()
+            manager.replace_all(universities)
+        for key, value in stamp.items():
+            if recorded[key] != value:
+                manager.set_meta(key, value)
+        return manager
+
+    def reopen(self, loader=None):
+        """Return a new manager over the current content of data_source.
+        
+        A store imported from another format is rebuilt beside this one and
+        only moved over it once complete; this manager keeps its connection to
+        the old file until it is closed, so it can keep serving meanwhile.
+        """
+        cls = type(self)
+        if self.read_only:
+            return cls.from_source(self.data_source, loader=loader)
+            
+        staging = self.path + '.reload'
+        if os.path.exists(staging):
+            os.remove(staging)
+        staged = cls.from_source(self.data_source, store_path=staging, loader=loader)
+        if staged.read_only:
+            # The data source now has its indexes: use it in place
+            return staged
+        staged.close()
+        os.replace(staging, self.path)
+        return cls(self.path, data_source=self.data_source)
+
+    def close(self):
+        with self._lock:
+            self._connection.close()
+
+    @classmethod
+    def is_ready(cls, path):
+        """Whether the store at path has everything this backend derives, checked read-only."""
+        try:
+            connection = sqlite3.connect(f"file:{path}?mode=ro", uri=True)
+        except sqlite3.Error:
+            return False
+        try:
+            names = {row[0] for row in connection.execute("SELECT name FROM sqlite_master")}
+            if not names.issuperset(cls.DERIVED):
+                return False
+            row = connection.execute("SELECT value FROM meta WHERE key = 'fts_names'").fetchone()
+            return row is not None and row[0] == 'folded'
+        except sqlite3.Error:
+            return False
+        finally:
+            connection.close()
+
+    def _ensure_fts(self):
+        """Create the FTS5 name index; returns False if FTS5/trigram is unavailable.
+        
+        The index holds folded names (see search.fold) so lookups ignore case
+        and diacritics; stores indexed before that are re-indexed once.
+        """
+        try:
+            self._connection.execute(
+                "CREATE VIRTUAL TABLE IF NOT EXISTS names_fts "
+                "USING fts5(name, tokenize='trigram')")
+            self._connection.execute(
+                "CREATE VIRTUAL TABLE IF NOT EXISTS names_vocab USING fts5vocab(names_fts, 'row')")
+        except sqlite3.OperationalError:
+            return False
+        if self.get_meta('fts_names') == 'folded':
+            return True
+        # A plain catalogue file (see CatalogueLoader.read_sqlite) or an older
+        # store: index every name once
+        self._connection.create_function('fold', 1, fold, deterministic=True)
+        with self._connection:
+            self._connection.execute("DELETE FROM names_fts")
+            for level, table in (('university', 'universities'), ('faculty', 'faculties'),
+                                 ('department', 'departments'), ('subject', 'subjects')):
+                self._connection.execute(
+                    f"INSERT INTO names_fts(rowid, name) "
+                    f"SELECT id * 4 + {self.LEVEL_CODES[level]}, fold(name) FROM {table}")
+        self.set_meta('fts_names', 'folded')
+        return True
+
+    def get_meta(self, key):
+        with self._lock:
+            row = self._connection.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+    def set_meta(self, key, value):
+        with self._lock, self._connection:
+            self._connection.execute("INSERT OR REPLACE INTO meta(key, value) VALUES (?, ?)",
+                                     (key, value))
+
+    # Lazy object construction
+
+    def _make_university(self, row_id, name, city, faculty_count):
+        university = University(name, city, LazyList(
+            faculty_count, lambda: self._load_faculties(row_id)))
+        self._row_ids[university] = row_id
+        return university
+
+    def _load_universities(self):
+        with self._lock:
+            rows = self._connection.execute("""
+                SELECT u.id, u.name, u.city,
+                       (SELECT count(*) FROM faculties f WHERE f.university_id = u.id)
+                FROM universities u ORDER BY u.id
+            """).fetchall()
+        self._by_row_id = {}
+        universities = []
+        for row in rows:
+            university = self._make_university(*row)
+            self._by_row_id[row[0]] = university
+            universities.append(university)
+        return universities
+
+    def _load_faculties(self, university_id):
+        with self._lock:
+            rows = self._connection.execute("""
+                SELECT f.id, f.name,
+                       (SELECT count(*) FROM departments d WHERE d.faculty_id = f.id)
+                FROM faculties f WHERE f.university_id = ? ORDER BY f.id
+            """, (university_id,)).fetchall()
+        return [Faculty(name, LazyList(count, lambda fid=fid: self._load_departments(fid)))
+                for fid, name, count in rows]
+
+    def _load_departments(self, faculty_id):
+        with self._lock:
+            rows = self._connection.execute("""
+                SELECT d.id, d.name, s.name
+                FROM departments d LEFT JOIN subjects s ON s.department_id = d.id
+                WHERE d.faculty_id = ? ORDER BY d.id, s.id
+            """, (faculty_id,)).fetchall()
+        departments = []
+        current_id = None
+        for dept_id, dept_name, subject in rows:
+            if dept_id != current_id:
+                departments.append(Department(sys.intern(dept_name), []))
+                current_id = dept_id
+            if subject is not None:
+                departments[-1].subjects.append(sys.intern(subject))
+        return departments
+
+    # Writes
+
+    def _index_name(self, level, row_id, name):
+        if self._has_fts:
+            self._connection.execute("INSERT INTO names_fts(rowid, name) VALUES (?, ?)",
+                                     (row_id * 4 + self.LEVEL_CODES[level], fold(name)))
+
+    def _insert_children(self, university_id, faculties):
+        execute = self._connection.execute
+        for faculty in faculties:
+            fac_id = execute("INSERT INTO faculties(university_id, name) VALUES (?, ?)",
+                             (university_id, faculty.name)).lastrowid
+            self._index_name('faculty', fac_id, faculty.name)
+            for dept in faculty.departments:
+                dept_id = execute("INSERT INTO departments(faculty_id, name) VALUES (?, ?)",
+                                  (fac_id, dept.name)).lastrowid
+                self._index_name('department', dept_id, dept.name)
+                for subject in dept.subjects:
+                    subject_id = execute("INSERT INTO subjects(department_id, name) VALUES (?, ?)",
+                                         (dept_id, subject)).lastrowid
+                    self._index_name('subject', subject_id, subject)
+
+    def _insert_university(self, university):
+        row_id = self._connection.execute("INSERT INTO universities(name, city) VALUES (?, ?)",
+                                          (university.name, university.city)).lastrowid
+        self._index_name('university', row_id, university.name)
+        self._insert_children(row_id, university.faculties)
+        return row_id
+
+    def _delete_children(self, university_id):
+        execute = self._connection.execute
+        if self._has_fts:
+            code = self.LEVEL_CODES
+            execute(f"""DELETE FROM names_fts WHERE rowid IN (
+                SELECT s.id * 4 + {code['subject']} FROM subjects s
+                JOIN departments d ON d.id = s.department_id
+                JOIN faculties f ON f.id = d.faculty_id WHERE f.university_id = :u
+                UNION ALL SELECT d.id * 4 + {code['department']} FROM departments d
+                JOIN faculties f ON f.id = d.faculty_id WHERE f.university_id = :u
+                UNION ALL SELECT f.id * 4 + {code['faculty']} FROM faculties f
+                WHERE f.university_id = :u)""", {'u': university_id})
+        execute("""DELETE FROM subjects WHERE department_id IN (
+            SELECT d.id FROM departments d JOIN faculties f ON f.id = d.faculty_id
+            WHERE f.university_id = ?)""", (university_id,))
+        execute("""DELETE FROM departments WHERE faculty_id IN (
+            SELECT id FROM faculties WHERE university_id = ?)""", (university_id,))
+        execute("DELETE FROM faculties WHERE university_id = ?", (university_id,))
+
+    def replace_all(self, universities):
+        """Replace the whole store with the given universities."""
+        with self._lock, self._connection:
+            for table in ('subjects', 'departments', 'faculties', 'universities'):
+                self._connection.execute(f"DELETE FROM {table}")
+            if self._has_fts:
+                self._connection.execute("DELETE FROM names_fts")
+            for university in universities:
+                self._insert_university(university)
+        self._stats = None
+        self._facets = None
+        self._offerings = None
+        self._comparisons = None
+        self._suggestions = None
+        self.version += 1
+        self._row_ids = {}
+        self.universities[:] = self._load_universities()
+
+    def add_university(self, university):
+        """Add a university to the store and the search index."""
+        with self._lock, self._connection:
+            row_id = self._insert_university(university)
+        self._row_ids[university] = row_id
+        self._by_row_id[row_id] = university
+        self.universities.append(university)
+        self._stats = None
+        self._facets = None
+        self._offerings = None
+        self._comparisons = None
+        self._suggestions = None
+        self.version += 1
+
+    def remove_university(self, university):
+        """Remove a university and everything below it from the store."""
+        row_id = self._row_ids.pop(university)
+        with self._lock, self._connection:
+            self._delete_children(row_id)
+            if self._has_fts:
+                self._connection.execute("DELETE FROM names_fts WHERE rowid = ?",
+                                         (row_id * 4 + self.LEVEL_CODES['university'],))
+            self._connection.execute("DELETE FROM universities WHERE id = ?", (row_id,))
+        del self._by_row_id[row_id]
+        self.universities.remove(university)
+        self._stats = None
+        self._facets = None
+        self._offerings = None
+        self._comparisons = None
+        self._suggestions = None
+        self.version += 1
+
+    def refresh_university(self, university):
+        """Write back a university whose faculties or departments were edited."""
+        row_id = self._row_ids[university]
+        faculties = list(university.faculties)
+        with self._lock, self._connection:
+            self._connection.execute("UPDATE universities SET name = ?, city = ? WHERE id = ?",
+                                     (university.name, university.city, row_id))
+            self._delete_children(row_id)
+            self._insert_children(row_id, faculties)
+            if self._has_fts:
+                rowid = row_id * 4 + self.LEVEL_CODES['university']
+                self._connection.execute("DELETE FROM names_fts WHERE rowid = ?", (rowid,))
+                self._index_name('university', row_id, university.name)
+        self._stats = None
+        self._facets = None
+        self._offerings = None
+        self._comparisons = None
+        self._suggestions = None
+        self.version += 1
+
+    # Queries
+
+    def universities_in_city(self, city):
+        """Return the universities located in a city, in catalogue order."""
+        with self._lock:
+            rows = self._connection.execute(
+                "SELECT id FROM universities WHERE city = ? ORDER BY id", (city,)).fetchall()
+        return [self._by_row_id[row_id] for row_id, in rows]
+
+    def find_universities(self, name):
+        """Return every university with the given name."""
+        with self._lock:
+            rows = self._connection.execute(
+                "SELECT id FROM universities WHERE name = ? ORDER BY id", (name,)).fetchall()
+        return [self._by_row_id[row_id] for row_id, in rows]
+
+    def find_university(self, name):
+        """Return the first university with the given name, or None."""
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT id FROM universities WHERE name = ? ORDER BY id LIMIT 1",
+                (name,)).fetchone()
+        return self._by_row_id[row[0]] if row else None
+
+    def statistics(self):
+        """Return catalogue-wide totals, per-city counts and the five largest universities."""
+        if self._stats is not None:
+            return self._stats
+        with self._lock:
+            execute = self._connection.execute
+            totals = {
+                f'total_{table}': execute(f"SELECT count(*) FROM {table}").fetchone()[0]
+                for table in ('universities', 'faculties', 'departments', 'subjects')
+            }
+            # Without object identities in the store, equal names count as one
+            totals.update({
+                f'unique_{table}': execute(
+                    f"SELECT count(DISTINCT name) FROM {table}").fetchone()[0]
+                for table in ('faculties', 'departments', 'subjects')
+            })
+            city_rows = execute("""
+                SELECT u.city, count(DISTINCT u.id), count(DISTINCT f.id), count(DISTINCT d.id),
+                       count(s.id), count(DISTINCT f.name), count(DISTINCT d.name),
+                       count(DISTINCT s.name)
+                FROM universities u
+                LEFT JOIN faculties f ON f.university_id = u.id
+                LEFT JOIN departments d ON d.faculty_id = f.id
+                LEFT JOIN subjects s ON s.department_id = d.id
+                GROUP BY u.city ORDER BY min(u.id)
+            """).fetchall()
+            largest = execute("""
+                SELECT u.name, count(f.id) AS faculty_count
+                FROM universities u LEFT JOIN faculties f ON f.university_id = u.id
+                GROUP BY u.id ORDER BY faculty_count DESC, u.id LIMIT 5
+            """).fetchall()
+        self._stats = dict(totals,
+                           cities={city: dict(zip(self.CITY_COUNTS, counts))
+                                   for city, *counts in city_rows},
+                           largest=largest)
+        return self._stats
+
+    def _names_by_university(self):
+        """(university, faculty names, department names, subject names) of every university.
+        
+        The rows come straight from the tables with one query, so no faculty or
+        department objects are loaded.
+        """
+        with self._lock:
+            rows = self._connection.execute("""
+                SELECT u.id, f.name, d.name, s.name
+                FROM universities u
+                LEFT JOIN faculties f ON f.university_id = u.id
+                LEFT JOIN departments d ON d.faculty_id = f.id
+                LEFT JOIN subjects s ON s.department_id = d.id
+                ORDER BY u.id
+            """).fetchall()
+        values = {}
+        for uni_id, faculty, dept, subject in rows:
+            fields, departments, subjects = values.setdefault(uni_id, (set(), set(), set()))
+            if faculty is not None:
+                fields.add(faculty)
+            if dept is not None:
+                departments.add(dept)
+            if subject is not None:
+                subjects.add(subject)
+        for uni_id, (fields, departments, subjects) in values.items():
+            yield self._by_row_id[uni_id], fields, departments, subjects
+
+    def facet_index(self):
+        """Return the FacetIndex of the catalogue, built with one query after each change."""
+        if self._facets is not None:
+            return self._facets
+        facets = FacetIndex()
+        for university, fields, departments, subjects in self._names_by_university():
+            facets.add(university, university.city, fields, departments, subjects)
+        self._facets = facets
+        return facets
+
+    def comparison_index(self):
+        """Return the ComparisonIndex of the catalogue, built with one query after each change."""
+        if self._comparisons is not None:
+            return self._comparisons
+        comparisons = ComparisonIndex()
+        for university, fields, departments, subjects in self._names_by_university():
+            comparisons.add(university, fields, departments, subjects)
+        self._comparisons = comparisons
+        return comparisons
+
+    def suggestion_index(self):
+        """Return the SuggestionIndex of the catalogue, built with one query after each change."""
+        if self._suggestions is not None:
+            return self._suggestions
+        suggestions = SuggestionIndex()
+        for university, fields, departments, subjects in self._names_by_university():
+            suggestions.add(university, fields, departments, subjects)
+        self._suggestions = suggestions
+        return suggestions
+
+    def offering_index(self):
+        """Return the OfferingIndex of the catalogue, built with one query after each change."""
+        if self._offerings is not None:
+            return self._offerings
+        with self._lock:
+            rows = self._connection.execute("""
+                SELECT f.university_id, f.id, f.name, d.id, d.name, s.name
+                FROM faculties f
+                LEFT JOIN departments d ON d.faculty_id = f.id
+                LEFT JOIN subjects s ON s.department_id = d.id
+                ORDER BY f.university_id, f.id, d.id, s.id
+            """).fetchall()
+        paths = {}
+        faculty_id = dept_id = None
+        for uni_id, fac_id, faculty, dep_id, dept, subject in rows:
+            # Positions follow the id order the faculty and department lists load in
+            if fac_id != faculty_id:
+                if uni_id not in paths:
+                    paths[uni_id] = []
+                    fi = -1
+                fi, di, faculty_id, dept_id = fi + 1, -1, fac_id, None
+            if dep_id is None:
+                continue
+            if dep_id != dept_id:
+                di, dept_id = di + 1, dep_id
+                university = self._by_row_id[uni_id]
+                subjects = []
+                paths[uni_id].append((Offering(university, faculty, dept, fi, di), subjects))
+            if subject is not None:
+                subjects.append(subject)
+        offerings = OfferingIndex()
+        for uni_id, pairs in paths.items():
+            offerings.add(self._by_row_id[uni_id], pairs)
+        self._offerings = offerings
+        return offerings
+
+    def search(self, search_term, cancel_event=None):
+        """Search all names via the FTS5 trigram index; see SearchIndex.search."""
+        term = fold(search_term)
+        if not term:
+            return []
+        if self._has_fts and len(term) >= 3:
+            hits = "SELECT rowid FROM names_fts WHERE names_fts MATCH :q"
+            params = {'q': '"' + term.replace('"', '""') + '"'}
+        else:
+            # Trigrams cannot serve one- and two-character queries; the folded
+            # names in names_fts can still be scanned with LIKE
+            hits = ("SELECT rowid FROM names_fts WHERE name LIKE :q ESCAPE '\\'"
+                    if self._has_fts else None)
+            params = {'q': '%' + term.replace('\\', '\\\\').replace('%', '\\%')
+                                   .replace('_', '\\_') + '%'}
+        levels = {number: level for level, number in self.LEVEL_CODES.items()}
+        results = []
+        with self._lock:
+            for checked, (level, _, name, context, uni_id) in enumerate(
+                    self._connection.execute(self._matches_sql(hits), params)):
+                if cancel_event is not None and checked % 256 == 0 and cancel_event.is_set():
+                    raise SearchCancelled(search_term)
+                if term in fold(name):
+                    results.append(SearchMatch(self._by_row_id[uni_id], levels[level],
+                                               name, context))
+        return results
+
+    def ranked_search(self, search_term, limit=50, cancel_event=None):
+        """Fuzzy, accent-insensitive search for the best matches; see SearchIndex.ranked_search.
+        
+        Candidates come from the FTS5 index over folded names: names containing
+        the term (shortest first), then up to FUZZY_CANDIDATES names holding one
+        of the term's rarest trigrams (counted via names_vocab), scored like the
+        in-memory index does.
+        """
+        term = fold(search_term)
+        if not term or limit <= 0:
+            return []
+        if not self._has_fts:
+            # No index to draw fuzzy candidates from: rank the substring matches
+            matches = self.search(search_term, cancel_event)
+            ranked = sorted(matches, key=lambda m: -exact_score(term, fold(m.name)))
+            return [match.ranked(round(exact_score(term, fold(match.name)), 3))
+                    for match in ranked[:limit]]
+
+        scores = {}
+        with self._lock:
+            execute = self._connection.execute
+            if len(term) < 3:
+                # Short terms only match names with a word starting with them
+                pattern = term.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+                rows = execute("""
+                    SELECT rowid, name FROM names_fts
+                    WHERE name LIKE :start ESCAPE '\\' OR name LIKE :inner ESCAPE '\\'
+                    ORDER BY length(name), name, rowid LIMIT :limit
+                """, {'start': pattern + '%', 'inner': '% ' + pattern + '%', 'limit': limit})
+            else:
+                rows = execute("""
+                    SELECT rowid, name FROM names_fts WHERE names_fts MATCH :q
+                    ORDER BY length(name), name, rowid LIMIT :limit
+                """, {'q': '"' + term.replace('"', '""') + '"', 'limit': limit})
+            names = {}
+            for rowid, folded in rows:
+                scores[rowid] = (True, exact_score(term, folded))
+                names[rowid] = folded
+                
+            if len(term) >= 3 and len(scores) < limit:
+                grams = trigrams(term)
+                needed = max(2, math.ceil(SearchIndex.FUZZY_THRESHOLD * len(grams)))
+                # The padded boundary grams are not FTS tokens, so draw candidates
+                # from the rarest of the inner ones (see SearchIndex._fuzzy_scores)
+                inner = sorted({term[i:i + 3] for i in range(len(term) - 2)})
+                counts = dict(execute(
+                    "SELECT term, doc FROM names_vocab WHERE term IN (SELECT value FROM json_each(?))",
+                    (json.dumps(inner),)))
+                inner = [gram for gram in sorted(inner, key=lambda g: counts.get(g, 0))
+                         if counts.get(gram)]
+                # At most the two boundary grams can be shared outside `inner`
+                inner_needed = max(1, needed - 2)
+                probe = inner[:len(inner) - inner_needed + 1] if len(inner) >= inner_needed else []
+                query = ' OR '.join('"' + gram.replace('"', '""') + '"' for gram in probe)
+                rows = execute("SELECT rowid, name FROM names_fts WHERE names_fts MATCH :q LIMIT :limit",
+                               {'q': query, 'limit': self.FUZZY_CANDIDATES}) if probe else ()
+                for checked, (rowid, folded) in enumerate(rows):
+                    if cancel_event is not None and checked % 256 == 0 and cancel_event.is_set():
+                        raise SearchCancelled(search_term)
+                    if rowid in scores:
+                        continue
+                    name_grams = trigrams(folded)
+                    shared = len(grams & name_grams)
+                    if shared >= needed:
+                        scores[rowid] = (False, fuzzy_score(shared, len(grams), len(name_grams)))
+                        names[rowid] = folded
+                        
+            # Uses of one name come by level, then in catalogue order (ids follow it)
+            best = heapq.nsmallest(limit, scores, key=lambda rowid: (
+                rank_key(*scores[rowid], names[rowid]), rowid % 4, rowid // 4))
+            hits = "SELECT value AS rowid FROM json_each(:rows)"
+            found = {}
+            for level, row_id, name, context, uni_id in execute(self._matches_sql(hits),
+                                                                {'rows': json.dumps(best)}):
+                found[row_id * 4 + level] = (name, context, uni_id)
+                
+        levels = {number: level for level, number in self.LEVEL_CODES.items()}
+        results = []
+        for rowid in best:
+            name, context, uni_id = found[rowid]
+            match = SearchMatch(self._by_row_id[uni_id], levels[rowid % 4], name, context)
+            match.score = round(scores[rowid][1], 3)
+            results.append(match)
+        return results
+
+    def _matches_sql(self, hits):
+        """SQL listing (level code, id, name, context, university id) of the hit names."""
+        code = self.LEVEL_CODES
+        return f"""
+            SELECT {code['university']}, u.id, u.name, NULL, u.id FROM universities u
+            WHERE {self._hit_filter(hits, 'u', 'university')}
+            UNION ALL
+            SELECT {code['faculty']}, f.id, f.name, u.name, u.id FROM faculties f
+            JOIN universities u ON u.id = f.university_id
+            WHERE {self._hit_filter(hits, 'f', 'faculty')}
+            UNION ALL
+            SELECT {code['department']}, d.id, d.name, f.name, f.university_id FROM departments d
+            JOIN faculties f ON f.id = d.faculty_id
+            WHERE {self._hit_filter(hits, 'd', 'department')}
+            UNION ALL
+            SELECT {code['subject']}, s.id, s.name, d.name, f.university_id FROM subjects s
+            JOIN departments d ON d.id = s.department_id
+            JOIN faculties f ON f.id = d.faculty_id
+            WHERE {self._hit_filter(hits, 's', 'subject')}
+            ORDER BY 5, 1, 2
+        """
+
+    def _hit_filter(self, hits, alias, level):
+        if hits is None:
+            return f"{alias}.name LIKE :q ESCAPE '\\'"
+        # names_fts rowids encode (entity id, level) as id * 4 + level code
+        return f"{alias}.id IN (SELECT rowid / 4 FROM ({hits}) WHERE rowid % 4 = {self.LEVEL_CODES[level]})"
@@ -0,0 +1,164 @@
+"""
+Typeahead completions over every university, faculty, department and subject name.
+
+Names are kept in one array sorted by their folded form, so the names starting
+with a prefix are a contiguous range found with two bisects. Names are ranked
+by how many universities offer them. When the array is rebuilt, the best TOP_K
+of every prefix matching more than SCAN_LIMIT names are precomputed (the nodes
+of the implicit trie over the array that are too big to rank on the fly), so a
+completion never ranks more than SCAN_LIMIT names whatever the catalogue size.
+"""
+
+import bisect
+import heapq
+from collections import Counter
+
+from .search import fold
+
+class Suggestion:
+    """A completion: a name at one level of the catalogue and how many universities offer it."""
+
+    __slots__ = ('level', 'name', 'count', 'folded')
+
+    def __init__(self, level, name, count, folded):
+        self.level = level
+        self.name = name
+        self.count = count
+        self.folded = folded
+
+    def __str__(self):
+        return self.name
+
+    def to_dict(self):
+        return {'level': self.level, 'name': self.name, 'universities': self.count}
+
+def _prefix_end(prefix):
+    """The smallest string sorting after every string starting with prefix."""
+    return prefix[:-1] + chr(ord(prefix[-1]) + 1)
+
+class SuggestionIndex:
+    """Names of the catalogue, counted per university and completed by prefix.
+
+    A university counts once per distinct name, however many of its faculties
+    or departments carry it. Counts are kept in step as universities come and
+    go; the sorted array and the precomputed completions are rebuilt on the
+    first completion after a change.
+    """
+
+    LEVELS = ('university', 'faculty', 'department', 'subject')
+    TOP_K = 10
+    SCAN_LIMIT = 64
+
+    def __init__(self):
+        self.counts = Counter()  # (level, name) -> universities offering it
+        self._names = {}         # university -> its (level, name) keys, to undo on removal
+        self._folded = {}        # name -> fold(name)
+        self._keys = None        # folded names, sorted; None once a change makes them stale
+        self._ranks = None       # position in _keys -> rank, best first
+        self._by_rank = None     # rank -> (folded name, level number, name, count)
+        self._top = None         # prefix -> ranks of its best TOP_K names
+
+    def __len__(self):
+        return len(self.counts)
+
+    def add(self, university, faculties, departments, subjects):
+        """Count a university's names; re-adding one re-counts it."""
+        self.remove_university(university)
+        keys = {('university', university.name)}
+        for level, names in (('faculty', faculties), ('department', departments),
+                             ('subject', subjects)):
+            keys.update((level, name) for name in names)
+        self._names[university] = keys
+        self.counts.update(keys)
+        self._keys = None
+
+    def add_university(self, university):
+        faculties = list(university.faculties)
+        departments = [dept for faculty in faculties for dept in faculty.departments]
+        self.add(university, [faculty.name for faculty in faculties],
+                 [dept.name for dept in departments],
+                 [subject for dept in departments for subject in dept.subjects])
+
+    def remove_university(self, university):
+        keys = self._names.pop(university, None)
+        if keys is None:
+            return
+        counts = self.counts
+        for key in keys:
+            if counts[key] > 1:
+                counts[key] -= 1
+            else:
+                del counts[key]
+        self._keys = None
+
+    def _fold(self, name):
+        folded = self._folded.get(name)
+        if folded is None:
+            folded = self._folded[name] = fold(name)
+        return folded
+
+    def prepare(self):
+        """Rebuild the sorted array and the precomputed completions if a change made them stale.
+
+        complete() does this itself; call it ahead of time (e.g. on a worker
+        thread) so the first completion after a change is fast too.
+        """
+        if self._keys is not None:
+            return
+        level_order = {level: i for i, level in enumerate(self.LEVELS)}
+        # (folded name, level number, name, count), sorted by folded name
+        entries = sorted((self._fold(name), level_order[level], name, count)
+                         for (level, name), count in self.counts.items())
+        keys = [entry[0] for entry in entries]
+        # Most universities first, then shorter names, then alphabetically
+        order = sorted((-entry[3], len(entry[0]), position)
+                       for position, entry in enumerate(entries))
+        ranks = [0] * len(entries)
+        for rank, (_, _, position) in enumerate(order):
+            ranks[position] = rank
+        self._by_rank = [entries[position] for _, _, position in order]
+        self._ranks = ranks
+        self._top = {}
+        if entries:
+            self._precompute(keys, 0, len(keys), 0)
+        self._keys = keys
+
+    def _precompute(self, keys, lo, hi, depth):
+        """Best TOP_K ranks of keys[lo:hi], which share their first depth characters.
+
+        Ranges larger than SCAN_LIMIT are split by their next character, and
+        their best ranks are stored under their prefix.
+        """
+        ranks = self._ranks
+        if hi - lo <= self.SCAN_LIMIT:
+            return heapq.nsmallest(self.TOP_K, ranks[lo:hi])
+        best = []
+        position = lo
+        # Names that are the prefix itself sort first
+        while position < hi and len(keys[position]) == depth:
+            best.append(ranks[position])
+            position += 1
+        while position < hi:
+            child = keys[position][:depth + 1]
+            end = bisect.bisect_left(keys, _prefix_end(child), position, hi)
+            best.extend(self._precompute(keys, position, end, depth + 1))
+            position = end
+        best = heapq.nsmallest(self.TOP_K, best)
+        self._top[keys[lo][:depth]] = best
+        return best
+
+    def complete(self, text, limit=TOP_K):
+        """Up to limit Suggestions whose folded name starts with fold(text), best first."""
+        prefix = fold(text)
+        if not prefix or limit <= 0:
+            return []
+        self.prepare()
+        keys = self._keys
+        lo = bisect.bisect_left(keys, prefix)
+        hi = bisect.bisect_left(keys, _prefix_end(prefix), lo)
+        if hi - lo > self.SCAN_LIMIT and limit <= self.TOP_K:
+            best = self._top[prefix][:limit]
+        else:
+            best = heapq.nsmallest(limit, self._ranks[lo:hi])
+        return [Suggestion(self.LEVELS[level], name, count, folded)
+                for folded, level, name, count in map(self._by_rank.__getitem__, best)]
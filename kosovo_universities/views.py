@@ -0,0 +1,390 @@
+"""
+Plain-text views of the catalogue, shared by the GUI panes and the CLI.
+
+Each function returns the view as a list of lines so callers can render it in
+one batch (or print it) without touching any widget toolkit. ViewCache keeps
+recently rendered views so re-selecting an entity does not rebuild them.
+"""
+
+import sys
+from collections import OrderedDict
+
+from .models import QYTETET
+
+class ViewCache:
+    """LRU cache of rendered views keyed by (view, entities, catalogue version).
+    
+    Entities are the model objects a view was built from (compared by
+    identity), and the version is the data manager's change counter: once a
+    lookup carries a new version every older entry is dropped, so edits and
+    reloads never serve stale text. The cache holds at most max_entries views
+    and roughly max_bytes of line strings; views larger than max_bytes are
+    built every time.
+    """
+    
+    def __init__(self, max_entries=64, max_bytes=8 * 1024 * 1024):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()  # key -> (lines, size)
+        self._version = None
+
+    def __len__(self):
+        return len(self._entries)
+
+    def clear(self):
+        self._entries.clear()
+        self.size = 0
+
+    def lines(self, view, entities, version, build):
+        """Return the cached lines of a view, calling build() on a miss.
+        
+        The returned tuple is shared between callers and must not be modified.
+        """
+        if version != self._version:
+            self.clear()
+            self._version = version
+        key = (view, entities)
+        entry = self._entries.get(key)
+        if entry is not None:
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+            
+        self.misses += 1
+        lines = tuple(build())
+        size = sum(map(sys.getsizeof, lines))
+        if size <= self.max_bytes:
+            self._entries[key] = (lines, size)
+            self.size += size
+            while len(self._entries) > self.max_entries or self.size > self.max_bytes:
+                _, (_, evicted) = self._entries.popitem(last=False)
+                self.size -= evicted
+        return lines
+
+def welcome_lines(stats):
+    """Lines of the welcome screen."""
+    welcome_text = """Welcome to Kosovo Universities Information System v2.0!
+
+🎓 FEATURES:
+• Explore universities across Kosovo
+• Browse faculties and departments
+• Search for specific programs
+• View detailed statistics
+• Export data functionality
+
+🏛️ AVAILABLE CITIES:
+"""
+    for city in QYTETET.values():
+        welcome_text += f"• {city}\n"
+
+    welcome_text += f"""
+📊 QUICK STATS:
+• Total Universities: {stats['total_universities']}
+• Total Cities: {len(QYTETET)}
+• Total Faculties: {stats['total_faculties']}
+
+🔍 HOW TO USE:
+1. Select a city or search for specific terms
+2. Choose a university from the filtered list
+3. Browse faculties and departments
+4. Use the tabs to switch between views
+
+Start exploring by selecting a city or using the search function!
+"""
+    return welcome_text.split('\n')
+
+FACET_LABELS = {'city': "City", 'field': "Field", 'department': "Department",
+                'subject': "Subject"}
+
+def filter_description(filters):
+    """The active facet filters as text, e.g. "City: Peja, Subject: data"."""
+    return ', '.join(f"{FACET_LABELS[facet]}: {value}" for facet, value in filters.items()
+                     if value)
+
+def search_result_lines(search_term, universities, matches_by_uni, filters=None):
+    """Lines listing the universities a search matched, with the reasons."""
+    lines = [f"Search Results for: '{search_term}'", "=" * 50, ""]
+    description = filter_description(filters or {})
+    if description:
+        lines.insert(1, f"Filtered by {description}")
+
+    if universities:
+        for i, uni in enumerate(universities, 1):
+            lines.append(f"{i}. {uni.name}")
+            lines.append(f"   📍 Location: {uni.city}")
+            lines.append(f"   🏛️ Faculties: {len(uni.faculties)}")
+            matches = matches_by_uni.get(uni, [])
+            lines.extend(f"   🔎 {match}" for match in matches[:3])
+            if len(matches) > 3:
+                lines.append(f"   (+{len(matches)-3} more matches)")
+            lines.append("")
+    else:
+        lines.append("No results found. Try different search terms.")
+    return lines
+
+def city_result_lines(city, universities):
+    """Lines listing the universities of a city, or of all cities for "All Cities"."""
+    if city == "All Cities":
+        lines = ["All Universities in Kosovo", "=" * 30, ""]
+
+        for i, uni in enumerate(universities, 1):
+            lines.append(f"{i}. {uni.name}")
+            lines.append(f"   📍 {uni.city}")
+            lines.append(f"   🏛️ {len(uni.faculties)} faculties")
+            lines.append("")
+    else:
+        lines = [f"Universities in {city}", "=" * 30, ""]
+
+        if universities:
+            for i, uni in enumerate(universities, 1):
+                lines.append(f"{i}. {uni.name}")
+                lines.append(f"   🏛️ {len(uni.faculties)} faculties")
+                lines.append("")
+        else:
+            lines.append(f"No universities found in {city}.")
+    return lines
+
+def filter_result_lines(filters, universities):
+    """Lines listing the universities that pass a combination of facet filters."""
+    lines = [f"Universities matching {filter_description(filters)}", "=" * 50, ""]
+
+    if universities:
+        for i, uni in enumerate(universities, 1):
+            lines.append(f"{i}. {uni.name}")
+            lines.append(f"   📍 {uni.city}")
+            lines.append(f"   🏛️ {len(uni.faculties)} faculties")
+            lines.append("")
+    else:
+        lines.append("No universities match these filters.")
+    return lines
+
+def offering_summary(page):
+    """One line saying how widely an OfferingPage's subject or department is taught."""
+    if page.level == 'subject':
+        summary = f"Taught in {page.total} departments"
+    else:
+        summary = f"Offered by {page.total} faculties"
+    summary += f" in {len(page.city_totals)} cities"
+    if page.pages > 1:
+        summary += f" (page {page.page} of {page.pages})"
+    return summary
+
+def offering_lines(page):
+    """Lines of one OfferingPage: where a subject or department is taught, by city."""
+    what = "Subject" if page.level == 'subject' else "Department"
+    lines = [f"Where to Study: {page.name} ({what})", "=" * 50, "", offering_summary(page), ""]
+    number = (page.page - 1) * page.per_page
+    for city, offerings in page.groups:
+        lines.append(f"📍 {city} ({page.city_totals[city]})")
+        lines.append("-" * 30)
+        for offering in offerings:
+            number += 1
+            lines.append(f"{number}. {offering.university.name}")
+            lines.append(f"   🏛️ {offering.faculty}")
+            lines.append(f"   📚 {offering.department}")
+        lines.append("")
+    return lines
+
+def suggestion_label(suggestion):
+    """One line naming a typeahead Suggestion, its level and how many universities offer it."""
+    if suggestion.level == 'university':
+        return f"{suggestion.name} · university"
+    plural = "university" if suggestion.count == 1 else "universities"
+    return f"{suggestion.name} · {suggestion.level}, {suggestion.count} {plural}"
+
+_COMPARED_LEVELS = (('faculty', "Faculties"), ('department', "Departments"),
+                    ('subject', "Subjects"))
+
+def _name_list_lines(names):
+    return [f"   • {name}" for name in names] if names else ["   (none)"]
+
+def comparison_lines(comparison, similar=None):
+    """Lines comparing universities side by side, from ComparisonIndex.compare().
+
+    similar may give ComparisonIndex.most_similar() results for the first
+    university, listed at the end.
+    """
+    universities = comparison.universities
+    lines = ["UNIVERSITY COMPARISON", "=" * 50, ""]
+    for i, uni in enumerate(universities):
+        counts = ", ".join(f"{comparison.counts[level][i]} {title.lower()}"
+                           for level, title in _COMPARED_LEVELS)
+        lines.append(f"{i + 1}. {uni.name} ({uni.city})")
+        lines.append(f"   {counts}")
+    lines.append("")
+
+    lines.append("🔗 SIMILARITY (Jaccard overlap):")
+    lines.append("-" * 30)
+    lines.append("All: " + ", ".join(f"{title.lower()} {comparison.similarity[level]:.0%}"
+                                     for level, title in _COMPARED_LEVELS))
+    if len(universities) > 2:
+        for i, j, scores in comparison.pairs:
+            lines.append(f"{i + 1} ↔ {j + 1}: " + ", ".join(
+                f"{title.lower()} {scores[level]:.0%}" for level, title in _COMPARED_LEVELS))
+    lines.append("")
+
+    lines.append("🤝 OFFERED BY ALL:")
+    lines.append("-" * 30)
+    for level, title in _COMPARED_LEVELS:
+        lines.append(f"{title} ({len(comparison.shared[level])}):")
+        lines.extend(_name_list_lines(comparison.shared[level]))
+    lines.append("")
+
+    for i, uni in enumerate(universities):
+        lines.append(f"⭐ ONLY AT {i + 1}. {uni.name}:")
+        lines.append("-" * 30)
+        for level, title in _COMPARED_LEVELS:
+            lines.append(f"{title} ({len(comparison.unique[level][i])}):")
+            lines.extend(_name_list_lines(comparison.unique[level][i]))
+        lines.append("")
+
+    if similar is not None:
+        lines.append(f"🎯 MOST SIMILAR TO {universities[0].name} (by subjects):")
+        lines.append("-" * 30)
+        if not similar:
+            lines.append("No other university shares a subject.")
+        for i, (uni, score, shared) in enumerate(similar, 1):
+            lines.append(f"{i}. {uni.name} ({uni.city})")
+            lines.append(f"   {score:.0%} similarity, {shared} shared subjects")
+    return lines
+
+def university_info_lines(uni):
+    """Lines of the Main Information tab for a university."""
+    lines = [
+        uni.name,
+        "=" * len(uni.name),
+        "",
+        f"📍 Location: {uni.city}",
+        f"🏛️ Number of Faculties: {len(uni.faculties)}",
+        "",
+        "FACULTIES:",
+        "-" * 20,
+    ]
+    for i, faculty in enumerate(uni.faculties, 1):
+        lines.append(f"{i}. {faculty.name}")
+        lines.append(f"   📚 {len(faculty.departments)} departments")
+        lines.append("")
+    return lines
+
+def university_details_lines(uni):
+    """Lines of the Detailed View tab for a university."""
+    lines = [f"DETAILED VIEW: {uni.name}", "=" * 50, ""]
+    for faculty in uni.faculties:
+        lines.append(f"🏛️ {faculty.name}")
+        lines.append("-" * len(faculty.name))
+
+        for dept in faculty.departments:
+            lines.append(f"  📚 {dept.name}")
+            subjects = f"     Subjects: {', '.join(dept.subjects[:3])}"
+            if len(dept.subjects) > 3:
+                subjects += f" (+{len(dept.subjects)-3} more)"
+            lines.append(subjects)
+            lines.append("")
+        lines.append("")
+    return lines
+
+def faculty_details_lines(uni, faculty):
+    """Lines describing a faculty of a university with all departments and subjects."""
+    lines = [
+        faculty.name,
+        "=" * len(faculty.name),
+        f"🏛️ University: {uni.name}",
+        f"📚 Number of Departments: {len(faculty.departments)}",
+        "",
+        "DEPARTMENTS & SUBJECTS:",
+        "-" * 30,
+        "",
+    ]
+    for i, dept in enumerate(faculty.departments, 1):
+        lines.append(f"{i}. {dept.name}")
+        lines.append("   📖 Subjects:")
+        lines.extend(f"   • {subject}" for subject in dept.subjects)
+        lines.append("")
+    return lines
+
+def statistics_lines(stats):
+    """Lines of the statistics report."""
+    city_stats = stats['cities']
+
+    stats_content = f"""KOSOVO UNIVERSITIES SYSTEM STATISTICS
+{'='*50}
+
+📊 OVERALL STATISTICS:
+• Total Universities: {stats['total_universities']}
+• Total Faculties: {stats['total_faculties']} ({stats['unique_faculties']} unique)
+• Total Departments: {stats['total_departments']} ({stats['unique_departments']} unique)
+• Total Subjects: {stats['total_subjects']} ({stats['unique_subjects']} unique)
+• Cities with Universities: {len(city_stats)}
+
+🏛️ UNIVERSITIES BY CITY:
+{'-'*30}
+"""
+
+    for city, city_counts in city_stats.items():
+        stats_content += f"📍 {city}:\n"
+        stats_content += f"   • Universities: {city_counts['unis']}\n"
+        stats_content += f"   • Faculties: {city_counts['faculties']}\n\n"
+
+    stats_content += f"""
+🎓 LARGEST UNIVERSITIES:
+{'-'*25}
+"""
+
+    for i, (name, faculty_count) in enumerate(stats['largest'], 1):
+        stats_content += f"{i}. {name}\n"
+        stats_content += f"   📚 {faculty_count} faculties\n\n"
+    return stats_content.split('\n')
+
+def _histogram_lines(histogram, width=30):
+    peak = max(histogram.values(), default=0)
+    return [f"   {size:>4} {'█' * max(1, round(width * count / peak)):<{width}} {count}"
+            for size, count in histogram.items()]
+
+def analytics_lines(report):
+    """Lines of the analytics report built by CatalogueAnalytics.report()."""
+    lines = ["KOSOVO UNIVERSITIES CATALOGUE ANALYTICS", "=" * 50, ""]
+
+    for key, title, unit in (('departments_per_faculty', "DEPARTMENTS PER FACULTY", "faculties"),
+                             ('subjects_per_department', "SUBJECTS PER DEPARTMENT",
+                              "departments")):
+        dist = report[key]
+        lines.append(f"📊 {title} ({dist['count']} {unit} offered):")
+        lines.append(f"• Mean {dist['mean']:.2f}, median {dist['median']}, "
+                     f"range {dist['min']}-{dist['max']}")
+        lines.extend(_histogram_lines(dist['histogram']))
+        lines.append("")
+
+    matrix = report['city_field_matrix']
+    lines.append("🏛️ FACULTIES BY FIELD AND CITY:")
+    lines.append("-" * 30)
+    cities = [city[:9] for city in matrix['cities']]
+    lines.append(f"{'':<36}" + ''.join(f"{city:>10}" for city in cities))
+    for j, field in enumerate(matrix['fields']):
+        name = field if len(field) <= 35 else field[:34] + "…"
+        counts = ''.join(f"{row[j] or '·':>10}" for row in matrix['counts'])
+        lines.append(f"{name:<36}{counts}")
+    lines.append("")
+
+    lines.append("📖 MOST COMMON SUBJECTS:")
+    lines.append("-" * 25)
+    for i, entry in enumerate(report['most_common_subjects'], 1):
+        lines.append(f"{i}. {entry['subject']}: {entry['universities']} universities, "
+                     f"{entry['departments']} departments")
+    lines.append("")
+
+    lines.append("🔗 MOST SIMILAR UNIVERSITIES (Jaccard overlap of subjects):")
+    lines.append("-" * 25)
+    pairs = report['similar_universities']
+    if pairs is None:
+        lines.append("Too many universities to compare every pair.")
+    elif not pairs:
+        lines.append("No two universities share a subject.")
+    for i, pair in enumerate(pairs or (), 1):
+        lines.append(f"{i}. {pair['a']['university']} ({pair['a']['city']}) ↔ "
+                     f"{pair['b']['university']} ({pair['b']['city']})")
+        lines.append(f"   {pair['jaccard']:.2f} similarity, "
+                     f"{pair['shared_subjects']} shared subjects")
+    return lines
@@ -0,0 +1,46 @@
+"""
+Change detection for catalogue files, using only os.stat polling.
+"""
+
+import os
+
+class SourceWatcher:
+    """Notices when a data file is rewritten or replaced.
+
+    Each poll() is a single os.stat; the file's inode, mtime and size form its
+    signature. A change is only reported once the signature has stayed the same
+    for two polls in a row, so a file that is still being written (or briefly
+    missing while it is swapped for a new one) is not picked up half-finished.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._seen = self.signature()
+        self._pending = None
+
+    def signature(self):
+        """(inode, mtime_ns, size) of the file, or None if it does not exist."""
+        try:
+            stat = os.stat(self.path)
+        except OSError:
+            return None
+        return stat.st_ino, stat.st_mtime_ns, stat.st_size
+
+    def poll(self):
+        """Return True once per settled change of the file since the last reported one."""
+        signature = self.signature()
+        if signature == self._seen or signature is None:
+            self._pending = None
+            return False
+        if signature != self._pending:
+            # Changed since the last poll: wait for it to settle
+            self._pending = signature
+            return False
+        self._seen = signature
+        self._pending = None
+        return True
+
+    def mark_seen(self):
+        """Treat the file as it is now as already handled (e.g. after a manual reload)."""
+        self._seen = self.signature()
+        self._pending = None
@@ -0,0 +1,452 @@
+#!/usr/bin/env python3
+"""
+Benchmarks for the Kosovo Universities Information System.
+
+Generates synthetic catalogues at multiples of the built-in data and times the
+paths the application spends its time in: loading and indexing (and opening a
+compiled .kuc file instead), the search box, city and facet filtering, "where
+to study" lookups, the statistics window and its analytics (with NumPy),
+to_dict/export and building the university views. Each case reports p50/p95
+latency and its peak traced memory as JSON, and two reports can be compared to
+catch regressions:
+
+    python kosovo_universities_benchmark.py -o before.json
+    python kosovo_universities_benchmark.py --scales 1 10 --baseline before.json
+    python kosovo_universities_benchmark.py --compare before.json after.json
+
+GUI handlers run against a withdrawn Tk root when a display is available and
+against stub widgets otherwise (--gui), so the benchmarks also run headless.
+"""
+
+import argparse
+import gc
+import json
+import os
+import platform
+import random
+import shutil
+import statistics
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+from datetime import datetime
+
+from kosovo_universities import (QYTETET, CatalogueExporter, CatalogueLoader,
+                                 CatalogueStatistics, Department, Faculty, MappedDataManager,
+                                 University, UniversityDataManager, views)
+from kosovo_universities.analytics import NUMPY_AVAILABLE, CatalogueAnalytics
+from kosovo_universities.columnar import write_columnar
+
+SEARCH_TERMS = ["engineering", "law", "prishtine", "kadri zek", "mathmatics",
+                "computer science", "a", "xyzzy"]
+SUGGEST_PREFIXES = ["f", "fa", "faculty of", "u", "univ", "mach", "data s", "prish", "zz"]
+
+def synthetic_catalogue(scale, seed=0):
+    """Return `scale` copies of the built-in catalogue with varied names and cities.
+
+    The first copy is the built-in data itself. Later copies rename their
+    universities, move them to a random city and add one numbered subject per
+    department, so the number of distinct names grows with the catalogue.
+    """
+    rng = random.Random(seed)
+    base = UniversityDataManager.initialize_data()
+    cities = list(QYTETET.values())
+    universities = []
+    for copy in range(scale):
+        for uni in base:
+            if copy == 0:
+                universities.append(uni)
+                continue
+            faculties = []
+            for faculty in uni.faculties:
+                departments = []
+                for dept in faculty.departments:
+                    subjects = list(dept.subjects)
+                    if subjects:
+                        subjects.append(f"{rng.choice(subjects)} {copy + 1}")
+                    departments.append(Department(dept.name, subjects))
+                faculties.append(Faculty(faculty.name, departments))
+            universities.append(University(f"{uni.name} ({copy + 1})", rng.choice(cities),
+                                           faculties))
+    return universities
+
+def count_entities(universities):
+    faculties = departments = subjects = 0
+    for uni in universities:
+        faculties += len(uni.faculties)
+        for faculty in uni.faculties:
+            departments += len(faculty.departments)
+            subjects += sum(len(dept.subjects) for dept in faculty.departments)
+    return len(universities) + faculties + departments + subjects
+
+# GUI harness
+
+class StubWidget:
+    """Stands in for a Tk widget or variable: keeps values, ignores other calls."""
+
+    def __init__(self, value=''):
+        self.value = value
+        self.options = {}
+
+    def get(self):
+        return self.value
+
+    def set(self, value):
+        self.value = value
+
+    def __getitem__(self, key):
+        return self.options[key]
+
+    def __setitem__(self, key, value):
+        self.options[key] = value
+
+    def __getattr__(self, name):
+        return lambda *args, **kwargs: None
+
+def stub_results_view():
+    """A ResultsView whose Text widget is a stub, so show() runs its real code."""
+    from kosovo_universities_gui import ResultsView
+    view = ResultsView.__new__(ResultsView)
+    view.text = view.scrollbar = view.frame = StubWidget()
+    view.lines = []
+    view.window_start = view.window_end = 0
+    view._recenter_id = view._stream_id = None
+    return view
+
+def stub_gui(manager):
+    """A UniversityGUI with stub widgets, for machines without a display."""
+    from kosovo_universities_gui import UniversityGUI
+    gui = UniversityGUI.__new__(UniversityGUI)
+    gui.root = StubWidget()
+    gui.data_manager = manager
+    gui.universities = manager.universities
+    gui.filtered_universities = []
+    gui.search_matches = None
+    gui.facet_choices = {facet: {} for facet in UniversityGUI.FACET_ALL}
+    gui.search_stats = {'count': 0, 'total': 0.0}
+    gui.selected_university = None
+    gui.selected_faculty = None
+    gui.view_cache = views.ViewCache(UniversityGUI.VIEW_CACHE_ENTRIES,
+                                     UniversityGUI.VIEW_CACHE_BYTES)
+    gui.analytics = None
+    gui.manager_jobs = {}
+    gui.retired_managers = set()
+    gui.manager_lock = threading.Lock()
+    for name in ('search_var', 'search_status_var', 'city_var', 'city_combo', 'browser',
+                 'search_worker', 'field_var', 'field_combo', 'department_var',
+                 'department_combo', 'subject_var', 'facet_status_var', 'suggestions'):
+        setattr(gui, name, StubWidget())
+    gui.facet_vars = {facet: getattr(gui, f'{facet}_var') for facet in UniversityGUI.FACET_ALL}
+    gui.facet_combos = {facet: getattr(gui, f'{facet}_combo')
+                        for facet in UniversityGUI.FACET_ALL}
+    gui.results_view = stub_results_view()
+    gui.details_view = stub_results_view()
+    # The stub notebook's select() returns None: treat the main tab as visible
+    gui.notebook = StubWidget()
+    gui.tab_views = {None: gui.results_view}
+    gui.pending_views = {}
+    return gui
+
+class GuiHarness:
+    """Creates UniversityGUI instances over a given catalogue, with real or stub widgets."""
+
+    def __init__(self, mode='auto'):
+        self.root = None
+        self.mode = mode
+        if mode in ('auto', 'tk'):
+            try:
+                import tkinter
+                self.root = tkinter.Tk()
+                self.root.withdraw()
+                self.mode = 'tk'
+            except Exception:
+                # tkinter missing or no display
+                if mode == 'tk':
+                    raise
+                self.mode = 'stub'
+
+    def gui(self, manager):
+        if self.mode == 'stub':
+            return stub_gui(manager)
+        from kosovo_universities_gui import UniversityGUI
+        for child in self.root.winfo_children():
+            child.destroy()
+        gui = UniversityGUI(self.root)
+        gui.search_worker.shutdown()
+        gui.data_manager = manager
+        gui.universities = manager.universities
+        gui.update_university_list()
+        return gui
+
+    def close(self):
+        if self.root is not None:
+            self.root.destroy()
+
+# Measurement
+
+def measure(func, inputs, repeat, budget, memory=True):
+    """Time func over inputs (cycling) and return its latency percentiles and peak memory."""
+    func(inputs[0])  # warm up caches and lazy imports
+    gc.collect()
+    times = []
+    started = time.perf_counter()
+    for i in range(repeat):
+        begin = time.perf_counter()
+        func(inputs[i % len(inputs)])
+        times.append((time.perf_counter() - begin) * 1000)
+        if len(times) >= 3 and time.perf_counter() - started > budget:
+            break
+
+    times.sort()
+    result = {
+        'runs': len(times),
+        'p50_ms': round(statistics.median(times), 4),
+        'p95_ms': round(times[min(len(times) - 1, int(0.95 * len(times)))], 4),
+        'mean_ms': round(statistics.fmean(times), 4),
+    }
+    if memory:
+        gc.collect()
+        tracemalloc.start()
+        try:
+            for value in inputs:
+                func(value)
+            result['peak_kib'] = round(tracemalloc.get_traced_memory()[1] / 1024, 1)
+        finally:
+            tracemalloc.stop()
+    return result
+
+def benchmark_cases(universities, manager, gui, workdir, rng):
+    """Yield (name, func, inputs) for every benchmarked path at one scale."""
+    json_path = os.path.join(workdir, "catalogue.json")
+    CatalogueExporter(universities, manager.statistics()).export(json_path)
+    warm_cache = os.path.join(workdir, "warm-cache")
+    CatalogueLoader(warm_cache).load(json_path)
+
+    def load_json_cold(_):
+        cache = tempfile.mkdtemp(dir=workdir)
+        try:
+            CatalogueLoader(cache).load(json_path)
+        finally:
+            shutil.rmtree(cache)
+
+    yield 'load_json', load_json_cold, [None]
+    yield 'load_snapshot', lambda _: CatalogueLoader(warm_cache).load(json_path), [None]
+    yield 'index', lambda _: UniversityDataManager(universities), [None]
+    
+    kuc_path = os.path.join(workdir, "catalogue.kuc")
+    write_columnar(universities, kuc_path)
+    yield 'compile_columnar', lambda _: write_columnar(universities, kuc_path), [None]
+    yield 'open_columnar', lambda _: MappedDataManager(kuc_path).close(), [None]
+    mapped = MappedDataManager(kuc_path)
+    try:
+        yield ('search_columnar', lambda term: mapped.ranked_search(term, gui.SEARCH_LIMIT),
+               SEARCH_TERMS)
+    finally:
+        mapped.close()
+
+    yield 'search', gui.filter_universities_by_search, SEARCH_TERMS
+
+    def select_city(city):
+        gui.city_var.set(city)
+        gui.on_facet_selected()
+
+    yield 'city_filter', select_city, ["All Cities"] + list(QYTETET.values())
+
+    def select_facets(filters):
+        for var, value in zip((gui.city_var, gui.field_var, gui.subject_var), filters):
+            var.set(value)
+        gui.on_facet_selected()
+
+    yield 'facet_filter', select_facets, [("Prishtina", "Faculty of Law", ""),
+                                          ("All Cities", "Faculty of Economics", "account"),
+                                          ("Peja", "", "data str"), ("All Cities", "", "")]
+
+    offerings = manager.offering_index()
+    yield 'where_to_study', lambda query: views.offering_lines(offerings.page(*query)), [
+        ("Machine Learning", 'subject'), ("data structures", 'subject'),
+        ("Law", 'department'), ("Pharmacology", 'subject')]
+
+    suggestions = manager.suggestion_index()
+    yield 'suggest_prepare', lambda _: (suggestions.remove_university(universities[0]),
+                                        suggestions.add_university(universities[0]),
+                                        suggestions.prepare()), [None]
+    yield 'suggest', lambda prefix: [views.suggestion_label(suggestion) for suggestion
+                                     in suggestions.complete(prefix)], SUGGEST_PREFIXES
+
+    yield 'statistics', lambda _: views.statistics_lines(manager.statistics()), [None]
+
+    def rebuild_statistics(_):
+        stats = CatalogueStatistics()
+        for uni in universities:
+            stats.add_university(uni)
+        views.statistics_lines(stats.statistics())
+
+    yield 'statistics_rebuild', rebuild_statistics, [None]
+    if NUMPY_AVAILABLE:
+        yield 'analytics', lambda _: views.analytics_lines(
+            CatalogueAnalytics(universities).report()), [None]
+
+    yield 'to_dict', lambda _: [uni.to_dict() for uni in universities], [None]
+    for fmt in CatalogueExporter.FORMATS:
+        exporter = CatalogueExporter(universities, manager.statistics(), fmt=fmt)
+        path = os.path.join(workdir, f"export.{fmt}")
+        yield f'export_{fmt}', lambda _, exporter=exporter, path=path: exporter.export(path), [None]
+
+    sample = rng.sample(universities, min(20, len(universities)))
+
+    def university_info(uni):
+        gui.selected_university = uni
+        gui.display_university_info()
+
+    yield 'university_info', university_info, sample
+
+    def browse(uni):
+        # Open the catalogue browser on everything and drill down to a faculty
+        gui.browser.show(universities)
+        gui.browser.reveal(uni, uni.faculties[0] if uni.faculties else None)
+
+    if not isinstance(gui.browser, StubWidget):
+        # Stub widgets have no tree to fill, so the case would time nothing
+        yield 'browse', browse, sample
+    yield 'university_info_text', lambda uni: (views.university_info_lines(uni),
+                                               views.university_details_lines(uni)), sample
+
+    comparisons = manager.comparison_index()
+    groups = [sample[i:i + 3] for i in range(0, len(sample) - 2, 3)]
+    yield 'compare', lambda group: views.comparison_lines(comparisons.compare(group)), groups
+    yield 'most_similar', comparisons.most_similar, sample
+
+def run(scales, repeat=20, budget=5.0, memory=True, gui_mode='auto', only=None, seed=0,
+        log=sys.stderr):
+    """Run the benchmarks and return the report dict."""
+    harness = GuiHarness(gui_mode)
+    workdir = tempfile.mkdtemp(prefix="kosovo-bench-")
+    report = {
+        'meta': {
+            'created': datetime.now().isoformat(timespec='seconds'),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'gui': harness.mode,
+            'repeat': repeat,
+            'seed': seed,
+        },
+        'scales': {},
+    }
+    try:
+        for scale in scales:
+            rng = random.Random(seed)
+            universities = synthetic_catalogue(scale, seed)
+            manager = UniversityDataManager(universities)
+            gui = harness.gui(manager)
+            cases = {}
+            if scale == 1:
+                cases['initialize_data'] = measure(
+                    lambda _: UniversityDataManager.initialize_data(), [None], repeat, budget, memory)
+            for name, func, inputs in benchmark_cases(universities, manager, gui, workdir, rng):
+                if only and name not in only:
+                    continue
+                cases[name] = measure(func, inputs, repeat, budget, memory)
+                print(f"{scale:>5}x {name:<22} p50 {cases[name]['p50_ms']:>10.3f} ms  "
+                      f"p95 {cases[name]['p95_ms']:>10.3f} ms", file=log)
+            report['scales'][str(scale)] = {
+                'universities': len(universities),
+                'entities': count_entities(universities),
+                'cases': cases,
+            }
+    finally:
+        harness.close()
+        shutil.rmtree(workdir, ignore_errors=True)
+    return report
+
+# Comparison
+
+def compare(baseline, current, tolerance=0.25, floor_ms=0.05):
+    """Return a list of (scale, case, metric, old, new, change) regressions.
+
+    A latency regresses when it grows by more than `tolerance` (a fraction)
+    and by more than floor_ms; peak memory when it grows by more than
+    `tolerance`. Cases missing from either report are skipped.
+    """
+    regressions = []
+    for scale, current_scale in current['scales'].items():
+        old_cases = baseline['scales'].get(scale, {}).get('cases', {})
+        for case, new in current_scale['cases'].items():
+            old = old_cases.get(case)
+            if old is None:
+                continue
+            for metric in ('p50_ms', 'p95_ms', 'peak_kib'):
+                if metric not in old or metric not in new or not old[metric]:
+                    continue
+                change = (new[metric] - old[metric]) / old[metric]
+                if change > tolerance and (metric == 'peak_kib' or
+                                           new[metric] - old[metric] > floor_ms):
+                    regressions.append((scale, case, metric, old[metric], new[metric], change))
+    return regressions
+
+def print_comparison(baseline, current, tolerance, out=sys.stderr):
+    for scale, current_scale in current['scales'].items():
+        old_cases = baseline['scales'].get(scale, {}).get('cases', {})
+        for case, new in current_scale['cases'].items():
+            old = old_cases.get(case)
+            if old is None:
+                continue
+            change = (new['p50_ms'] - old['p50_ms']) / old['p50_ms'] if old['p50_ms'] else 0.0
+            print(f"{scale:>5}x {case:<22} p50 {old['p50_ms']:>10.3f} -> {new['p50_ms']:>10.3f} ms "
+                  f"({change:+.0%})", file=out)
+
+    regressions = compare(baseline, current, tolerance)
+    for scale, case, metric, old, new, change in regressions:
+        print(f"REGRESSION {scale}x {case} {metric}: {old} -> {new} ({change:+.0%})", file=out)
+    return regressions
+
+def load_report(path):
+    with open(path, encoding='utf-8') as f:
+        return json.load(f)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Benchmark loading, search, filtering, statistics, export and views.")
+    parser.add_argument('--scales', type=int, nargs='+', default=[1, 10, 100, 1000],
+                        help="catalogue sizes as multiples of the built-in data "
+                             "(default: %(default)s)")
+    parser.add_argument('--repeat', type=int, default=20,
+                        help="timed runs per case (default: %(default)s)")
+    parser.add_argument('--budget', type=float, default=5.0,
+                        help="stop a case after this many seconds once it has 3 runs "
+                             "(default: %(default)s)")
+    parser.add_argument('--cases', nargs='+', help="only run these cases")
+    parser.add_argument('--no-memory', action='store_true',
+                        help="skip the tracemalloc pass that measures peak memory")
+    parser.add_argument('--gui', choices=('auto', 'tk', 'stub'), default='auto',
+                        help="run GUI handlers on a hidden Tk root or on stub widgets")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('-o', '--output', help="write the JSON report here instead of stdout")
+    parser.add_argument('--baseline', help="compare this run against a saved report")
+    parser.add_argument('--compare', nargs=2, metavar=('BASELINE', 'CURRENT'),
+                        help="compare two saved reports without running anything")
+    parser.add_argument('--tolerance', type=float, default=0.25,
+                        help="relative slowdown or memory growth counted as a regression "
+                             "(default: %(default)s)")
+    args = parser.parse_args(argv)
+
+    if args.compare:
+        baseline, current = map(load_report, args.compare)
+        return 1 if print_comparison(baseline, current, args.tolerance) else 0
+
+    report = run(args.scales, args.repeat, args.budget, not args.no_memory, args.gui,
+                 set(args.cases) if args.cases else None, args.seed)
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(text + '\n')
+    else:
+        print(text)
+
+    if args.baseline:
+        return 1 if print_comparison(load_report(args.baseline), report, args.tolerance) else 0
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
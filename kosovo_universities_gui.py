@@ -7,284 +7,1223 @@ Version: 2.0
 """
 
 import tkinter as tk
-from tkinter import ttk, messagebox, scrolledtext
+from tkinter import ttk, messagebox, scrolledtext, filedialog
 from tkinter import font as tkFont
+import argparse
 import json
-import os
-from datetime import datetime
-
-# Data structures
-QYTETET = {
-    1: "Gjilan",
-    2: "Ferizaj", 
-    3: "Prizren",
-    4: "Prishtina",
-    5: "Peja",
-    6: "Gjakova",
-    7: "Mitrovica",
-    8: "Lipjan",
-}
-
-class University:
-    """Represents a university with its location and faculties."""
+import sqlite3
+import threading
+import time
+from collections import Counter
+from concurrent.futures import CancelledError, ThreadPoolExecutor
+
+from kosovo_universities import views
+from kosovo_universities.analytics import NUMPY_AVAILABLE, CatalogueAnalytics
+from kosovo_universities.backends import DATA_BACKENDS, default_data_source
+from kosovo_universities.data import UniversityDataManager
+from kosovo_universities.export import CatalogueExporter, ExportCancelled
+from kosovo_universities.instrumentation import instrumentation, profile_session, timed
+from kosovo_universities.loader import COMPRESSION_OPENERS
+from kosovo_universities.models import QYTETET
+from kosovo_universities.search import SearchCancelled, fold
+from kosovo_universities.watch import SourceWatcher
+
+class BackgroundSearch:
+    """Debounced search that runs on a worker thread.
     
-    def __init__(self, name, city, faculties):
-        self.name = name
-        self.city = city
-        self.faculties = faculties
-
-    def __str__(self):
-        return f"{self.name}, City: {self.city}, Faculties: {len(self.faculties)}"
-
-    def to_dict(self):
-        return {
-            'name': self.name,
-            'city': self.city,
-            'faculties': [faculty.to_dict() for faculty in self.faculties]
-        }
-
-class Faculty:
-    """Represents a faculty with its departments."""
+    Each keystroke restarts the debounce timer; once it fires the query runs on a
+    single worker thread and any older query still in flight is cancelled. The Tk
+    thread picks up the finished query with root.after polling, so the event loop
+    never waits on the search itself.
+    """
     
-    def __init__(self, name, departments):
-        self.name = name
-        self.departments = departments
+    def __init__(self, root, search_func, on_result, delay_ms=250, poll_ms=15):
+        self.root = root
+        self.search_func = search_func
+        self.on_result = on_result
+        self.delay_ms = delay_ms
+        self.poll_ms = poll_ms
+        self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="search")
+        self._after_id = None
+        self._poll_id = None
+        self._future = None
+        self._cancel_event = None
+
+    def schedule(self, search_term):
+        """Queue a search, superseding any pending or running one."""
+        self.cancel()
+        self._after_id = self.root.after(self.delay_ms, self._start, search_term)
 
-    def __str__(self):
-        return f"Faculty: {self.name}, Departments: {len(self.departments)}"
+    def cancel(self):
+        """Drop the pending search and cancel the one in flight, if any."""
+        if self._after_id is not None:
+            self.root.after_cancel(self._after_id)
+            self._after_id = None
+        if self._cancel_event is not None:
+            self._cancel_event.set()
+            self._cancel_event = None
+        if self._future is not None:
+            self._future.cancel()
+            self._future = None
 
-    def to_dict(self):
-        return {
-            'name': self.name,
-            'departments': [dept.to_dict() for dept in self.departments]
-        }
+    def running(self):
+        """The Future of the search in flight, or None."""
+        return self._future
+        
+    def shutdown(self):
+        """Cancel the query in flight and stop the worker thread.
+        
+        Safe to call after the Tk root has been destroyed.
+        """
+        if self._cancel_event is not None:
+            self._cancel_event.set()
+        self.executor.shutdown(wait=False, cancel_futures=True)
 
-class Department:
-    """Represents a department with its subjects."""
+    def _start(self, search_term):
+        self._after_id = None
+        self._cancel_event = threading.Event()
+        self._future = self.executor.submit(self._run, search_term, self._cancel_event)
+        if self._poll_id is None:
+            self._poll_id = self.root.after(self.poll_ms, self._poll)
+
+    def _run(self, search_term, cancel_event):
+        started = time.perf_counter()
+        results = self.search_func(search_term, cancel_event)
+        return search_term, results, time.perf_counter() - started
+
+    def _poll(self):
+        self._poll_id = None
+        future = self._future
+        if future is None:
+            return
+        if not future.done():
+            self._poll_id = self.root.after(self.poll_ms, self._poll)
+            return
+            
+        self._future = None
+        self._cancel_event = None
+        try:
+            search_term, results, elapsed = future.result()
+        except (SearchCancelled, CancelledError):
+            return
+        self.on_result(search_term, results, elapsed)
+
+class ResultsView:
+    """Scrollable text pane that renders a whole result in one batch.
     
-    def __init__(self, name, subjects):
-        self.name = name
-        self.subjects = subjects
+    Content is passed in as a list of lines. show() inserts the first screen
+    (FIRST_LINES) right away and streams the rest in CHUNK_LINES batches from
+    after() callbacks, so long results appear immediately without blocking
+    input. Results longer than VIRTUAL_THRESHOLD lines are virtualized: only a
+    window of WINDOW_LINES around the visible region lives in the Text widget,
+    the scrollbar spans the full result, and the window slides as the user scrolls.
+    """
+    
+    VIRTUAL_THRESHOLD = 2000
+    WINDOW_LINES = 600
+    EDGE_LINES = 150
+    FIRST_LINES = 120   # inserted synchronously by show(); the rest streams in
+    CHUNK_LINES = 400
+    CHUNK_DELAY_MS = 1
+
+    def __init__(self, parent, font, **text_options):
+        self.frame = tk.Frame(parent, bg='white')
+        self.text = tk.Text(self.frame, wrap=tk.WORD, font=font, **text_options)
+        self.scrollbar = ttk.Scrollbar(self.frame, orient=tk.VERTICAL, command=self._on_scrollbar)
+        self.text.configure(yscrollcommand=self._on_text_scrolled)
+        self.scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        self.text.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        
+        self.lines = []
+        self.window_start = 0
+        self.window_end = 0
+        self._recenter_id = None
+        self._stream_id = None
+
+    def pack(self, **kwargs):
+        self.frame.pack(**kwargs)
 
-    def __str__(self):
-        return f"Department: {self.name}, Subjects: {', '.join(self.subjects)}"
+    @property
+    def virtual(self):
+        return len(self.lines) > self.VIRTUAL_THRESHOLD
 
-    def to_dict(self):
-        return {
-            'name': self.name,
-            'subjects': self.subjects
-        }
+    @timed()
+    def show(self, lines):
+        """Replace the content with the given lines and scroll to the top."""
+        if lines is self.lines and not self.virtual:
+            # The same (cached) view again: the Text widget already holds it
+            self.text.yview_moveto(0)
+            return
+        self.lines = lines
+        self._cancel_recenter()
+        self._materialize(0, stream=True)
+        self.text.yview_moveto(0)
+
+    def clear(self):
+        self.show([])
+
+    def _materialize(self, start, stream=False):
+        self._cancel_stream()
+        if self.virtual:
+            start = max(0, min(start, len(self.lines) - self.WINDOW_LINES))
+            end = start + self.WINDOW_LINES
+        else:
+            start, end = 0, len(self.lines)
+        self.window_start, self.window_end = start, end
+        self.text.delete('1.0', tk.END)
+        # Windows slid in while scrolling are inserted whole: the view is
+        # positioned inside them straight away
+        first = min(end, start + self.FIRST_LINES) if stream else end
+        self.text.insert('1.0', '\n'.join(self.lines[start:first]))
+        if first < end:
+            self._stream_id = self.text.after(self.CHUNK_DELAY_MS, self._stream, first)
+
+    def _stream(self, position):
+        self._stream_id = None
+        chunk_end = min(self.window_end, position + self.CHUNK_LINES)
+        self.text.insert(tk.END, '\n' + '\n'.join(self.lines[position:chunk_end]))
+        if chunk_end < self.window_end:
+            self._stream_id = self.text.after(self.CHUNK_DELAY_MS, self._stream, chunk_end)
+
+    def _cancel_stream(self):
+        if self._stream_id is not None:
+            self.text.after_cancel(self._stream_id)
+            self._stream_id = None
+
+    def _top_line(self):
+        """Index into self.lines of the first visible line."""
+        return self.window_start + int(self.text.index('@0,0').split('.')[0]) - 1
+
+    def _visible_lines(self):
+        first, last = self.text.yview()
+        return max(1, round((last - first) * (self.window_end - self.window_start)))
 
-class UniversityDataManager:
-    """Manages university data initialization and operations."""
+    def _scroll_to_line(self, line):
+        """Show lines[line] at the top, sliding the window if it is near an edge."""
+        line = max(0, min(line, len(self.lines) - 1))
+        if (line - self.window_start < self.EDGE_LINES and self.window_start > 0) or \
+                (self.window_end - line < self.EDGE_LINES and self.window_end < len(self.lines)):
+            self._materialize(line - self.WINDOW_LINES // 2)
+        self.text.yview(f"{line - self.window_start + 1}.0")
+
+    def _cancel_recenter(self):
+        if self._recenter_id is not None:
+            self.text.after_cancel(self._recenter_id)
+            self._recenter_id = None
+
+    def _recenter(self):
+        self._recenter_id = None
+        self._scroll_to_line(self._top_line())
+
+    def _on_scrollbar(self, *args):
+        if not self.virtual:
+            self.text.yview(*args)
+            return
+        if args[0] == 'moveto':
+            line = int(float(args[1]) * len(self.lines))
+        elif args[2] == 'pages':
+            line = self._top_line() + int(args[1]) * self._visible_lines()
+        else:
+            line = self._top_line() + int(args[1])
+        self._scroll_to_line(line)
+
+    def _on_text_scrolled(self, first, last):
+        if not self.virtual:
+            self.scrollbar.set(first, last)
+            return
+            
+        # Report the position within the whole result, not within the window
+        total = len(self.lines)
+        top = self._top_line()
+        self.scrollbar.set(top / total, min(1.0, (top + self._visible_lines()) / total))
+        
+        # Mouse wheel and keyboard scrolling move the Text directly; slide the
+        # window once the view gets close to either edge
+        near_start = top - self.window_start < self.EDGE_LINES and self.window_start > 0
+        near_end = (self.window_end - top < self.EDGE_LINES + self._visible_lines()
+                    and self.window_end < total)
+        if (near_start or near_end) and self._recenter_id is None:
+            self._recenter_id = self.text.after_idle(self._recenter)
+
+class CatalogueBrowser:
+    """City → University → Faculty → Department → Subject tree that fills in on demand.
+    
+    Only the city nodes are inserted up front; a node's children are inserted
+    the first time it is expanded, long lists CHUNK at a time behind a "Show
+    more" node, so the tree opens instantly whatever the size of the catalogue.
+    The box above the tree narrows it to the universities whose name or city
+    contains every typed word. In the tree the arrow keys move and expand,
+    Enter toggles a node and typing jumps to the next sibling starting with the
+    typed letters. Selecting a node calls on_select(kind, path), path running
+    from the city down to the node's value.
+    """
+    
+    CHUNK = 200
+    TYPEAHEAD_RESET_S = 1.0
+    CHILD_KINDS = {'city': 'university', 'university': 'faculty', 'faculty': 'department',
+                   'department': 'subject'}
     
+    def __init__(self, parent, font, on_select, height=8):
+        self.on_select = on_select
+        self.frame = tk.Frame(parent, bg='white')
+        self.filter_var = tk.StringVar()
+        self.filter_var.trace('w', lambda *args: self.rebuild())
+        entry = tk.Entry(self.frame, textvariable=self.filter_var, font=font)
+        entry.pack(fill=tk.X, pady=(0, 5))
+        entry.bind('<Down>', self.focus_tree)
+        entry.bind('<Return>', self.focus_tree)
+        entry.bind('<Escape>', lambda event: self.clear_filter())
+        
+        tree_frame = tk.Frame(self.frame, bg='white')
+        tree_frame.pack(fill=tk.BOTH, expand=True)
+        self.tree = ttk.Treeview(tree_frame, show='tree', selectmode='browse', height=height)
+        scrollbar = ttk.Scrollbar(tree_frame, orient=tk.VERTICAL, command=self.tree.yview)
+        self.tree.configure(yscrollcommand=scrollbar.set)
+        scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        self.tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        self.tree.bind('<<TreeviewOpen>>', lambda event: self.expand(self.tree.focus()))
+        self.tree.bind('<<TreeviewSelect>>', self.on_tree_select)
+        self.tree.bind('<Return>', self.toggle)
+        self.tree.bind('<KeyPress>', self.type_ahead)
+        
+        self.universities = []
+        self.groups = {}      # city -> its universities passing the filter, in list order
+        self.nodes = {}       # tree item -> (kind, value, parent item)
+        self.expanded = set()  # items whose children have been inserted
+        self._folded = {}     # name -> fold(name)
+        self._filter_texts = {}  # (name, city) -> folded text the filter box matches
+        self._searchable = None  # [(folded text, university)] of self.universities
+        self._matched = None  # (filter text, the part of _searchable passing it)
+        self._typed = ''
+        self._typed_at = 0.0
+        self._revealed = None  # item selected by reveal(), whose select event is skipped
+        
+    def pack(self, **kwargs):
+        self.frame.pack(**kwargs)
+        
+    def show(self, universities):
+        """Browse these universities, keeping the typed filter."""
+        self.universities = universities
+        self._searchable = self._matched = None
+        self._folded.clear()
+        self.rebuild()
+        
+    def _fold(self, name):
+        folded = self._folded.get(name)
+        if folded is None:
+            folded = self._folded[name] = fold(name)
+        return folded
+        
+    def clear_filter(self):
+        if self.filter_var.get():
+            self.filter_var.set('')
+            
+    def _filtered(self, text):
+        """The universities whose name or city contains every word of text."""
+        words = text.split()
+        if not words:
+            return self.universities
+        if self._matched is not None and text.startswith(self._matched[0]):
+            # Typing on only narrows the previous matches
+            candidates = self._matched[1]
+        else:
+            if self._searchable is None:
+                # Carry over the texts of universities still shown and drop the rest,
+                # so the cache never outgrows the list being browsed
+                previous, texts = self._filter_texts, {}
+                self._searchable = []
+                for uni in self.universities:
+                    key = (uni.name, uni.city)
+                    folded = texts.get(key) or previous.get(key)
+                    if folded is None:
+                        folded = f"{fold(uni.name)} {fold(uni.city)}"
+                    texts[key] = folded
+                    self._searchable.append((folded, uni))
+                self._filter_texts = texts
+            candidates = self._searchable
+        matched = [(folded, uni) for folded, uni in candidates
+                   if all(word in folded for word in words)]
+        self._matched = (text, matched)
+        return [uni for _, uni in matched]
+        
+    @timed()
+    def rebuild(self):
+        """Group the universities passing the filter by city and insert the city nodes."""
+        text = fold(self.filter_var.get())
+        groups = {}
+        for uni in self._filtered(text):
+            groups.setdefault(uni.city, []).append(uni)
+        city_order = {city: i for i, city in enumerate(QYTETET.values())}
+        self.groups = {city: groups[city] for city in sorted(
+            groups, key=lambda city: (city_order.get(city, len(city_order)), city))}
+        
+        self.tree.delete(*self.tree.get_children())
+        self.nodes.clear()
+        self.expanded.clear()
+        self._revealed = None
+        for city, universities in self.groups.items():
+            self._insert('', 'city', city, f"{city} ({len(universities)})")
+        # A narrow filter shows its matches straight away
+        if text.strip() and sum(map(len, self.groups.values())) <= self.CHUNK:
+            for item in self.tree.get_children():
+                self.open(item)
+                
+    def _insert(self, parent, kind, value, text):
+        item = self.tree.insert(parent, tk.END, text=text)
+        self.nodes[item] = (kind, value, parent)
+        if kind in self.CHILD_KINDS:
+            # Placeholder, so the node has an expander before its children exist
+            self.tree.insert(item, tk.END, text="…")
+        return item
+        
+    def _children(self, kind, value):
+        if kind == 'city':
+            return self.groups[value]
+        if kind == 'university':
+            return value.faculties
+        if kind == 'faculty':
+            return value.departments
+        return value.subjects
+        
+    def _insert_children(self, parent, kind, children, start):
+        """Insert up to CHUNK children from start on; returns the first item inserted."""
+        end = start + self.CHUNK
+        items = [self._insert(parent, kind, child, child if kind == 'subject' else child.name)
+                 for child in children[start:end]]
+        left = len(children) - end
+        if left > 0:
+            item = self.tree.insert(parent, tk.END,
+                                    text=f"Show {min(self.CHUNK, left)} more of {left}…")
+            self.nodes[item] = ('more', (kind, children, end), parent)
+        return items[0] if items else None
+        
+    @timed()
+    def expand(self, item):
+        """Insert the children of a node the first time it is opened."""
+        kind, value, _ = self.nodes.get(item, (None, None, None))
+        if kind not in self.CHILD_KINDS or item in self.expanded:
+            return
+        self.expanded.add(item)
+        self.tree.delete(*self.tree.get_children(item))
+        self._insert_children(item, self.CHILD_KINDS[kind], self._children(kind, value), 0)
+        
+    def open(self, item):
+        self.expand(item)
+        self.tree.item(item, open=True)
+        
+    def load_more(self, item):
+        """Replace a "Show more" node with the next chunk; returns its first item."""
+        _, (kind, children, start), parent = self.nodes.pop(item)
+        self.tree.delete(item)
+        return self._insert_children(parent, kind, children, start)
+        
+    def path(self, item):
+        """The values from the city down to a node."""
+        path = []
+        while item:
+            _, value, item = self.nodes[item]
+            path.append(value)
+        return path[::-1]
+        
+    def select(self, item):
+        self.tree.focus(item)
+        self.tree.selection_set(item)
+        self.tree.see(item)
+        
+    def on_tree_select(self, event=None):
+        selection = self.tree.selection()
+        if not selection or selection[0] not in self.nodes:
+            return
+        item = selection[0]
+        if item == self._revealed:
+            self._revealed = None
+            return
+        kind = self.nodes[item][0]
+        if kind == 'more':
+            first = self.load_more(item)
+            if first is not None:
+                self.select(first)
+            return
+        self.on_select(kind, self.path(item))
+        
+    def reveal(self, university, faculty=None):
+        """Open the tree down to a university (and one of its faculties) and select it.
+        
+        Returns False if the university is not in the tree. Selecting it does
+        not call on_select; the caller shows it.
+        """
+        city = next((item for item in self.tree.get_children()
+                     if self.nodes[item][1] == university.city), None)
+        item = self._find_child(city, university) if city is not None else None
+        if item is None:
+            return False
+        if faculty is not None:
+            self.open(item)
+            item = self._find_child(item, faculty) or item
+        self._revealed = item
+        self.select(item)
+        return True
+        
+    def _find_child(self, parent, value):
+        """The child of parent showing value, loading further chunks as needed."""
+        self.open(parent)
+        while True:
+            more = None
+            for item in self.tree.get_children(parent):
+                kind, child, _ = self.nodes[item]
+                if child is value:
+                    return item
+                if kind == 'more':
+                    more = item
+            if more is None:
+                return None
+            self.load_more(more)
+            
+    def focus_tree(self, event=None):
+        """Move the keyboard focus from the filter box into the tree."""
+        item = self.tree.focus() or next(iter(self.tree.get_children()), '')
+        if item:
+            self.tree.focus_set()
+            self.select(item)
+        return 'break'
+        
+    def toggle(self, event=None):
+        item = self.tree.focus()
+        if not item or item not in self.nodes:
+            return 'break'
+        if self.nodes[item][0] == 'more':
+            self.on_tree_select()
+        elif self.tree.item(item, 'open'):
+            self.tree.item(item, open=False)
+        else:
+            self.open(item)
+        return 'break'
+        
+    def type_ahead(self, event):
+        """Jump to the next sibling whose name starts with the letters typed so far."""
+        if not event.char or not event.char.isprintable() or event.state & 0x4:
+            return None
+        now = time.monotonic()
+        if now - self._typed_at > self.TYPEAHEAD_RESET_S:
+            self._typed = ''
+        self._typed_at = now
+        self._typed += fold(event.char)
+        
+        current = self.tree.focus()
+        siblings = self.tree.get_children(self.tree.parent(current) if current else '')
+        if not siblings:
+            return 'break'
+        # A fresh first letter moves past the current node, so repeating it cycles
+        start = siblings.index(current) if current in siblings else 0
+        if len(self._typed) == 1:
+            start += 1
+        for offset in range(len(siblings)):
+            item = siblings[(start + offset) % len(siblings)]
+            if self._fold(self.tree.item(item, 'text')).startswith(self._typed):
+                self.select(item)
+                break
+        return 'break'
+
+class SearchSuggestions:
+    """Typeahead dropdown under an entry, completing what is typed to catalogue names.
+    
+    Completions come from the catalogue's SuggestionIndex, prepared on a worker
+    thread whenever a catalogue is loaded; until it is ready the dropdown just
+    stays hidden. Down and Up move through the list, Enter or a click picks a
+    name (calling on_pick(suggestion)) and Escape or leaving the entry hides it.
+    The list never takes the focus, so typing carries on in the entry.
+    """
+    
+    def __init__(self, entry, font, on_pick):
+        self.entry = entry
+        self.on_pick = on_pick
+        self.listbox = tk.Listbox(entry.winfo_toplevel(), font=font, activestyle='none',
+                                  exportselection=False, takefocus=0, relief=tk.SOLID, bd=1)
+        # Keep the Listbox class bindings from moving the focus on a click
+        self.listbox.bind('<Button-1>', lambda event: 'break')
+        self.listbox.bind('<ButtonRelease-1>', self.pick_clicked)
+        self.listbox.bind('<Motion>', self.highlight_hovered)
+        entry.bind('<Down>', lambda event: self.move(1))
+        entry.bind('<Up>', lambda event: self.move(-1))
+        entry.bind('<Return>', self.pick_selected)
+        entry.bind('<Escape>', lambda event: self.hide())
+        entry.bind('<FocusOut>', lambda event: self.hide())
+        self.suggestions = []
+        self.future = None  # future of the prepared SuggestionIndex
+        
+    def load(self, future):
+        """Complete from the SuggestionIndex future resolves to (see prepare) once it is ready."""
+        self.future = future
+        self.hide()
+        
     @staticmethod
-    def initialize_data():
-        """Initialize all university data."""
-        
-        # Computer Science and Engineering Departments
-        dept_se = Department("Software Engineering", [
-            "Advanced Programming", "Data Structures", "Algorithms", 
-            "Web Development", "Software Engineering", "Database Systems"
-        ])
-        dept_cs = Department("Cybersecurity", [
-            "Network Security", "Cryptography", "Ethical Hacking", 
-            "Data Protection", "Digital Forensics"
-        ])
-        dept_it = Department("Information Technology", [
-            "Operating Systems", "Computer Networks", "Database Management",
-            "System Administration"
-        ])
-        dept_ai = Department("Artificial Intelligence", [
-            "Machine Learning", "Computer Vision", "Natural Language Processing",
-            "Neural Networks", "Deep Learning"
-        ])
-        dept_ce = Department("Computer Engineering", [
-            "Computer Architecture", "Embedded Systems", "System Programming",
-            "Hardware Design"
-        ])
-        
-        # Engineering Departments
-        dept_ee = Department("Electrical Engineering", [
-            "Electronics", "Control Systems", "Signals and Systems",
-            "Power Systems", "Telecommunications"
-        ])
-        dept_civil = Department("Civil Engineering", [
-            "Structural Engineering", "Hydraulic Engineering", "Geotechnics",
-            "Construction Management"
-        ])
-        dept_arch = Department("Architecture", [
-            "Architectural Design", "Building Structures", "Urban Planning",
-            "Interior Design"
-        ])
-        
-        # Business and Economics Departments
-        dept_finance = Department("Finance and Banking", [
-            "Corporate Finance", "Investment Analysis", "Banking and Insurance",
-            "Financial Markets"
-        ])
-        dept_management = Department("Management and Informatics", [
-            "Strategic Management", "Management Information Systems", 
-            "Digital Marketing", "Project Management"
-        ])
-        dept_accounting = Department("Accounting and Auditing", [
-            "Financial Accounting", "Management Accounting", "Auditing",
-            "Tax Planning"
-        ])
-        
-        # Law and Political Science
-        dept_law = Department("Law", [
-            "Constitutional Law", "Criminal Law", "Civil Law",
-            "International Law", "Commercial Law"
-        ])
-        dept_political = Department("Political Science", [
-            "International Relations", "Comparative Politics", 
-            "Public Administration", "Political Theory"
-        ])
-        
-        # Medical Sciences
-        dept_medicine = Department("General Medicine", [
-            "Anatomy", "Physiology", "Pharmacology", "Pathology",
-            "Internal Medicine", "Surgery"
-        ])
-        dept_dentistry = Department("Dentistry", [
-            "Dental Prosthetics", "Oral Surgery", "Orthodontics",
-            "Periodontics"
-        ])
-        dept_pharmacy = Department("Pharmacy", [
-            "Pharmaceutical Chemistry", "Pharmacology", 
-            "Pharmaceutical Technology", "Clinical Pharmacy"
-        ])
-        
-        # Liberal Arts and Sciences
-        dept_albanian_lit = Department("Albanian Language and Literature", [
-            "Albanian Literature", "Albanian Linguistics", "Literary Theory"
-        ])
-        dept_english_lit = Department("English Language and Literature", [
-            "English Literature", "Linguistics", "Translation Studies"
-        ])
-        dept_philosophy = Department("Philosophy", [
-            "History of Philosophy", "Ethics", "Logic", "Metaphysics"
-        ])
-        dept_psychology = Department("Psychology", [
-            "Developmental Psychology", "Cognitive Psychology", 
-            "Clinical Psychology", "Social Psychology"
-        ])
-        dept_math = Department("Mathematics", [
-            "Mathematical Analysis", "Algebra", "Statistics", "Applied Mathematics"
-        ])
-        dept_physics = Department("Physics", [
-            "Classical Physics", "Quantum Physics", "Thermodynamics",
-            "Electromagnetism"
-        ])
-        dept_chemistry = Department("Chemistry", [
-            "Analytical Chemistry", "Biochemistry", "Organic Chemistry",
-            "Inorganic Chemistry"
-        ])
-        dept_biology = Department("Biology", [
-            "Genetics", "Ecology", "Molecular Biology", "Botany", "Zoology"
-        ])
-        
-        # Education and Sports
-        dept_primary_ed = Department("Primary Education", [
-            "Pedagogy", "Didactics", "Child Psychology", "Curriculum Development"
-        ])
-        dept_preschool = Department("Preschool Education", [
-            "Child Psychology", "Teaching Methodology", "Early Childhood Development"
-        ])
-        dept_physical_ed = Department("Physical Education", [
-            "Exercise Physiology", "Sports Training", "Sports Psychology",
-            "Kinesiology"
-        ])
-        
-        # Agriculture and Veterinary
-        dept_agribusiness = Department("Agribusiness", [
-            "Agricultural Economics", "Agricultural Marketing", 
-            "Farm Management", "Rural Development"
-        ])
-        dept_veterinary = Department("Veterinary Medicine", [
-            "Veterinary Anatomy", "Veterinary Pathology", 
-            "Animal Health", "Veterinary Surgery"
-        ])
-        
-        # Arts and Design
-        dept_graphic_design = Department("Graphic Design", [
-            "Graphic Design", "Digital Illustration", "Typography",
-            "Brand Design"
-        ])
-        dept_music = Department("Musicology", [
-            "Music History", "Music Theory", "Composition", "Performance"
-        ])
-        
-        # Create Faculties
-        faculty_cse = Faculty("Faculty of Computer Science and Engineering", 
-                             [dept_se, dept_cs, dept_it, dept_ai, dept_ce])
-        faculty_eee = Faculty("Faculty of Electrical and Computer Engineering", 
-                             [dept_ee, dept_ce])
-        faculty_economics = Faculty("Faculty of Economics", 
-                                   [dept_finance, dept_management, dept_accounting])
-        faculty_law = Faculty("Faculty of Law", [dept_law, dept_political])
-        faculty_medicine = Faculty("Faculty of Medicine", 
-                                  [dept_medicine, dept_dentistry, dept_pharmacy])
-        faculty_architecture = Faculty("Faculty of Architecture and Engineering", 
-                                      [dept_arch, dept_civil])
-        faculty_philology = Faculty("Faculty of Philology", 
-                                   [dept_albanian_lit, dept_english_lit])
-        faculty_philosophy = Faculty("Faculty of Philosophy", 
-                                    [dept_philosophy, dept_psychology])
-        faculty_natural_sciences = Faculty("Faculty of Mathematics and Natural Sciences", 
-                                          [dept_math, dept_physics, dept_chemistry, dept_biology])
-        faculty_education = Faculty("Faculty of Education", 
-                                   [dept_primary_ed, dept_preschool])
-        faculty_agriculture = Faculty("Faculty of Agriculture and Veterinary", 
-                                     [dept_agribusiness, dept_veterinary])
-        faculty_sports = Faculty("Faculty of Sport Sciences", [dept_physical_ed])
-        faculty_arts = Faculty("Faculty of Arts", [dept_graphic_design, dept_music])
-        
-        # Create Universities
-        universities = [
-            University("University of Prishtina \"Hasan Prishtina\"", QYTETET[4], [
-                faculty_cse, faculty_eee, faculty_economics, faculty_law, 
-                faculty_medicine, faculty_architecture, faculty_philology, 
-                faculty_philosophy, faculty_natural_sciences, faculty_education, 
-                faculty_agriculture, faculty_sports, faculty_arts
-            ]),
-            University("Haxhi Zeka University", QYTETET[5], [
-                faculty_economics, faculty_law, faculty_cse
-            ]),
-            University("University of Gjilan \"Kadri Zeka\"", QYTETET[1], [
-                faculty_education, faculty_economics, faculty_cse
-            ]),
-            University("University of Prizren \"Ukshin Hoti\"", QYTETET[3], [
-                faculty_education, faculty_economics, faculty_law, faculty_cse
-            ]),
-            University("University of Gjakova \"Fehmi Agani\"", QYTETET[6], [
-                faculty_medicine, faculty_education, faculty_philology
-            ]),
-            University("University of Applied Sciences in Ferizaj", QYTETET[2], [
-                faculty_cse, faculty_architecture, faculty_eee
-            ]),
-            University("University of Mitrovica \"Isa Boletini\"", QYTETET[7], [
-                faculty_cse, faculty_economics, faculty_law
-            ]),
-        ]
-        
-        return universities
+    def prepare(manager):
+        """Return manager's SuggestionIndex, prepared; run it on a worker thread."""
+        index = manager.suggestion_index()
+        index.prepare()
+        return index
+        
+    def index(self):
+        """The prepared SuggestionIndex, or None while it is still being built."""
+        if self.future is None or not self.future.done():
+            return None
+        try:
+            return self.future.result()
+        except Exception:
+            return None
+            
+    @timed()
+    def update(self, text):
+        """Show the completions of text, or hide the dropdown if there are none."""
+        index = self.index()
+        self.suggestions = index.complete(text) if index is not None and text.strip() else []
+        if not self.suggestions:
+            self.hide()
+            return
+        self.listbox.delete(0, tk.END)
+        self.listbox.insert(tk.END, *map(views.suggestion_label, self.suggestions))
+        self.listbox.config(height=len(self.suggestions))
+        self.listbox.place(in_=self.entry, relx=0, rely=1.0, relwidth=1.0)
+        self.listbox.lift()
+        
+    def hide(self):
+        self.suggestions = []
+        self.listbox.place_forget()
+        
+    def move(self, step):
+        """Move the highlight through the list, wrapping around."""
+        if not self.suggestions:
+            return None
+        current = self.listbox.curselection()
+        position = (current[0] + step if current else (0 if step > 0 else -1))
+        position %= len(self.suggestions)
+        self.highlight(position)
+        return 'break'
+        
+    def highlight(self, position):
+        self.listbox.selection_clear(0, tk.END)
+        self.listbox.selection_set(position)
+        self.listbox.see(position)
+        
+    def highlight_hovered(self, event):
+        if self.suggestions:
+            self.highlight(self.listbox.nearest(event.y))
+        
+    def pick(self, position):
+        suggestion = self.suggestions[position]
+        self.hide()
+        self.on_pick(suggestion)
+        
+    def pick_selected(self, event=None):
+        current = self.listbox.curselection()
+        if not self.suggestions or not current:
+            self.hide()
+            return None
+        self.pick(current[0])
+        return 'break'
+        
+    def pick_clicked(self, event):
+        if self.suggestions:
+            self.pick(min(self.listbox.nearest(event.y), len(self.suggestions) - 1))
+
+class ExportWindow:
+    """Export dialog that streams the catalogue on a worker thread.
+    
+    The worker only bumps a progress counter; the dialog polls it with
+    root.after to drive the progress bar, so the main window stays responsive.
+    Cancel (or closing the dialog) stops the export between two universities.
+    """
+    
+    FORMATS = {"JSON": 'json', "JSON Lines": 'jsonl'}
+    COMPRESSIONS = {"None": None, **{name: name for name in COMPRESSION_OPENERS}}
+    POLL_MS = 100
+
+    def __init__(self, app):
+        self.app = app
+        self.window = tk.Toplevel(app.root)
+        self.window.title("Export Data")
+        self.window.geometry("420x290")
+        self.window.configure(bg='white')
+        self.window.protocol("WM_DELETE_WINDOW", self.close)
+        
+        self.future = None
+        self.cancel_event = None
+        self.progress = (0, 0)
+        
+        options = tk.Frame(self.window, bg='white')
+        options.pack(fill=tk.X, padx=20, pady=15)
+        
+        tk.Label(options, text="Format:", font=app.normal_font, bg='white').grid(
+            row=0, column=0, sticky='w', pady=5)
+        self.format_var = tk.StringVar(value="JSON")
+        ttk.Combobox(options, textvariable=self.format_var, values=list(self.FORMATS),
+                     state="readonly", width=20).grid(row=0, column=1, sticky='w', pady=5)
+        
+        tk.Label(options, text="Compression:", font=app.normal_font, bg='white').grid(
+            row=1, column=0, sticky='w', pady=5)
+        self.compression_var = tk.StringVar(value="None")
+        ttk.Combobox(options, textvariable=self.compression_var, values=list(self.COMPRESSIONS),
+                     state="readonly", width=20).grid(row=1, column=1, sticky='w', pady=5)
+        
+        self.analytics_var = tk.BooleanVar(value=False)
+        tk.Checkbutton(options, text="Include analytics" if NUMPY_AVAILABLE
+                       else "Include analytics (needs NumPy)", variable=self.analytics_var,
+                       state=tk.NORMAL if NUMPY_AVAILABLE else tk.DISABLED,
+                       bg='white', font=app.normal_font).grid(row=2, column=1, sticky='w', pady=5)
+        
+        self.progress_bar = ttk.Progressbar(self.window, mode='determinate')
+        self.progress_bar.pack(fill=tk.X, padx=20, pady=5)
+        self.status_var = tk.StringVar(value="Choose a format and press Export.")
+        tk.Label(self.window, textvariable=self.status_var, font=app.normal_font,
+                 bg='white', fg='#7f8c8d').pack(fill=tk.X, padx=20)
+        
+        buttons = tk.Frame(self.window, bg='white')
+        buttons.pack(fill=tk.X, padx=20, pady=15)
+        self.export_btn = tk.Button(buttons, text="Export...", command=self.start,
+                                    bg='#27ae60', fg='white', font=app.normal_font,
+                                    relief=tk.FLAT, padx=20, pady=5, cursor='hand2')
+        self.export_btn.pack(side=tk.LEFT)
+        self.cancel_btn = tk.Button(buttons, text="Cancel", command=self.cancel,
+                                    bg='#e74c3c', fg='white', font=app.normal_font,
+                                    relief=tk.FLAT, padx=20, pady=5, cursor='hand2',
+                                    state=tk.DISABLED)
+        self.cancel_btn.pack(side=tk.RIGHT)
+
+    def start(self):
+        """Ask for a file name and start the export in the background."""
+        manager = self.app.data_manager
+        exporter = CatalogueExporter(manager.universities, manager.statistics(),
+                                     fmt=self.FORMATS[self.format_var.get()],
+                                     compression=self.COMPRESSIONS[self.compression_var.get()])
+        filename = filedialog.asksaveasfilename(parent=self.window,
+                                                initialfile=exporter.default_filename(),
+                                                title="Export Data")
+        if not filename:
+            return
+            
+        self.progress = (0, len(exporter.universities))
+        self.progress_bar.configure(maximum=max(1, len(exporter.universities)), value=0)
+        self.status_var.set("Exporting...")
+        self.export_btn.config(state=tk.DISABLED)
+        self.cancel_btn.config(state=tk.NORMAL)
+        
+        self.cancel_event = threading.Event()
+        include_analytics = self.analytics_var.get()
+        
+        def export():
+            if include_analytics:
+                exporter.analytics = self.app.analytics_report(manager)
+            return exporter.export(filename, self._on_progress, self.cancel_event)
+            
+        self.future = self.app.run_on_worker("export", export, manager=manager)
+        self.window.after(self.POLL_MS, self._poll)
+
+    def _on_progress(self, done, total):
+        # Runs on the worker thread: only record the numbers, Tk reads them in _poll
+        self.progress = (done, total)
+
+    def _poll(self):
+        if not self.window.winfo_exists():
+            return
+        done, total = self.progress
+        self.progress_bar.configure(value=done)
+        if not self.future.done():
+            self.status_var.set(f"Exported {done} of {total} universities...")
+            self.window.after(self.POLL_MS, self._poll)
+            return
+            
+        self.export_btn.config(state=tk.NORMAL)
+        self.cancel_btn.config(state=tk.DISABLED)
+        try:
+            filename = self.future.result()
+        except ExportCancelled:
+            self.status_var.set("Export cancelled.")
+        except Exception as e:
+            self.status_var.set("Export failed.")
+            messagebox.showerror("Export Error", f"Failed to export data: {str(e)}",
+                                 parent=self.window)
+        else:
+            self.status_var.set(f"Exported {total} universities.")
+            messagebox.showinfo("Export Successful",
+                                f"Data exported successfully to {filename}", parent=self.window)
+        self.future = None
+
+    def cancel(self):
+        if self.cancel_event is not None:
+            self.cancel_event.set()
+            self.status_var.set("Cancelling...")
+
+    def close(self):
+        self.cancel()
+        self.window.destroy()
+
+class PerformanceWindow:
+    """Live view of the instrumented handlers and the slowest recent events.
+    
+    Timings come from kosovo_universities.instrumentation; the table refreshes
+    every REFRESH_MS while the window is open.
+    """
+    
+    REFRESH_MS = 1000
+    EVENT_COLUMNS = (("calls", "Calls", 60), ("mean", "Mean ms", 75), ("p50", "p50 ms", 70),
+                     ("p95", "p95 ms", 70), ("max", "Max ms", 75), ("total", "Total ms", 85))
+
+    def __init__(self, app):
+        self.app = app
+        self.window = tk.Toplevel(app.root)
+        self.window.title("Performance")
+        self.window.geometry("760x540")
+        self.window.configure(bg='white')
+        
+        controls = tk.Frame(self.window, bg='white')
+        controls.pack(fill=tk.X, padx=15, pady=10)
+        self.enabled_var = tk.BooleanVar(value=instrumentation.enabled)
+        tk.Checkbutton(controls, text="Record timings", variable=self.enabled_var,
+                       command=self.toggle, bg='white', font=app.normal_font).pack(side=tk.LEFT)
+        tk.Button(controls, text="Reset", command=self.reset, font=app.normal_font,
+                  relief=tk.FLAT, bg='#ecf0f1', padx=12).pack(side=tk.RIGHT)
+        
+        self.events = ttk.Treeview(self.window, columns=[c[0] for c in self.EVENT_COLUMNS],
+                                   height=12)
+        self.events.heading('#0', text="Event")
+        self.events.column('#0', width=250)
+        for column, heading, width in self.EVENT_COLUMNS:
+            self.events.heading(column, text=heading)
+            self.events.column(column, width=width, anchor='e')
+        self.events.pack(fill=tk.BOTH, expand=True, padx=15)
+        
+        tk.Label(self.window, text=f"Slow events (≥ {instrumentation.slow_ms} ms), newest first",
+                 font=app.normal_font, bg='white', fg='#34495e', anchor='w').pack(
+                     fill=tk.X, padx=15, pady=(10, 0))
+        self.slow = ttk.Treeview(self.window, columns=("event", "ms"), show='headings', height=8)
+        self.slow.heading('event', text="Event")
+        self.slow.heading('ms', text="ms")
+        self.slow.column('ms', width=90, anchor='e')
+        self.slow.pack(fill=tk.BOTH, expand=True, padx=15)
+        
+        self.cache_var = tk.StringVar()
+        tk.Label(self.window, textvariable=self.cache_var, font=app.normal_font, bg='white',
+                 fg='#7f8c8d', anchor='w').pack(fill=tk.X, padx=15, pady=(5, 15))
+        
+        self.refresh()
+
+    def toggle(self):
+        instrumentation.enabled = self.enabled_var.get()
+
+    def reset(self):
+        instrumentation.reset()
+        self.refresh()
+
+    def refresh(self):
+        if not self.window.winfo_exists():
+            return
+        self.events.delete(*self.events.get_children())
+        for row in instrumentation.summary():
+            self.events.insert('', tk.END, text=row['event'], values=(
+                row['calls'], f"{row['mean_ms']:.2f}", f"{row['p50_ms']:.2f}",
+                f"{row['p95_ms']:.2f}", f"{row['max_ms']:.2f}", f"{row['total_ms']:.1f}"))
+            
+        self.slow.delete(*self.slow.get_children())
+        for when, event, ms in reversed(instrumentation.slow_events):
+            self.slow.insert('', tk.END, values=(
+                f"{time.strftime('%H:%M:%S', time.localtime(when))}  {event}", f"{ms:.1f}"))
+            
+        cache = self.app.view_cache
+        lookups = cache.hits + cache.misses
+        self.cache_var.set(f"View cache: {len(cache)} views, {cache.size / 1024:.0f} KiB, "
+                           f"{cache.hits}/{lookups} hits")
+        self.window.after(self.REFRESH_MS, self.refresh)
+
+class StatisticsWindow:
+    """Catalogue statistics, with the analytics report on a second tab.
+    
+    The overview comes from the maintained aggregates and shows at once. The
+    analytics are computed on a worker thread and kept by the application until
+    the catalogue changes, so opening the window never blocks the main loop.
+    """
+    
+    POLL_MS = 100
+
+    def __init__(self, app):
+        self.app = app
+        self.window = tk.Toplevel(app.root)
+        self.window.title("System Statistics")
+        self.window.geometry("900x620")
+        self.window.configure(bg='white')
+        
+        tk.Label(self.window, text="Kosovo Universities Statistics", font=app.heading_font,
+                 bg='white', fg='#2c3e50').pack(pady=15)
+        
+        notebook = ttk.Notebook(self.window)
+        notebook.pack(fill=tk.BOTH, expand=True, padx=20)
+        overview = scrolledtext.ScrolledText(notebook, wrap=tk.WORD, font=app.normal_font)
+        overview.insert(tk.END, '\n'.join(views.statistics_lines(app.data_manager.statistics())))
+        overview.config(state=tk.DISABLED)
+        notebook.add(overview, text="Overview")
+        # Fixed width, so the field x city matrix lines up
+        self.analytics_text = scrolledtext.ScrolledText(notebook, wrap=tk.NONE,
+                                                        font=("Courier", 10))
+        notebook.add(self.analytics_text, text="Analytics")
+        
+        controls = tk.Frame(self.window, bg='white')
+        controls.pack(fill=tk.X, padx=20, pady=10)
+        self.status_var = tk.StringVar()
+        tk.Label(controls, textvariable=self.status_var, font=app.normal_font,
+                 bg='white', fg='#7f8c8d').pack(side=tk.LEFT)
+        self.export_btn = tk.Button(controls, text="Export Analytics...", command=self.export,
+                                    bg='#27ae60', fg='white', font=app.normal_font,
+                                    relief=tk.FLAT, padx=20, pady=5, cursor='hand2',
+                                    state=tk.DISABLED)
+        self.export_btn.pack(side=tk.RIGHT)
+        
+        self.report = None
+        self.future = None
+        if not NUMPY_AVAILABLE:
+            self.show_analytics(["Analytics need NumPy (pip install numpy)."])
+            return
+        self.status_var.set("Computing analytics...")
+        manager = app.data_manager
+        # Counted now: the catalogue may be swapped or edited before the job finishes
+        self.university_count = len(manager.universities)
+        self.future = app.run_on_worker("analytics", app.analytics_report, manager,
+                                        manager=manager)
+        self.window.after(self.POLL_MS, self._poll)
+
+    def show_analytics(self, lines):
+        self.analytics_text.config(state=tk.NORMAL)
+        self.analytics_text.delete('1.0', tk.END)
+        self.analytics_text.insert(tk.END, '\n'.join(lines))
+        self.analytics_text.config(state=tk.DISABLED)
+
+    def _poll(self):
+        if not self.window.winfo_exists():
+            return
+        if not self.future.done():
+            self.window.after(self.POLL_MS, self._poll)
+            return
+        try:
+            self.report = self.future.result()
+        except Exception as e:
+            self.status_var.set("Analytics failed.")
+            self.show_analytics([f"Could not compute the analytics: {e}"])
+            return
+        self.show_analytics(views.analytics_lines(self.report))
+        self.status_var.set(f"Analytics of {self.university_count} universities")
+        self.export_btn.config(state=tk.NORMAL)
+
+    def export(self):
+        """Save the analytics report as JSON."""
+        filename = filedialog.asksaveasfilename(
+            parent=self.window, title="Export Analytics", defaultextension=".json",
+            initialfile=f"kosovo_universities_analytics_{time.strftime('%Y%m%d_%H%M%S')}.json")
+        if not filename:
+            return
+        try:
+            with open(filename, 'w', encoding='utf-8') as f:
+                json.dump(self.report, f, indent=2, ensure_ascii=False)
+        except OSError as e:
+            messagebox.showerror("Export Error", f"Failed to export analytics: {e}",
+                                 parent=self.window)
+            return
+        self.status_var.set(f"Analytics exported to {filename}")
+
+class WhereToStudyWindow:
+    """Where a subject or department is taught, grouped by city and paged.
+    
+    Lookups go through the catalogue's OfferingIndex; backends that build it on
+    first use do so on a worker thread while the window shows a status line.
+    Double-clicking a place (or pressing Enter on it) opens its faculty in the
+    main window.
+    """
+    
+    POLL_MS = 100
+    PAGE_SIZE = 50
+    
+    def __init__(self, app, name='', level='subject'):
+        self.app = app
+        self.window = tk.Toplevel(app.root)
+        self.window.title("Where to Study")
+        self.window.geometry("820x600")
+        self.window.configure(bg='white')
+        
+        controls = tk.Frame(self.window, bg='white')
+        controls.pack(fill=tk.X, padx=15, pady=10)
+        self.name_var = tk.StringVar(value=name)
+        entry = tk.Entry(controls, textvariable=self.name_var, font=app.normal_font, width=40)
+        entry.pack(side=tk.LEFT, fill=tk.X, expand=True)
+        entry.bind('<Return>', self.find)
+        entry.focus_set()
+        self.level_var = tk.StringVar(value=level)
+        for level, text in (('subject', "Subject"), ('department', "Department")):
+            tk.Radiobutton(controls, text=text, variable=self.level_var, value=level,
+                           command=self.find, bg='white', font=app.normal_font).pack(
+                               side=tk.LEFT, padx=(10, 0))
+        tk.Button(controls, text="Find", command=self.find, bg='#3498db', fg='white',
+                  font=app.normal_font, relief=tk.FLAT, padx=15, cursor='hand2').pack(
+                      side=tk.LEFT, padx=(10, 0))
+        
+        self.status_var = tk.StringVar()
+        tk.Label(self.window, textvariable=self.status_var, font=app.normal_font, bg='white',
+                 fg='#7f8c8d', anchor='w').pack(fill=tk.X, padx=15)
+        
+        self.tree = ttk.Treeview(self.window, columns=("faculty", "department"))
+        self.tree.heading('#0', text="City / University")
+        self.tree.heading('faculty', text="Faculty")
+        self.tree.heading('department', text="Department")
+        self.tree.column('#0', width=300)
+        self.tree.pack(fill=tk.BOTH, expand=True, padx=15, pady=5)
+        self.tree.bind('<Double-1>', self.open_selected)
+        self.tree.bind('<Return>', self.open_selected)
+        
+        paging = tk.Frame(self.window, bg='white')
+        paging.pack(fill=tk.X, padx=15, pady=(0, 10))
+        self.prev_btn = tk.Button(paging, text="◀ Previous", relief=tk.FLAT, bg='#ecf0f1',
+                                  font=app.normal_font, state=tk.DISABLED,
+                                  command=lambda: self.show_page(self.page_number - 1))
+        self.prev_btn.pack(side=tk.LEFT)
+        self.next_btn = tk.Button(paging, text="Next ▶", relief=tk.FLAT, bg='#ecf0f1',
+                                  font=app.normal_font, state=tk.DISABLED,
+                                  command=lambda: self.show_page(self.page_number + 1))
+        self.next_btn.pack(side=tk.RIGHT)
+        self.page_var = tk.StringVar()
+        tk.Label(paging, textvariable=self.page_var, font=app.normal_font,
+                 bg='white').pack(side=tk.LEFT, expand=True)
+        
+        self.index = None
+        self.index_manager = None
+        self.future = None
+        self.page_number = 1
+        self.offerings = {}  # tree item -> Offering
+        self.load_index()
+        
+    def load_index(self):
+        """Fetch the current catalogue's offering index on a worker, then show the page."""
+        manager = self.app.data_manager
+        self.status_var.set("Indexing the catalogue...")
+        self.future = (manager, self.app.run_on_worker("offerings", manager.offering_index,
+                                                       manager=manager))
+        self.window.after(self.POLL_MS, self._poll)
+        
+    def _poll(self):
+        if not self.window.winfo_exists():
+            return
+        manager, future = self.future
+        if not future.done():
+            self.window.after(self.POLL_MS, self._poll)
+            return
+        self.future = None
+        try:
+            self.index = future.result()
+        except Exception as e:
+            self.status_var.set(f"Could not index the catalogue: {e}")
+            return
+        self.index_manager = manager
+        self.status_var.set("")
+        self.show_page(self.page_number)
+        
+    def find(self, event=None):
+        self.show_page(1)
+        
+    @timed()
+    def show_page(self, number):
+        """Show page number of the current name's places."""
+        self.page_number = number
+        if self.future is not None:
+            return
+        if self.index_manager is not self.app.data_manager:
+            # The catalogue was reloaded since: look the name up in the new one
+            self.load_index()
+            return
+            
+        self.tree.delete(*self.tree.get_children())
+        self.offerings = {}
+        self.prev_btn.config(state=tk.DISABLED)
+        self.next_btn.config(state=tk.DISABLED)
+        self.page_var.set('')
+        name, level = self.name_var.get().strip(), self.level_var.get()
+        if not name:
+            self.status_var.set(f"Type a {level} name to see where it is taught.")
+            return
+        page = self.index.page(name, level, number, self.PAGE_SIZE)
+        if page is None:
+            self.status_var.set(self.app.offering_suggestion(name, level))
+            return
+            
+        self.page_number = page.page
+        self.status_var.set(views.offering_summary(page))
+        for city, offerings in page.groups:
+            parent = self.tree.insert('', tk.END, text=f"{city} ({page.city_totals[city]})",
+                                      open=True)
+            for offering in offerings:
+                item = self.tree.insert(parent, tk.END, text=offering.university.name,
+                                        values=(offering.faculty, offering.department))
+                self.offerings[item] = offering
+        self.page_var.set(f"Page {page.page} of {page.pages}")
+        if page.page > 1:
+            self.prev_btn.config(state=tk.NORMAL)
+        if page.page < page.pages:
+            self.next_btn.config(state=tk.NORMAL)
+            
+    def open_selected(self, event=None):
+        offering = self.offerings.get(self.tree.focus())
+        if offering is None:
+            return
+        if self.index_manager is not self.app.data_manager:
+            self.show_page(self.page_number)
+            return
+        self.app.show_offering(offering)
+
+class CompareWindow:
+    """Side-by-side comparison of the universities picked from a list.
+    
+    The list offers the universities the main window currently lists, with the
+    selected one picked already. Comparisons go through the catalogue's
+    ComparisonIndex and run on a worker thread together with the catalogue-wide
+    "most similar" ranking for the first university picked.
+    """
+    
+    POLL_MS = 100
+    SIMILAR = 10
+    
+    def __init__(self, app):
+        self.app = app
+        self.window = tk.Toplevel(app.root)
+        self.window.title("Compare Universities")
+        self.window.geometry("1000x640")
+        self.window.configure(bg='white')
+        
+        left = tk.Frame(self.window, bg='white')
+        left.pack(side=tk.LEFT, fill=tk.Y, padx=(15, 5), pady=10)
+        tk.Label(left, text="Universities (pick two or more):", font=app.normal_font,
+                 bg='white', anchor='w').pack(fill=tk.X)
+        list_frame = tk.Frame(left, bg='white')
+        list_frame.pack(fill=tk.BOTH, expand=True, pady=5)
+        self.listbox = tk.Listbox(list_frame, selectmode=tk.EXTENDED, width=45,
+                                  font=app.normal_font, exportselection=False)
+        scrollbar = ttk.Scrollbar(list_frame, orient=tk.VERTICAL, command=self.listbox.yview)
+        self.listbox.config(yscrollcommand=scrollbar.set)
+        self.listbox.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        self.listbox.bind('<Return>', self.compare)
+        tk.Button(left, text="Compare", command=self.compare, bg='#3498db', fg='white',
+                  font=app.normal_font, relief=tk.FLAT, padx=20, pady=5,
+                  cursor='hand2').pack(fill=tk.X)
+        
+        right = tk.Frame(self.window, bg='white')
+        right.pack(side=tk.LEFT, fill=tk.BOTH, expand=True, padx=(5, 15), pady=10)
+        self.status_var = tk.StringVar()
+        tk.Label(right, textvariable=self.status_var, font=app.normal_font, bg='white',
+                 fg='#7f8c8d', anchor='w').pack(fill=tk.X)
+        self.text = scrolledtext.ScrolledText(right, wrap=tk.WORD, font=app.normal_font)
+        self.text.pack(fill=tk.BOTH, expand=True, pady=5)
+        self.text.config(state=tk.DISABLED)
+        
+        self.manager = None
+        self.choices = []  # listbox position -> university
+        self.future = None
+        self.fill_list()
+        if len(self.listbox.curselection()) >= 2:
+            self.compare()
+        else:
+            self.status_var.set("Pick the universities to compare (Ctrl/Shift-click).")
+        
+    def fill_list(self):
+        """List the universities the main window offers, keeping the current one picked."""
+        self.manager = self.app.data_manager
+        self.listbox.delete(0, tk.END)
+        labels = list(self.app.choice_labels(self.app.filtered_universities,
+                                             lambda uni: uni.city).items())
+        self.choices = [uni for _, uni in labels]
+        self.listbox.insert(tk.END, *[label for label, _ in labels])
+        for position, uni in enumerate(self.choices):
+            if uni is self.app.selected_university:
+                self.listbox.selection_set(position)
+                self.listbox.see(position)
+        
+    def compare(self, event=None):
+        """Compare the picked universities on a worker thread."""
+        if self.future is not None:
+            return
+        if self.manager is not self.app.data_manager:
+            # The catalogue was reloaded since the list was filled
+            self.fill_list()
+            self.status_var.set("The catalogue was reloaded; pick the universities again.")
+            return
+        picked = [self.choices[int(position)] for position in self.listbox.curselection()]
+        if len(picked) < 2:
+            self.status_var.set("Pick at least two universities to compare.")
+            return
+        
+        self.status_var.set(f"Comparing {len(picked)} universities...")
+        self.future = self.app.run_on_worker("compare", self.run_comparison, self.manager, picked,
+                                             manager=self.manager)
+        self.window.after(self.POLL_MS, self._poll)
+        
+    @timed()
+    def run_comparison(self, manager, universities):
+        """Compare universities and rank those most like the first; runs on a worker."""
+        index = manager.comparison_index()
+        return (index.compare(universities),
+                index.most_similar(universities[0], self.SIMILAR))
+        
+    def _poll(self):
+        if not self.window.winfo_exists():
+            return
+        if not self.future.done():
+            self.window.after(self.POLL_MS, self._poll)
+            return
+        future, self.future = self.future, None
+        try:
+            comparison, similar = future.result()
+        except Exception as e:
+            self.status_var.set(f"Could not compare the universities: {e}")
+            return
+        self.status_var.set(f"Compared {len(comparison.universities)} universities")
+        self.text.config(state=tk.NORMAL)
+        self.text.delete('1.0', tk.END)
+        self.text.insert(tk.END, '\n'.join(views.comparison_lines(comparison, similar)))
+        self.text.config(state=tk.DISABLED)
 
 class UniversityGUI:
     """Main GUI application for Kosovo Universities Information System."""
     
-    def __init__(self, root):
+    SEARCH_LIMIT = 200  # best-scoring matches shown for a search
+    VIEW_CACHE_ENTRIES = 64
+    VIEW_CACHE_BYTES = 8 * 1024 * 1024
+    WATCH_INTERVAL_MS = 2000  # how often the data source is checked for changes
+    FACET_ALL = {'city': "All Cities", 'field': "All Fields", 'department': "All Departments"}
+    RELOAD_POLL_MS = 100
+    
+    def __init__(self, root, data_source=None, backend='memory', watch=True):
         self.root = root
+        self.data_source = data_source
+        self.backend = backend
         self.root.title("Kosovo Universities Information System v2.0")
         self.root.geometry("1200x800")
         self.root.configure(bg='#f8f9fa')
         
-        # Initialize data
-        self.universities = UniversityDataManager.initialize_data()
+        # Initialize data, falling back to the built-in catalogue
+        try:
+            self.data_manager = DATA_BACKENDS[backend].from_source(data_source)
+        except (OSError, ValueError, KeyError, TypeError, sqlite3.Error) as e:
+            messagebox.showwarning("Data Source",
+                                   f"Could not load {data_source}: {e}\n"
+                                   "Using the built-in university data instead.")
+            self.data_manager = UniversityDataManager()
+        self.universities = self.data_manager.universities
         self.filtered_universities = []
+        self.search_matches = None  # university -> matches of the active search, best first
+        self.facet_choices = {facet: {} for facet in self.FACET_ALL}
+        self.search_stats = {'count': 0, 'total': 0.0}
+        self.view_cache = views.ViewCache(self.VIEW_CACHE_ENTRIES, self.VIEW_CACHE_BYTES)
+        self.analytics = None  # (data manager, its version, analytics report)
         self.selected_university = None
         self.selected_faculty = None
+        # Worker jobs per data manager: a replaced manager is closed once its last
+        # job is done (see run_on_worker and retire_manager)
+        self.manager_jobs = {}
+        self.retired_managers = set()
+        self.manager_lock = threading.Lock()
         
         # Create custom fonts
         self.title_font = tkFont.Font(family="Arial", size=20, weight="bold")
@@ -295,6 +1234,20 @@ class UniversityGUI:
         self.create_widgets()
         self.create_menu()
         
+        # Searches run off the Tk thread, debounced per keystroke
+        self.search_worker = BackgroundSearch(self.root, self.ranked_search,
+                                              self.on_search_results)
+        self.suggestions.load(self.run_on_worker("suggestions", SearchSuggestions.prepare,
+                                                 self.data_manager))
+        
+        # Reloads parse and index the data source off the Tk thread too; with
+        # watching on, a changed file is reloaded without asking
+        self.reload_future = None
+        self.reload_notify = False
+        self.watcher = SourceWatcher(data_source) if data_source and watch else None
+        if self.watcher is not None:
+            self.root.after(self.WATCH_INTERVAL_MS, self.watch_data_source)
+        
         # Load initial data
         self.load_initial_data()
         
@@ -306,6 +1259,7 @@ class UniversityGUI:
         # File menu
         file_menu = tk.Menu(menubar, tearoff=0)
         menubar.add_cascade(label="File", menu=file_menu)
+        file_menu.add_command(label="Reload Data", command=self.reload_data, accelerator="F5")
         file_menu.add_command(label="Export Data", command=self.export_data)
         file_menu.add_separator()
         file_menu.add_command(label="Exit", command=self.root.quit)
@@ -314,8 +1268,13 @@ class UniversityGUI:
         view_menu = tk.Menu(menubar, tearoff=0)
         menubar.add_cascade(label="View", menu=view_menu)
         view_menu.add_command(label="Statistics", command=self.show_statistics)
+        view_menu.add_command(label="Where to Study...", command=self.show_where_to_study)
+        view_menu.add_command(label="Compare Universities...", command=self.show_compare)
+        view_menu.add_command(label="Performance", command=self.show_performance)
         view_menu.add_command(label="About", command=self.show_about)
         
+        self.root.bind('<F5>', lambda event: self.reload_data())
+        
     def create_widgets(self):
         """Create and arrange GUI widgets."""
         
@@ -363,41 +1322,56 @@ class UniversityGUI:
         search_entry = tk.Entry(search_frame, textvariable=self.search_var, 
                                font=self.normal_font, width=30)
         search_entry.pack(fill=tk.X, pady=5)
+        self.suggestions = SearchSuggestions(search_entry, self.normal_font,
+                                             self.on_suggestion_picked)
         
-        # City selection frame
-        city_frame = tk.LabelFrame(parent, text="Select City", font=self.normal_font,
-                                  bg='white', fg='#34495e', padx=10, pady=10)
-        city_frame.pack(fill=tk.X, padx=15, pady=10)
+        self.search_status_var = tk.StringVar()
+        search_status = tk.Label(search_frame, textvariable=self.search_status_var,
+                                 font=self.normal_font, bg='white', fg='#7f8c8d', anchor='w')
+        search_status.pack(fill=tk.X)
+        
+        # Facet filters: combinable with each other and with the search
+        filter_frame = tk.LabelFrame(parent, text="Filters", font=self.normal_font,
+                                     bg='white', fg='#34495e', padx=10, pady=10)
+        filter_frame.pack(fill=tk.X, padx=15, pady=10)
         
         self.city_var = tk.StringVar()
-        self.city_combo = ttk.Combobox(city_frame, textvariable=self.city_var, 
+        self.city_combo = ttk.Combobox(filter_frame, textvariable=self.city_var, 
                                       values=["All Cities"] + list(QYTETET.values()), 
                                       state="readonly", font=self.normal_font, width=28)
-        self.city_combo.pack(fill=tk.X, pady=5)
-        self.city_combo.bind('<<ComboboxSelected>>', self.on_city_selected)
-        self.city_combo.set("All Cities")
-        
-        # University selection frame
-        uni_frame = tk.LabelFrame(parent, text="Select University", font=self.normal_font,
-                                 bg='white', fg='#34495e', padx=10, pady=10)
-        uni_frame.pack(fill=tk.X, padx=15, pady=10)
-        
-        self.uni_var = tk.StringVar()
-        self.uni_combo = ttk.Combobox(uni_frame, textvariable=self.uni_var, 
-                                     state="readonly", font=self.normal_font, width=28)
-        self.uni_combo.pack(fill=tk.X, pady=5)
-        self.uni_combo.bind('<<ComboboxSelected>>', self.on_university_selected)
-        
-        # Faculty selection frame
-        faculty_frame = tk.LabelFrame(parent, text="Select Faculty", font=self.normal_font,
+        self.field_var = tk.StringVar()
+        self.field_combo = ttk.Combobox(filter_frame, textvariable=self.field_var,
+                                        state="readonly", font=self.normal_font, width=28)
+        self.department_var = tk.StringVar()
+        self.department_combo = ttk.Combobox(filter_frame, textvariable=self.department_var,
+                                             state="readonly", font=self.normal_font, width=28)
+        self.facet_vars = {'city': self.city_var, 'field': self.field_var,
+                           'department': self.department_var}
+        self.facet_combos = {'city': self.city_combo, 'field': self.field_combo,
+                             'department': self.department_combo}
+        for facet, combo in self.facet_combos.items():
+            combo.pack(fill=tk.X, pady=2)
+            combo.bind('<<ComboboxSelected>>', self.on_facet_selected)
+            combo.set(self.FACET_ALL[facet])
+            
+        subject_row = tk.Frame(filter_frame, bg='white')
+        subject_row.pack(fill=tk.X, pady=2)
+        tk.Label(subject_row, text="Subject:", font=self.normal_font, bg='white').pack(side=tk.LEFT)
+        self.subject_var = tk.StringVar()
+        self.subject_var.trace('w', self.on_facet_selected)
+        tk.Entry(subject_row, textvariable=self.subject_var, font=self.normal_font).pack(
+            side=tk.LEFT, fill=tk.X, expand=True, padx=(5, 0))
+        
+        self.facet_status_var = tk.StringVar()
+        tk.Label(filter_frame, textvariable=self.facet_status_var, font=self.normal_font,
+                 bg='white', fg='#7f8c8d', anchor='w').pack(fill=tk.X)
+        
+        # Catalogue browser: the filtered universities by city, drilled into on demand
+        browse_frame = tk.LabelFrame(parent, text="Browse", font=self.normal_font,
                                      bg='white', fg='#34495e', padx=10, pady=10)
-        faculty_frame.pack(fill=tk.X, padx=15, pady=10)
-        
-        self.faculty_var = tk.StringVar()
-        self.faculty_combo = ttk.Combobox(faculty_frame, textvariable=self.faculty_var, 
-                                         state="readonly", font=self.normal_font, width=28)
-        self.faculty_combo.pack(fill=tk.X, pady=5)
-        self.faculty_combo.bind('<<ComboboxSelected>>', self.on_faculty_selected)
+        browse_frame.pack(fill=tk.BOTH, expand=True, padx=15, pady=10)
+        self.browser = CatalogueBrowser(browse_frame, self.normal_font, self.on_browser_selected)
+        self.browser.pack(fill=tk.BOTH, expand=True)
         
         # Buttons frame
         buttons_frame = tk.Frame(parent, bg='white')
@@ -416,6 +1390,26 @@ class UniversityGUI:
                              relief=tk.FLAT, padx=20, pady=8, cursor='hand2')
         stats_btn.pack(fill=tk.X, pady=5)
         
+        # Reverse lookup: where a subject or department is taught
+        where_btn = tk.Button(buttons_frame, text="Where to Study...",
+                              command=self.show_where_to_study,
+                              bg='#8e44ad', fg='white', font=self.normal_font,
+                              relief=tk.FLAT, padx=20, pady=8, cursor='hand2')
+        where_btn.pack(fill=tk.X, pady=5)
+        
+        # Side-by-side comparison of several universities
+        compare_btn = tk.Button(buttons_frame, text="Compare Universities...",
+                                command=self.show_compare,
+                                bg='#16a085', fg='white', font=self.normal_font,
+                                relief=tk.FLAT, padx=20, pady=8, cursor='hand2')
+        compare_btn.pack(fill=tk.X, pady=5)
+        
+        # Data source status (size of the catalogue, reloads)
+        self.data_status_var = tk.StringVar(value=f"{len(self.universities)} universities loaded")
+        data_status = tk.Label(parent, textvariable=self.data_status_var,
+                               font=self.normal_font, bg='white', fg='#7f8c8d', anchor='w')
+        data_status.pack(side=tk.BOTTOM, fill=tk.X, padx=15, pady=10)
+        
     def create_right_panel(self, parent):
         """Create the right results panel."""
         
@@ -437,348 +1431,537 @@ class UniversityGUI:
         self.notebook.add(self.details_frame, text="Detailed View")
         
         # Create text areas
-        self.results_text = scrolledtext.ScrolledText(self.info_frame, wrap=tk.WORD, 
-                                                     font=self.normal_font, height=25, width=60)
-        self.results_text.pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
+        self.results_view = ResultsView(self.info_frame, self.normal_font, height=25, width=60)
+        self.results_view.pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
+        
+        self.details_view = ResultsView(self.details_frame, self.normal_font, height=25, width=60)
+        self.details_view.pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
         
-        self.details_text = scrolledtext.ScrolledText(self.details_frame, wrap=tk.WORD, 
-                                                     font=self.normal_font, height=25, width=60)
-        self.details_text.pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
+        # Tabs are rendered when they become visible; hidden ones keep a
+        # pending builder (see show_in_tab)
+        self.tab_views = {str(self.info_frame): self.results_view,
+                          str(self.details_frame): self.details_view}
+        self.pending_views = {}
+        self.notebook.bind('<<NotebookTabChanged>>', self.on_tab_changed)
         
     def load_initial_data(self):
         """Load initial data and display welcome message."""
         self.update_university_list()
         self.display_welcome_message()
         
+    @timed()
     def display_welcome_message(self):
         """Display welcome message in the results area."""
-        welcome_text = """Welcome to Kosovo Universities Information System v2.0!
-
-🎓 FEATURES:
-• Explore universities across Kosovo
-• Browse faculties and departments
-• Search for specific programs
-• View detailed statistics
-• Export data functionality
-
-🏛️ AVAILABLE CITIES:
-"""
-        for city in QYTETET.values():
-            welcome_text += f"• {city}\n"
-            
-        welcome_text += f"""
-📊 QUICK STATS:
-• Total Universities: {len(self.universities)}
-• Total Cities: {len(QYTETET)}
-• Total Faculties: {sum(len(uni.faculties) for uni in self.universities)}
-
-🔍 HOW TO USE:
-1. Select a city or search for specific terms
-2. Choose a university from the filtered list
-3. Browse faculties and departments
-4. Use the tabs to switch between views
-
-Start exploring by selecting a city or using the search function!
-"""
+        self.show_in_tab(self.results_view,
+                         lambda: views.welcome_lines(self.data_manager.statistics()))
         
-        self.results_text.delete(1.0, tk.END)
-        self.results_text.insert(tk.END, welcome_text)
+    @timed()
+    def ranked_search(self, search_term, cancel_event=None):
+        """Best matches for a search term, tolerating typos and missing diacritics."""
+        return self.data_manager.ranked_search(search_term, self.SEARCH_LIMIT, cancel_event)
         
+    @timed()
     def on_search_changed(self, *args):
         """Handle search text changes."""
-        search_term = self.search_var.get().lower()
-        if len(search_term) >= 2:
-            self.filter_universities_by_search(search_term)
-        elif len(search_term) == 0:
-            self.update_university_list()
+        search_term = self.search_var.get().strip()
+        self.suggestions.update(search_term)
+        if search_term:
+            self.search_worker.schedule(search_term)
+        else:
+            self.search_worker.cancel()
+            self.search_matches = None
+            self.on_facet_selected()
+                
+    @timed()
+    def on_search_results(self, search_term, matches, elapsed):
+        """Receive a finished background search on the Tk thread."""
+        self.search_stats['count'] += 1
+        self.search_stats['total'] += elapsed
+        average = self.search_stats['total'] / self.search_stats['count']
+        self.search_status_var.set(f"{len(matches)} matches in {elapsed*1000:.1f} ms "
+                                   f"(avg {average*1000:.1f} ms)")
+        self.apply_search_results(search_term, matches)
             
     def filter_universities_by_search(self, search_term):
         """Filter universities based on search term."""
-        filtered = []
-        for uni in self.universities:
-            # Search in university name
-            if search_term in uni.name.lower():
-                filtered.append(uni)
-                continue
-                
-            # Search in faculty names
-            for faculty in uni.faculties:
-                if search_term in faculty.name.lower():
-                    filtered.append(uni)
-                    break
-                    
-                # Search in department names
-                for dept in faculty.departments:
-                    if search_term in dept.name.lower():
-                        filtered.append(uni)
-                        break
-                if uni in filtered:
-                    break
-                    
-        self.filtered_universities = filtered
-        self.update_university_combo()
-        self.display_search_results(search_term)
-        
-    def display_search_results(self, search_term):
-        """Display search results."""
-        self.results_text.delete(1.0, tk.END)
-        self.results_text.insert(tk.END, f"Search Results for: '{search_term}'\n")
-        self.results_text.insert(tk.END, "=" * 50 + "\n\n")
-        
-        if self.filtered_universities:
-            for i, uni in enumerate(self.filtered_universities, 1):
-                self.results_text.insert(tk.END, f"{i}. {uni.name}\n")
-                self.results_text.insert(tk.END, f"   📍 Location: {uni.city}\n")
-                self.results_text.insert(tk.END, f"   🏛️ Faculties: {len(uni.faculties)}\n\n")
-        else:
-            self.results_text.insert(tk.END, "No results found. Try different search terms.\n")
-            
-    def on_city_selected(self, event=None):
-        """Handle city selection."""
-        selected_city = self.city_var.get()
+        self.apply_search_results(search_term, self.ranked_search(search_term))
         
-        if selected_city == "All Cities":
-            self.filtered_universities = self.universities.copy()
-        else:
-            self.filtered_universities = [uni for uni in self.universities 
-                                        if uni.city == selected_city]
-        
-        self.update_university_combo()
-        self.display_city_results(selected_city)
-        
-    def display_city_results(self, city):
-        """Display universities in selected city."""
-        self.results_text.delete(1.0, tk.END)
+    def apply_search_results(self, search_term, matches):
+        """Keep a list of SearchMatch objects as the search results and apply the filters."""
+        matches_by_uni = {}
+        for match in matches:
+            matches_by_uni.setdefault(match.university, []).append(match)
+            
+        self.search_matches = matches_by_uni
+        self.on_facet_selected()
         
-        if city == "All Cities":
-            self.results_text.insert(tk.END, "All Universities in Kosovo\n")
-            self.results_text.insert(tk.END, "=" * 30 + "\n\n")
+    @timed()
+    def display_search_results(self, search_term, filters=None):
+        """Display search results."""
+        universities, matches = self.filtered_universities, self.search_matches
+        self.show_in_tab(self.results_view, lambda: views.search_result_lines(
+            search_term, universities, matches, filters))
             
-            for i, uni in enumerate(self.universities, 1):
-                self.results_text.insert(tk.END, f"{i}. {uni.name}\n")
-                self.results_text.insert(tk.END, f"   📍 {uni.city}\n")
-                self.results_text.insert(tk.END, f"   🏛️ {len(uni.faculties)} faculties\n\n")
+    def facet_value(self, facet):
+        """The value chosen in a facet's combobox, or None for all values."""
+        label = self.facet_vars[facet].get()
+        if not label or label == self.FACET_ALL[facet]:
+            return None
+        # Labels carry counts ("Prishtina (3)"); a bare value is accepted too
+        return self.facet_choices[facet].get(label, label)
+        
+    def facet_filters(self):
+        """The current facet selection, as FacetIndex.select expects it."""
+        filters = {facet: self.facet_value(facet) for facet in self.FACET_ALL}
+        filters['subject'] = self.subject_var.get().strip() or None
+        return filters
+        
+    @timed()
+    def on_facet_selected(self, *args):
+        """Apply the facet filters, to the search results if a search is active.
+        
+        Everything comes from the FacetIndex bitsets: the filtered list is an
+        intersection and every count in the comboboxes one more, so nothing
+        here walks the catalogue.
+        """
+        index = self.data_manager.facet_index()
+        filters = self.facet_filters()
+        within = None
+        if self.search_matches is not None:
+            within = index.bits_of(self.search_matches)
+        bits = index.select(filters, within)
+        self.update_facet_choices(index, filters, within, bits)
+        
+        if self.search_matches is not None:
+            # Keep the search ranking
+            self.filtered_universities = [uni for uni in self.search_matches
+                                          if index.contains(bits, uni)]
+            self.update_browser()
+            self.display_search_results(self.search_var.get().strip(), filters)
+        else:
+            self.filtered_universities = index.universities_of(bits)
+            self.update_browser()
+            self.display_filter_results(filters)
+        
+    @timed()
+    def display_filter_results(self, filters):
+        """Display the universities passing the facet filters."""
+        universities = self.filtered_universities
+        active = {facet: value for facet, value in filters.items() if value}
+        if set(active) <= {'city'}:
+            city = active.get('city', "All Cities")
+            self.show_in_tab(self.results_view,
+                             lambda: views.city_result_lines(city, universities))
         else:
-            self.results_text.insert(tk.END, f"Universities in {city}\n")
-            self.results_text.insert(tk.END, "=" * 30 + "\n\n")
+            self.show_in_tab(self.results_view,
+                             lambda: views.filter_result_lines(active, universities))
             
-            if self.filtered_universities:
-                for i, uni in enumerate(self.filtered_universities, 1):
-                    self.results_text.insert(tk.END, f"{i}. {uni.name}\n")
-                    self.results_text.insert(tk.END, f"   🏛️ {len(uni.faculties)} faculties\n\n")
+    def update_facet_choices(self, index=None, filters=None, within=None, bits=None):
+        """Relabel the facet comboboxes with how many universities each value would leave."""
+        if index is None:
+            index = self.data_manager.facet_index()
+        if filters is None:
+            filters = self.facet_filters()
+        counts = index.counts(filters, within)
+        city_order = {city: i for i, city in enumerate(QYTETET.values())}
+        for facet, all_label in self.FACET_ALL.items():
+            selected, facet_counts = filters[facet], counts[facet]
+            values = [value for value, count in facet_counts.items() if count]
+            if selected is not None and selected not in values:
+                values.append(selected)
+            if facet == 'city':
+                values.sort(key=lambda city: (city_order.get(city, len(city_order)), city))
             else:
-                self.results_text.insert(tk.END, f"No universities found in {city}.\n")
+                values.sort()
+            choices = {f"{value} ({facet_counts.get(value, 0)})": value for value in values}
+            self.facet_choices[facet] = choices
+            self.facet_combos[facet]['values'] = [all_label] + list(choices)
+            self.facet_vars[facet].set(next(
+                (label for label, value in choices.items() if value == selected), all_label))
+            
+        if bits is None:
+            bits = index.select(filters, within)
+        self.facet_status_var.set(f"{bits.bit_count()} of {len(index)} universities match")
                 
     def update_university_list(self):
-        """Update the list of universities to display."""
+        """List every university and count the facets over the whole catalogue."""
         self.filtered_universities = self.universities.copy()
-        self.update_university_combo()
+        self.update_browser()
+        self.update_facet_choices()
         
-    def update_university_combo(self):
-        """Update university combobox values."""
-        uni_names = [uni.name for uni in self.filtered_universities]
-        self.uni_combo['values'] = uni_names
-        self.uni_combo.set('')
-        
-        # Clear faculty combo
-        self.faculty_combo['values'] = []
-        self.faculty_combo.set('')
+    @staticmethod
+    def choice_labels(items, qualify=None):
+        """Map unique list labels to items.
+        
+        Items sharing a name are told apart by qualify(item) when given, and by a
+        running number otherwise.
+        """
+        name_counts = Counter(item.name for item in items)
+        labels = {}
+        for item in items:
+            label = item.name
+            if name_counts[label] > 1 and qualify is not None:
+                label = f"{item.name} ({qualify(item)})"
+            base, number = label, 2
+            while label in labels:
+                label = f"{base} #{number}"
+                number += 1
+            labels[label] = item
+        return labels
+        
+    def update_browser(self):
+        """Show the filtered universities in the catalogue browser."""
+        self.browser.show(self.filtered_universities)
+        
+    @timed()
+    def on_browser_selected(self, kind, path):
+        """Show the node picked in the catalogue browser.
+        
+        A city lists its universities; a university shows its information, and
+        a faculty (or one of its departments or subjects) the faculty details.
+        """
+        if kind == 'city':
+            city = path[0]
+            universities = self.browser.groups.get(city, [])
+            self.show_in_tab(self.results_view,
+                             lambda: views.city_result_lines(city, universities))
+        elif kind == 'university':
+            self.select_university(path[1])
+        else:
+            self.select_faculty(path[1], path[2])
+            
+    def select_university(self, uni):
+        """Make uni the selected university and show it."""
+        self.selected_university = uni
+        self.selected_faculty = None
+        self.display_university_info()
         
-    def on_university_selected(self, event=None):
-        """Handle university selection."""
-        selected_uni_name = self.uni_var.get()
-        if not selected_uni_name:
-            return
+    def select_faculty(self, uni, faculty):
+        """Make faculty of uni the selection and show it, with uni in the Detailed View."""
+        self.selected_university = uni
+        self.selected_faculty = faculty
+        self.display_faculty_details()
+        self.show_in_tab(self.details_view,
+                         lambda: self.cached_view(views.university_details_lines, uni))
+        
+    def show_in_tab(self, view, build):
+        """Show build() in a notebook tab's view now if the tab is visible.
+        
+        Hidden tabs only remember the builder; it runs when the tab is opened,
+        so e.g. the Detailed View costs nothing until someone looks at it.
+        """
+        if self.tab_views.get(self.notebook.select()) is view:
+            self.pending_views.pop(view, None)
+            view.show(build())
+        else:
+            self.pending_views[view] = build
             
-        # Find selected university
-        self.selected_university = None
-        for uni in self.filtered_universities:
-            if uni.name == selected_uni_name:
-                self.selected_university = uni
-                break
-                
-        if not self.selected_university:
-            return
+    @timed()
+    def on_tab_changed(self, event=None):
+        """Render the newly selected tab if its content is out of date."""
+        view = self.tab_views.get(self.notebook.select())
+        build = self.pending_views.pop(view, None)
+        if build is not None:
+            view.show(build())
             
-        # Update faculty combobox
-        faculty_names = [faculty.name for faculty in self.selected_university.faculties]
-        self.faculty_combo['values'] = faculty_names
-        self.faculty_combo.set('')
-        
-        # Display university info
-        self.display_university_info()
+    def cached_view(self, build, *entities):
+        """Lines of build(*entities), reused until the catalogue changes."""
+        return self.view_cache.lines(build, entities, getattr(self.data_manager, 'version', 0),
+                                     lambda: build(*entities))
         
+    @timed()
     def display_university_info(self):
         """Display detailed university information."""
         if not self.selected_university:
             return
             
         uni = self.selected_university
-        
-        # Main info tab
-        self.results_text.delete(1.0, tk.END)
-        self.results_text.insert(tk.END, f"{uni.name}\n")
-        self.results_text.insert(tk.END, "=" * len(uni.name) + "\n\n")
-        self.results_text.insert(tk.END, f"📍 Location: {uni.city}\n")
-        self.results_text.insert(tk.END, f"🏛️ Number of Faculties: {len(uni.faculties)}\n\n")
-        
-        self.results_text.insert(tk.END, "FACULTIES:\n")
-        self.results_text.insert(tk.END, "-" * 20 + "\n")
-        
-        for i, faculty in enumerate(uni.faculties, 1):
-            self.results_text.insert(tk.END, f"{i}. {faculty.name}\n")
-            self.results_text.insert(tk.END, f"   📚 {len(faculty.departments)} departments\n\n")
-            
-        # Details tab
-        self.details_text.delete(1.0, tk.END)
-        self.details_text.insert(tk.END, f"DETAILED VIEW: {uni.name}\n")
-        self.details_text.insert(tk.END, "=" * 50 + "\n\n")
-        
-        for faculty in uni.faculties:
-            self.details_text.insert(tk.END, f"🏛️ {faculty.name}\n")
-            self.details_text.insert(tk.END, "-" * len(faculty.name) + "\n")
-            
-            for dept in faculty.departments:
-                self.details_text.insert(tk.END, f"  📚 {dept.name}\n")
-                self.details_text.insert(tk.END, f"     Subjects: {', '.join(dept.subjects[:3])}")
-                if len(dept.subjects) > 3:
-                    self.details_text.insert(tk.END, f" (+{len(dept.subjects)-3} more)")
-                self.details_text.insert(tk.END, "\n\n")
-            self.details_text.insert(tk.END, "\n")
+        self.show_in_tab(self.results_view,
+                         lambda: self.cached_view(views.university_info_lines, uni))
+        self.show_in_tab(self.details_view,
+                         lambda: self.cached_view(views.university_details_lines, uni))
             
-    def on_faculty_selected(self, event=None):
-        """Handle faculty selection."""
-        selected_faculty_name = self.faculty_var.get()
-        
-        if not selected_faculty_name or not self.selected_university:
-            return
-            
-        # Find selected faculty
-        self.selected_faculty = None
-        for faculty in self.selected_university.faculties:
-            if faculty.name == selected_faculty_name:
-                self.selected_faculty = faculty
-                break
-                
-        if not self.selected_faculty:
-            return
-            
-        # Display faculty details
-        self.display_faculty_details()
-        
+    @timed()
     def display_faculty_details(self):
         """Display detailed faculty information."""
         if not self.selected_faculty:
             return
             
-        faculty = self.selected_faculty
-        
-        # Main info tab
-        self.results_text.delete(1.0, tk.END)
-        self.results_text.insert(tk.END, f"{faculty.name}\n")
-        self.results_text.insert(tk.END, "=" * len(faculty.name) + "\n")
-        self.results_text.insert(tk.END, f"🏛️ University: {self.selected_university.name}\n")
-        self.results_text.insert(tk.END, f"📚 Number of Departments: {len(faculty.departments)}\n\n")
-        
-        self.results_text.insert(tk.END, "DEPARTMENTS & SUBJECTS:\n")
-        self.results_text.insert(tk.END, "-" * 30 + "\n\n")
-        
-        for i, dept in enumerate(faculty.departments, 1):
-            self.results_text.insert(tk.END, f"{i}. {dept.name}\n")
-            self.results_text.insert(tk.END, "   📖 Subjects:\n")
-            for subject in dept.subjects:
-                self.results_text.insert(tk.END, f"   • {subject}\n")
-            self.results_text.insert(tk.END, "\n")
+        uni, faculty = self.selected_university, self.selected_faculty
+        self.show_in_tab(self.results_view,
+                         lambda: self.cached_view(views.faculty_details_lines, uni, faculty))
             
     def clear_all(self):
         """Clear all selections and reset the interface."""
-        self.city_var.set("All Cities")
-        self.uni_var.set('')
-        self.faculty_var.set('')
+        for facet, all_label in self.FACET_ALL.items():
+            self.facet_vars[facet].set(all_label)
+        if self.subject_var.get():
+            self.subject_var.set('')
+        self.browser.clear_filter()
         self.search_var.set('')
-        
-        self.uni_combo['values'] = []
-        self.faculty_combo['values'] = []
+        self.search_worker.cancel()
+        self.search_status_var.set('')
+        self.search_matches = None
         
         self.selected_university = None
         self.selected_faculty = None
-        self.filtered_universities = self.universities.copy()
         
-        self.update_university_combo()
+        self.update_university_list()
         self.display_welcome_message()
         
         # Clear details tab
-        self.details_text.delete(1.0, tk.END)
-        
-    def show_statistics(self):
-        """Display system statistics."""
-        stats_window = tk.Toplevel(self.root)
-        stats_window.title("System Statistics")
-        stats_window.geometry("500x400")
-        stats_window.configure(bg='white')
-        
-        # Title
-        title_label = tk.Label(stats_window, text="Kosovo Universities Statistics", 
-                              font=self.heading_font, bg='white', fg='#2c3e50')
-        title_label.pack(pady=20)
-        
-        # Stats text
-        stats_text = scrolledtext.ScrolledText(stats_window, wrap=tk.WORD, 
-                                              font=self.normal_font, height=20, width=60)
-        stats_text.pack(fill=tk.BOTH, expand=True, padx=20, pady=20)
-        
-        # Calculate statistics
-        total_unis = len(self.universities)
-        total_faculties = sum(len(uni.faculties) for uni in self.universities)
-        total_departments = sum(len(faculty.departments) 
-                               for uni in self.universities 
-                               for faculty in uni.faculties)
-        total_subjects = sum(len(dept.subjects) 
-                            for uni in self.universities 
-                            for faculty in uni.faculties 
-                            for dept in faculty.departments)
-        
-        # City statistics
-        city_stats = {}
-        for uni in self.universities:
-            city = uni.city
-            if city not in city_stats:
-                city_stats[city] = {'unis': 0, 'faculties': 0}
-            city_stats[city]['unis'] += 1
-            city_stats[city]['faculties'] += len(uni.faculties)
-        
-        stats_content = f"""KOSOVO UNIVERSITIES SYSTEM STATISTICS
-{'='*50}
-
-📊 OVERALL STATISTICS:
-• Total Universities: {total_unis}
-• Total Faculties: {total_faculties}
-• Total Departments: {total_departments}
-• Total Subjects: {total_subjects}
-• Cities with Universities: {len(city_stats)}
-
-🏛️ UNIVERSITIES BY CITY:
-{'-'*30}
-"""
-        
-        for city, stats in city_stats.items():
-            stats_content += f"📍 {city}:\n"
-            stats_content += f"   • Universities: {stats['unis']}\n"
-            stats_content += f"   • Faculties: {stats['faculties']}\n\n"
+        self.pending_views.pop(self.details_view, None)
+        self.details_view.clear()
+        
+    def load_catalogue(self):
+        """Parse and index the data source into a new manager; runs on the reload worker."""
+        manager = self.data_manager
+        if getattr(manager, 'data_source', None) == self.data_source and hasattr(manager, 'reopen'):
+            manager = manager.reopen()
+        else:
+            # Startup fell back to the built-in data: try the data source again
+            manager = DATA_BACKENDS[self.backend].from_source(self.data_source)
+        # Backends that build their facet, offering, comparison and suggestion
+        # indexes on first use do it here, off the Tk thread
+        manager.facet_index()
+        manager.offering_index()
+        manager.comparison_index()
+        manager.suggestion_index().prepare()
+        return manager
+        
+    def reload_data(self, notify=True):
+        """Reload the data source in the background and swap it in once indexed.
+        
+        With notify, a failed reload is reported in a dialog; otherwise (as for
+        reloads started by the file watcher) only in the status line.
+        """
+        if self.reload_future is not None:
+            return
+        if self.watcher is not None:
+            self.watcher.mark_seen()
+        self.reload_notify = notify
+        self.data_status_var.set("Reloading data...")
+        executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="reload")
+        self.reload_future = executor.submit(self.load_catalogue)
+        executor.shutdown(wait=False)
+        self.root.after(self.RELOAD_POLL_MS, self._poll_reload)
+        
+    def _poll_reload(self):
+        future = self.reload_future
+        if not future.done():
+            self.root.after(self.RELOAD_POLL_MS, self._poll_reload)
+            return
             
-        stats_content += f"""
-🎓 LARGEST UNIVERSITIES:
-{'-'*25}
-"""
-        
-        # Sort universities by number of faculties
-        sorted_unis = sorted(self.universities, key=lambda x: len(x.faculties), reverse=True)
-        for i, uni in enumerate(sorted_unis[:5], 1):
-            stats_content += f"{i}. {uni.name}\n"
-            stats_content += f"   📚 {len(uni.faculties)} faculties\n\n"
+        self.reload_future = None
+        try:
+            manager = future.result()
+        except (OSError, ValueError, KeyError, TypeError, sqlite3.Error) as e:
+            self.data_status_var.set("Reload failed; keeping the current data")
+            if self.reload_notify:
+                messagebox.showerror("Reload Data", f"Could not reload {self.data_source}: {e}")
+            return
+        self.swap_data_manager(manager)
+        
+    def watch_data_source(self):
+        """Reload the data source once it has changed on disk."""
+        if self.reload_future is None and self.watcher.poll():
+            self.reload_data(notify=False)
+        self.root.after(self.WATCH_INTERVAL_MS, self.watch_data_source)
+        
+    @timed()
+    def swap_data_manager(self, manager):
+        """Switch to a freshly loaded catalogue, keeping the selection where it still exists.
+        
+        Everything derived from the old catalogue (search, rendered views, the
+        university lists) is rebuilt from the new one in the same Tk callback,
+        so no handler ever sees a mix of the two.
+        """
+        uni, faculty = self.selected_university, self.selected_faculty
+        selected = (uni.name, uni.city) if uni is not None else None
+        faculty_name = faculty.name if faculty is not None else None
+        
+        old_manager = self.data_manager
+        running = self.search_worker.running()
+        if running is not None:
+            self.hold_manager(old_manager, running)
+        self.search_worker.cancel()
+        self.data_manager = manager
+        self.universities = manager.universities
+        self.view_cache.clear()
+        self.pending_views.clear()
+        self.suggestions.load(self.run_on_worker("suggestions", SearchSuggestions.prepare,
+                                                 manager))
+        self.retire_manager(old_manager)
             
-        stats_text.insert(tk.END, stats_content)
-        stats_text.config(state=tk.DISABLED)
+        self.restore_view(selected, faculty_name)
+        self.data_status_var.set(f"{len(self.universities)} universities, "
+                                 f"reloaded at {time.strftime('%H:%M:%S')}")
+        
+    def run_on_worker(self, name, func, *args, manager=None):
+        """Run func(*args) on a worker thread of its own and return its Future.
+        
+        manager is the catalogue the job reads (the current one unless given);
+        a reload does not close it before the job is done.
+        """
+        executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix=name)
+        future = executor.submit(func, *args)
+        executor.shutdown(wait=False)
+        self.hold_manager(manager if manager is not None else self.data_manager, future)
+        return future
+        
+    def hold_manager(self, manager, future):
+        """Keep manager open until future is done."""
+        with self.manager_lock:
+            self.manager_jobs.setdefault(manager, set()).add(future)
+        future.add_done_callback(lambda done: self._release_manager(manager, done))
+        
+    def _release_manager(self, manager, future):
+        # Runs on the worker thread that finished the job (or here, if it was done)
+        with self.manager_lock:
+            jobs = self.manager_jobs.get(manager)
+            if jobs is None:
+                return
+            jobs.discard(future)
+            if jobs:
+                return
+            del self.manager_jobs[manager]
+            if manager not in self.retired_managers:
+                return
+            self.retired_managers.discard(manager)
+        manager.close()
+        
+    def retire_manager(self, manager):
+        """Close a replaced data manager now, or once the last job holding it is done."""
+        if not hasattr(manager, 'close'):
+            return
+        with self.manager_lock:
+            if self.manager_jobs.get(manager):
+                self.retired_managers.add(manager)
+                return
+        manager.close()
+        
+    def restore_view(self, selected, faculty_name):
+        """Re-apply the search or city filter and re-select a university and faculty.
+        
+        selected is the (name, city) of the university to select again; it and
+        faculty_name are dropped if the new catalogue no longer has them.
+        """
+        search_term = self.search_var.get().strip()
+        if search_term:
+            self.filter_universities_by_search(search_term)
+        elif any(self.facet_filters().values()):
+            self.on_facet_selected()
+        else:
+            self.update_university_list()
+            self.display_welcome_message()
+            
+        self.selected_university = None
+        self.selected_faculty = None
+        uni = None
+        if selected is not None:
+            uni = next((uni for uni in self.data_manager.find_universities(selected[0])
+                        if uni.city == selected[1]), None)
+        if uni is None:
+            self.details_view.clear()
+            return
+            
+        faculty = next((faculty for faculty in uni.faculties if faculty.name == faculty_name),
+                       None) if faculty_name is not None else None
+        if not self.browser.reveal(uni, faculty):
+            # Selected earlier but filtered out of the list since
+            self.selected_university = uni
+            self.show_in_tab(self.details_view,
+                             lambda: self.cached_view(views.university_details_lines, uni))
+            return
+        if faculty is None:
+            self.select_university(uni)
+        else:
+            self.select_faculty(uni, faculty)
+        
+    @timed()
+    def show_statistics(self):
+        """Open the statistics window; its analytics tab fills in from the background."""
+        StatisticsWindow(self)
+        
+    def analytics_report(self, manager=None):
+        """The analytics report of manager (the current catalogue by default), once per version.
+        
+        Called on worker threads; the flattened arrays are rebuilt only after a
+        reload or an edit.
+        """
+        if manager is None:
+            manager = self.data_manager
+        version = getattr(manager, 'version', None)
+        cached = self.analytics
+        if cached is not None and cached[0] is manager and cached[1] == version:
+            return cached[2]
+        report = CatalogueAnalytics(manager.universities).report()
+        self.analytics = (manager, version, report)
+        return report
+        
+    def show_where_to_study(self):
+        """Open the "where can I study X" window."""
+        WhereToStudyWindow(self)
+        
+    @timed()
+    def on_suggestion_picked(self, suggestion):
+        """Jump to the university, faculty, department or subject a typeahead Suggestion names.
+        
+        The search is cleared so the list shows every university passing the
+        filters again. A name several universities share is not one place: a
+        faculty then becomes the field filter and a department or subject
+        opens Where to Study on it.
+        """
+        self.search_var.set('')
+        level, name = suggestion.level, suggestion.name
+        if level == 'university':
+            universities = self.data_manager.find_universities(name)
+            if universities:
+                self.browser.reveal(universities[0])
+                self.select_university(universities[0])
+        elif level == 'faculty':
+            self.field_var.set(name)
+            self.on_facet_selected()
+            holders = self.data_manager.facet_index().universities_with('field', name)
+            if len(holders) == 1:
+                uni = holders[0]
+                faculty = next((faculty for faculty in uni.faculties if faculty.name == name),
+                               None)
+                if faculty is not None:
+                    self.browser.reveal(uni, faculty)
+                    self.select_faculty(uni, faculty)
+        else:
+            offerings = self.data_manager.offering_index().lookup(name, level)
+            if len(offerings) == 1:
+                self.show_offering(offerings[0])
+            elif offerings:
+                WhereToStudyWindow(self, name, level)
+        
+    def show_compare(self):
+        """Open the side-by-side university comparison."""
+        CompareWindow(self)
+        
+    def offering_suggestion(self, name, level):
+        """Status text for a name nothing offers, suggesting the closest catalogue names."""
+        close = []
+        for match in self.data_manager.ranked_search(name, self.SEARCH_LIMIT):
+            if match.level == level and match.name not in close:
+                close.append(match.name)
+        text = f"No {level} named '{name}'."
+        if close:
+            text += f" Did you mean: {', '.join(close[:5])}?"
+        return text
+        
+    @timed()
+    def show_offering(self, offering):
+        """Select the university and faculty of an Offering and show the faculty."""
+        faculty, _ = offering.locate()
+        self.browser.reveal(offering.university, faculty)
+        self.select_faculty(offering.university, faculty)
+        
+    def show_performance(self):
+        """Open the live performance panel."""
+        PerformanceWindow(self)
         
     def show_about(self):
         """Show about dialog."""
@@ -798,34 +1981,33 @@ Developed for educational purposes.
 """
         messagebox.showinfo("About", about_text)
         
+    @timed()
     def export_data(self):
-        """Export university data to JSON file."""
-        try:
-            data = {
-                'export_date': datetime.now().isoformat(),
-                'universities': [uni.to_dict() for uni in self.universities],
-                'statistics': {
-                    'total_universities': len(self.universities),
-                    'total_faculties': sum(len(uni.faculties) for uni in self.universities),
-                    'total_departments': sum(len(faculty.departments) 
-                                           for uni in self.universities 
-                                           for faculty in uni.faculties)
-                }
-            }
-            
-            filename = f"kosovo_universities_data_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
-            with open(filename, 'w', encoding='utf-8') as f:
-                json.dump(data, f, indent=2, ensure_ascii=False)
-                
-            messagebox.showinfo("Export Successful", 
-                               f"Data exported successfully to {filename}")
-        except Exception as e:
-            messagebox.showerror("Export Error", f"Failed to export data: {str(e)}")
+        """Open the export dialog; the export itself streams in the background."""
+        ExportWindow(self)
 
 def main():
     """Main application entry point."""
+    parser = argparse.ArgumentParser(description="Kosovo Universities Information System")
+    parser.add_argument('--data', default=default_data_source(),
+                        help="catalogue file (.json, .jsonl, .sqlite or .kuc, optionally "
+                             "compressed); defaults to $KOSOVO_UNIVERSITIES_DATA or the "
+                             "built-in data")
+    parser.add_argument('--backend', choices=sorted(DATA_BACKENDS), default='memory',
+                        help="keep the catalogue in memory, in an on-disk SQLite store "
+                             "or in a memory-mapped compiled .kuc file")
+    parser.add_argument('--no-watch', dest='watch', action='store_false',
+                        help="do not reload the data file automatically when it changes")
+    parser.add_argument('--instrument', action='store_true',
+                        help="record handler timings from the start (see View > Performance)")
+    parser.add_argument('--profile', metavar='FILE',
+                        help="profile the session with cProfile; pstats data goes to FILE "
+                             "and a cumulative-time summary to FILE.txt")
+    args = parser.parse_args()
+    instrumentation.enabled = args.instrument
+    
     root = tk.Tk()
-    app = UniversityGUI(root)
+    app = UniversityGUI(root, data_source=args.data, backend=args.backend, watch=args.watch)
     
     # Center the window
     root.update_idletasks()
@@ -833,7 +2015,12 @@ def main():
     y = (root.winfo_screenheight() // 2) - (root.winfo_height() // 2)
     root.geometry(f"+{x}+{y}")
     
-    root.mainloop()
+    if args.profile:
+        with profile_session(args.profile):
+            root.mainloop()
+    else:
+        root.mainloop()
+    app.search_worker.shutdown()
 
 if __name__ == "__main__":
     main()
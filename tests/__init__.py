@@ -0,0 +1 @@
+"""Tests for the kosovo_universities data layer; run with python -m pytest."""
@@ -0,0 +1,73 @@
+"""The in-memory, SQLite and memory-mapped backends answer every query alike."""
+
+import os
+import shutil
+import tempfile
+import unittest
+
+from kosovo_universities import (CatalogueExporter, CatalogueLoader, MappedDataManager,
+                                 SQLiteDataManager, UniversityDataManager)
+
+QUERIES = ['prishtina', 'ekonomi', 'eng', 'law', 'ë', 'kadri zeka', 'computr scince', 'zzz', 'a']
+
+def match_key(match):
+    return (match.university.name, match.university.city, match.level, match.name,
+            match.context)
+
+class BackendParityTest(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.tmp = tempfile.mkdtemp()
+        memory = UniversityDataManager()
+        source = os.path.join(cls.tmp, 'catalogue.json')
+        CatalogueExporter(memory.universities, memory.statistics()).export(source)
+        loader = CatalogueLoader(os.path.join(cls.tmp, 'cache'))
+        cls.managers = {
+            'memory': UniversityDataManager.from_source(source, loader=loader),
+            'sqlite': SQLiteDataManager.from_source(
+                source, os.path.join(cls.tmp, 'catalogue.sqlite'), loader=loader),
+            'mapped': MappedDataManager.from_source(
+                source, os.path.join(cls.tmp, 'catalogue.kuc'), loader=loader),
+        }
+        cls.reference = cls.managers['memory']
+
+    @classmethod
+    def tearDownClass(cls):
+        for name in ('sqlite', 'mapped'):
+            cls.managers[name].close()
+        shutil.rmtree(cls.tmp, ignore_errors=True)
+
+    def assertParity(self, query):
+        expected = query(self.reference)
+        for name, manager in self.managers.items():
+            with self.subTest(backend=name):
+                self.assertEqual(query(manager), expected)
+
+    def test_search(self):
+        for term in QUERIES:
+            with self.subTest(term=term):
+                self.assertParity(lambda m: [match_key(x) for x in m.search(term)])
+
+    def test_ranked_search(self):
+        for term in QUERIES:
+            with self.subTest(term=term):
+                self.assertParity(lambda m: [(match_key(x), round(x.score, 6))
+                                             for x in m.ranked_search(term, limit=20)])
+
+    def test_find_universities(self):
+        for uni in self.reference.universities:
+            self.assertParity(lambda m: [u.to_dict() for u in m.find_universities(uni.name)])
+            self.assertParity(lambda m: m.find_university(uni.name).to_dict())
+        self.assertParity(lambda m: m.find_universities("No Such University"))
+        self.assertParity(lambda m: m.find_university("No Such University"))
+
+    def test_universities_in_city(self):
+        for city in {uni.city for uni in self.reference.universities}:
+            self.assertParity(lambda m: [u.name for u in m.universities_in_city(city)])
+
+    def test_statistics(self):
+        self.assertParity(lambda m: m.statistics())
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,47 @@
+"""Exports read back through CatalogueLoader.load unchanged, in every format."""
+
+import os
+import shutil
+import tempfile
+import unittest
+
+from kosovo_universities import (COMPRESSION_SUFFIXES, CatalogueExporter, CatalogueLoader,
+                                 UniversityDataManager)
+
+class ExportRoundTripTest(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.loader = CatalogueLoader(os.path.join(self.tmp, 'cache'))
+        self.manager = UniversityDataManager()
+        self.expected = [uni.to_dict() for uni in self.manager.universities]
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp, ignore_errors=True)
+
+    def export(self, fmt, compression):
+        exporter = CatalogueExporter(self.manager.universities, self.manager.statistics(),
+                                     fmt, compression)
+        return exporter.export(os.path.join(self.tmp, exporter.default_filename()))
+
+    def test_round_trip(self):
+        for fmt in CatalogueExporter.FORMATS:
+            for compression in (None, *COMPRESSION_SUFFIXES.values()):
+                with self.subTest(format=fmt, compression=compression):
+                    path = self.export(fmt, compression)
+                    self.assertEqual(CatalogueLoader.compression_for(path), compression)
+                    loaded = self.loader.load(path)
+                    self.assertEqual([uni.to_dict() for uni in loaded], self.expected)
+                    # The second load comes from the snapshot
+                    self.assertEqual([uni.to_dict() for uni in self.loader.load(path)],
+                                     self.expected)
+
+    def test_json_keeps_shared_faculties_shared(self):
+        def distinct_faculties(universities):
+            return len({id(faculty) for uni in universities for faculty in uni.faculties})
+        loaded = self.loader.load(self.export('json', None))
+        self.assertEqual(distinct_faculties(loaded),
+                         distinct_faculties(self.manager.universities))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,85 @@
+"""Status codes and conditional requests of the HTTP/JSON service."""
+
+import asyncio
+import json
+import unittest
+
+from kosovo_universities import CatalogueService, UniversityDataManager
+
+class CatalogueServiceTest(unittest.TestCase):
+
+    def setUp(self):
+        self.manager = UniversityDataManager()
+        self.service = CatalogueService(self.manager)
+
+    def request(self, target, method='GET', **headers):
+        status, response_headers, body = asyncio.run(
+            self.service.respond(method, target, {name.replace('_', '-'): value
+                                                  for name, value in headers.items()}))
+        return status, dict(response_headers), body
+
+    def test_status_codes(self):
+        name = self.manager.universities[0].name
+        cases = [
+            ('/', 200),
+            ('/stats', 200),
+            ('/cities', 200),
+            ('/cities/Prishtina', 200),
+            ('/cities/Atlantis', 404),
+            ('/universities', 200),
+            (f'/universities/{name}', 200),
+            (f'/universities/{name}/faculties', 200),
+            ('/universities/No%20Such%20University', 404),
+            ('/search?q=law', 200),
+            ('/search?q=law&fuzzy=1&limit=2', 200),
+            ('/search', 400),
+            ('/search?q=law&limit=0', 400),
+            ('/search?q=law&limit=x', 400),
+            ('/suggest?q=pri', 200),
+            ('/suggest?q=pri&limit=-1', 400),
+            ('/where?subject=Civil%20Law', 200),
+            ('/where?subject=Civil%20Law&page=0', 400),
+            ('/where?subject=No%20Such%20Subject', 404),
+            ('/where', 400),
+            ('/departments', 400),
+            ('/nowhere', 404),
+        ]
+        for target, expected in cases:
+            with self.subTest(target=target):
+                status, _, body = self.request(target)
+                self.assertEqual(status, expected)
+                payload = json.loads(body)
+                if expected != 200:
+                    self.assertIn('error', payload)
+
+    def test_other_methods_are_not_allowed(self):
+        status, headers, _ = self.request('/stats', method='POST')
+        self.assertEqual(status, 405)
+        self.assertEqual(headers['Allow'], 'GET, HEAD')
+
+    def test_etag_and_not_modified(self):
+        status, headers, body = self.request('/stats')
+        self.assertEqual(status, 200)
+        etag = headers['ETag']
+        self.assertEqual(headers['Cache-Control'], 'no-cache')
+        self.assertEqual(json.loads(body), json.loads(json.dumps(self.manager.statistics())))
+
+        for if_none_match in (etag, f'W/{etag}', f'"other", {etag}', '*'):
+            with self.subTest(if_none_match=if_none_match):
+                status, headers, body = self.request('/stats', if_none_match=if_none_match)
+                self.assertEqual(status, 304)
+                self.assertEqual(headers['ETag'], etag)
+                self.assertEqual(body, b'')
+        status, _, _ = self.request('/stats', if_none_match='"other"')
+        self.assertEqual(status, 200)
+
+    def test_change_invalidates_etag(self):
+        _, headers, _ = self.request('/stats')
+        self.manager.remove_university(self.manager.universities[-1])
+        status, new_headers, body = self.request('/stats', if_none_match=headers['ETag'])
+        self.assertEqual(status, 200)
+        self.assertNotEqual(new_headers['ETag'], headers['ETag'])
+        self.assertEqual(json.loads(body)['total_universities'], len(self.manager.universities))
+
+if __name__ == '__main__':
+    unittest.main()